@@ -0,0 +1,55 @@
+"""performance indexes
+
+Composite indexes for the chat, credit history, booking, report and
+proposal queries. Built online (ALGORITHM=INPLACE, LOCK=NONE on MySQL, see
+app/db/online_ddl.py); indexes that already exist are skipped.
+
+ix_reports_status_created is already in the baseline model; it is listed
+here for databases stamped at 0001 that never ran migrate_report_indexes.py,
+and is left in place on downgrade.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 09:15:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+from app.db.online_ddl import create_index_online, drop_index_online
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ('ix_messages_conversation_created', 'messages', ['conversation_id', 'created_at']),
+    ('ix_messages_conversation_sender_status', 'messages', ['conversation_id', 'sender_id', 'status']),
+    ('ix_time_transactions_user_created', 'time_transactions', ['user_id', 'created_at']),
+    ('ix_service_bookings_service_status', 'service_bookings', ['service_id', 'status']),
+    ('ix_conversations_user1_active', 'conversations', ['user1_id', 'is_active']),
+    ('ix_conversations_user2_active', 'conversations', ['user2_id', 'is_active']),
+    ('ix_request_proposals_request_proposer', 'request_proposals', ['request_id', 'proposer_id']),
+]
+
+BASELINE_INDEXES = [
+    ('ix_reports_status_created', 'reports', ['status', 'created_at']),
+]
+
+
+def upgrade() -> None:
+    for name, table, columns in INDEXES:
+        create_index_online(name, table, columns)
+    # --sql can't check whether it exists, and a fresh 0001 database always has it
+    if not context.is_offline_mode():
+        for name, table, columns in BASELINE_INDEXES:
+            create_index_online(name, table, columns)
+
+
+def downgrade() -> None:
+    for name, table, columns in reversed(INDEXES):
+        drop_index_online(name, table)
@@ -0,0 +1,59 @@
+"""backfill conversation last message
+
+Before the async send_message fix, new messages left
+conversations.last_message_id and last_message_at NULL. Fill them in from
+messages, in committed primary-key batches (app/db/online_ddl.py) so the
+live conversations table is never locked for long. Uses
+ix_messages_conversation_created from 0002.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 09:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.db.online_ddl import batched_update
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+conversations = sa.table(
+    'conversations',
+    sa.column('id', sa.Integer),
+    sa.column('last_message_id', sa.Integer),
+    sa.column('last_message_at', sa.DateTime),
+)
+messages = sa.table(
+    'messages',
+    sa.column('id', sa.Integer),
+    sa.column('conversation_id', sa.Integer),
+    sa.column('created_at', sa.DateTime),
+)
+
+
+def upgrade() -> None:
+    in_conversation = messages.c.conversation_id == conversations.c.id
+    batched_update(
+        conversations,
+        conversations.c.id,
+        values={
+            'last_message_id': sa.select(sa.func.max(messages.c.id)).where(in_conversation).scalar_subquery(),
+            'last_message_at': sa.select(sa.func.max(messages.c.created_at)).where(in_conversation).scalar_subquery(),
+        },
+        where=sa.and_(
+            conversations.c.last_message_id.is_(None),
+            sa.exists().where(in_conversation),
+        ),
+    )
+
+
+def downgrade() -> None:
+    # Data-only fix; the values are correct under either revision
+    pass
@@ -0,0 +1,35 @@
+"""row version columns
+
+Adds the ``version`` counter (app/db/versioning.py) read by the ETag version
+stamps to services, requests, users, service_bookings, ratings and
+conversations. Existing rows start at 1. On MySQL the columns are added
+with ALGORITHM=INSTANT (app/db/online_ddl.py), so no table is rebuilt.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19 09:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from app.db.online_ddl import add_column_online, drop_column_online
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ['services', 'requests', 'users', 'service_bookings', 'ratings', 'conversations']
+
+
+def upgrade() -> None:
+    for table in TABLES:
+        add_column_online(table, sa.Column('version', sa.Integer(), server_default=sa.text('1'), nullable=False))
+
+
+def downgrade() -> None:
+    for table in reversed(TABLES):
+        drop_column_online(table, 'version')
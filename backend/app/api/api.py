@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from .endpoints import users, services, requests, service_bookings, request_proposals, mod_requests, admins, chat, ratings, credits, reports, moderators
+from .endpoints import users, services, requests, service_bookings, request_proposals, mod_requests, admins, chat, ratings, credits, reports, moderators, search, matching
 
 api_router = APIRouter()
 
@@ -39,6 +39,12 @@ api_router.include_router(credits.router, prefix="/credits", tags=["credits"])
 # Include report routes
 api_router.include_router(reports.router, prefix="/reports", tags=["reports"])
 
+# Include search routes
+api_router.include_router(search.router, prefix="/search", tags=["search"])
+
+# Include matching routes
+api_router.include_router(matching.router, prefix="/matches", tags=["matches"])
+
 @api_router.get("/health")
 async def health_check():
     """Health check endpoint"""
@@ -1,8 +1,16 @@
-from mysql.connector import connect, Error as MySQLError
-from fastapi import APIRouter, Depends, HTTPException, status
-from ...db.database import create_connection
-import psutil
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from typing import Optional
+from ...db.database import create_read_connection, database_pool_status, get_db
+from ...core.scheduler import scheduler
+from ...core.email_outbox import outbox_worker
+from ...core.export import ExportError, UnknownExportError, export_stream
+from ...core.response_cache import RESPONSE_CACHE_ENABLED, invalidate_response_cache, response_cache_store
+from ...core.bulk_import import BulkImporter, BulkImportError, UnknownImportError, IMPORT_BATCH_SIZE, detect_format, parse_rows
+from .users import get_current_admin_dependency
 import time
+import csv
 import platform
 import socket
 import os
@@ -15,7 +23,7 @@ def get_stats():
     conn = None
     print('hello')
     try:
-        conn = create_connection()
+        conn = create_read_connection()
         if conn is None:
             raise Exception("Failed to create database connection")
             
@@ -165,7 +173,7 @@ def get_weekly_reports():
     """Get weekly reports breakdown for admin dashboard"""
     conn = None
     try:
-        conn = create_connection()
+        conn = create_read_connection()
         if conn is None:
             raise Exception("Failed to create database connection")
             
@@ -267,7 +275,7 @@ def get_monthly_transaction_trends():
     """Get monthly transaction trends for admin dashboard"""
     conn = None
     try:
-        conn = create_connection()
+        conn = create_read_connection()
         if conn is None:
             raise Exception("Failed to create database connection")
             
@@ -391,7 +399,7 @@ def get_monthly_trends(start_date: str = None, end_date: str = None):
     """Get monthly breakdown of requests and proposals based on actual database timestamps"""
     conn = None
     try:
-        conn = create_connection()
+        conn = create_read_connection()
         if conn is None:
             raise Exception("Failed to create database connection")
             
@@ -574,6 +582,8 @@ def get_monthly_trends(start_date: str = None, end_date: str = None):
 def get_system_health():
     """Get real-time system health metrics"""
     try:
+        import psutil
+        
         # Get CPU usage - use multiple methods for more accuracy
         # Method 1: Get current CPU percentage (like Task Manager's current reading)
         cpu_percent_instant = psutil.cpu_percent(interval=None)  # Non-blocking, instant reading
@@ -710,4 +720,119 @@ def get_system_health():
                 "error": "psutil not available"
             },
             "timestamp": datetime.now().isoformat()
-        }
\ No newline at end of file
+        }
+
+@router.get("/jobs")
+def get_scheduled_jobs(
+    current_admin = Depends(get_current_admin_dependency),
+    db: Session = Depends(get_db)
+):
+    """Scheduled background jobs: schedules, this worker's run metrics and the shared leases"""
+    return {
+        "worker_id": scheduler.worker_id,
+        "running": scheduler.running,
+        "jobs": scheduler.status(db)
+    }
+
+@router.get("/email-outbox")
+def get_email_outbox_status(
+    current_admin = Depends(get_current_admin_dependency),
+    db: Session = Depends(get_db)
+):
+    """Outbox backlog by status and this worker's delivery metrics"""
+    return {
+        "worker_id": outbox_worker.worker_id,
+        "running": outbox_worker.running,
+        "dev_mode": outbox_worker.dev_mode,
+        "counts": outbox_worker.pending_counts(db),
+        "metrics": dict(outbox_worker.metrics, smtp_connects=outbox_worker.connection.connects)
+    }
+
+@router.get("/db-pool")
+def get_database_pool_status(current_admin = Depends(get_current_admin_dependency)):
+    """Connection pool configuration, occupancy and checkout/wait/overflow metrics for this worker"""
+    return database_pool_status()
+
+@router.get("/cache")
+def get_response_cache_status(current_admin = Depends(get_current_admin_dependency)):
+    """Response cache hits, stale hits, misses, coalesced misses and invalidations for this worker"""
+    return {"enabled": RESPONSE_CACHE_ENABLED, **response_cache_store.stats()}
+
+@router.get("/export/{entity}")
+def export_entity(
+    entity: str,
+    format: str = Query("csv", description="csv or ndjson"),
+    gzip: bool = Query(False, description="gzip the file (.gz download)"),
+    since: Optional[datetime] = Query(None, description="Only rows created at or after this time"),
+    until: Optional[datetime] = Query(None, description="Only rows created before this time"),
+    status_filter: Optional[str] = Query(None, alias="status"),
+    user_id: Optional[int] = Query(None, description="Only rows involving this user"),
+    current_admin = Depends(get_current_admin_dependency)
+):
+    """
+    Stream a full table export (users, services, requests, bookings,
+    transactions, reports or messages) as CSV or NDJSON.
+
+    Rows are read from a server-side cursor and written one chunk at a
+    time, so exports of any size run in constant memory.
+    """
+    try:
+        stream, media_type, filename = export_stream(
+            entity, format=format, gzip=gzip, since=since, until=until,
+            status=status_filter, user_id=user_id
+        )
+    except UnknownExportError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except ExportError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    return StreamingResponse(
+        stream,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+@router.post("/import/{entity}")
+def import_entity(
+    entity: str,
+    file: UploadFile = File(..., description="CSV (with a header row) or NDJSON file"),
+    format: Optional[str] = Query(None, description="csv or ndjson; guessed from the file name when omitted"),
+    dry_run: bool = Query(False, description="Validate every row without writing anything"),
+    batch_size: int = Query(IMPORT_BATCH_SIZE, ge=1, le=5000),
+    current_admin = Depends(get_current_admin_dependency),
+    db: Session = Depends(get_db)
+):
+    """
+    Bulk import users or services from an uploaded file.
+
+    Rows are validated with the same rules as registration / service
+    creation and written in batches; the response lists every rejected
+    line with its errors. Imported users get the usual initial bonus.
+    For very large files prefer the import_data.py CLI, which has no
+    request timeout.
+    """
+    try:
+        rows = parse_rows(file.file, format or detect_format(file.filename, file.content_type))
+        importer = BulkImporter(db, entity, batch_size=batch_size, dry_run=dry_run)
+    except UnknownImportError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except BulkImportError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    try:
+        result = importer.run(rows).to_dict()
+        if entity == "services" and not dry_run:
+            invalidate_response_cache("services")
+        return result
+    except UnicodeDecodeError:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="File must be UTF-8 encoded"
+        )
+    except csv.Error as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Malformed CSV: {str(e)}"
+        )
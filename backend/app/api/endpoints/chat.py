@@ -1,11 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, Request as HTTPRequest, Response, status, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, desc, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, case, or_, desc, func, select, update
 from typing import List, Optional
 import logging
 import asyncio
 
-from ...db.database import get_db
+from ...db.database import get_db, get_async_db
 from ...db.models.conversation import Conversation
 from ...db.models.message import Message
 from ...db.models.user import User
@@ -15,7 +16,9 @@ from ...schemas.chat import (
     ConversationCreate, ConversationResponse, MessageCreate, 
     MessageResponse, MessageUpdate, ChatListResponse, ChatListItem
 )
-from .users import get_current_user_dependency
+from .users import get_current_user_dependency, get_current_user_async
+from ...core.async_queries import load_users
+from ...core.etag import conditional_get, version_stamp, weak_etag
 from ...core.websocket import chat_manager
 
 # Configure logging
@@ -24,71 +27,130 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+def _avatar(user: User) -> str:
+    return f"/placeholder.svg?height=40&width=40&text={user.first_name[0]}{user.last_name[0]}"
+
+def _message_response(msg: Message, sender: Optional[User], current_user_id: int) -> MessageResponse:
+    return MessageResponse(
+        message_id=msg.id,
+        conversation_id=msg.conversation_id,
+        sender_id=msg.sender_id,
+        content=msg.content,
+        message_type=msg.message_type,
+        created_at=msg.created_at,
+        updated_at=msg.updated_at,
+        status=msg.status,
+        is_edited=msg.is_edited,
+        is_deleted=msg.is_deleted,
+        file_url=msg.file_url,
+        file_name=msg.file_name,
+        file_size=msg.file_size,
+        latitude=msg.latitude,
+        longitude=msg.longitude,
+        location_address=msg.location_address,
+        sender_name=f"{sender.first_name} {sender.last_name}" if sender else "Unknown",
+        sender_avatar=_avatar(sender) if sender else None,
+        is_current_user=msg.sender_id == current_user_id
+    )
+
+def _participant_filter(user_id: int):
+    return or_(Conversation.user1_id == user_id, Conversation.user2_id == user_id)
+
+def _conversation_stamp_queries(user_id: int, conditions):
+    """Version stamp queries for a user's conversations, the other participants and the unread messages"""
+    other_user_id = case((Conversation.user1_id == user_id, Conversation.user2_id), else_=Conversation.user1_id)
+    return (
+        select(*version_stamp(Conversation.id, Conversation.version), func.coalesce(func.sum(User.version), 0))
+        .select_from(Conversation)
+        .outerjoin(User, User.user_id == other_user_id)
+        .where(conditions),
+        select(func.count(Message.id))
+        .join(Conversation, Conversation.id == Message.conversation_id)
+        .where(conditions, Message.sender_id != user_id, Message.status != 'read'),
+    )
+
 @router.get("/conversations", response_model=ChatListResponse)
-def get_user_conversations(
-    current_user = Depends(get_current_user_dependency),
-    db: Session = Depends(get_db),
+async def get_user_conversations(
+    http_request: HTTPRequest,
+    response: Response,
+    current_user = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
     skip: int = 0,
     limit: int = 50
 ):
     """
     Get all conversations for the current user
+
+    Native async. The other participants, last messages and unread counts
+    for the page are loaded with one query each. Answers 304 when
+    If-None-Match carries the current ETag, before any of that.
     """
     try:
-        # Get conversations where the user is a participant
-        conversations_query = db.query(Conversation).filter(
-            and_(
-                or_(
-                    Conversation.user1_id == current_user.user_id,
-                    Conversation.user2_id == current_user.user_id
-                ),
-                Conversation.is_active == True
+        user_id = current_user.user_id
+        conditions = and_(_participant_filter(user_id), Conversation.is_active == True)
+        
+        stamp = ()
+        for stamp_query in _conversation_stamp_queries(user_id, conditions):
+            stamp += tuple((await db.execute(stamp_query)).one())
+        unchanged = conditional_get(
+            http_request, response, weak_etag("conversations", user_id, http_request.url.query, stamp), private=True
+        )
+        if unchanged:
+            return unchanged
+        
+        total_count = await db.scalar(select(func.count(Conversation.id)).where(conditions))
+        conversations = (await db.scalars(
+            select(Conversation).where(conditions).order_by(desc(Conversation.updated_at)).offset(skip).limit(limit)
+        )).all()
+        
+        conversation_ids = [conv.id for conv in conversations]
+        other_users = await load_users(db, [conv.get_other_user_id(user_id) for conv in conversations])
+        
+        last_messages = {}
+        unread_counts = {}
+        if conversation_ids:
+            # Newest message per conversation (ids grow with created_at)
+            latest_ids = (
+                select(func.max(Message.id))
+                .where(Message.conversation_id.in_(conversation_ids))
+                .group_by(Message.conversation_id)
             )
-        ).order_by(desc(Conversation.updated_at))
-        
-        total_count = conversations_query.count()
-        conversations = conversations_query.offset(skip).limit(limit).all()
+            for message in await db.scalars(select(Message).where(Message.id.in_(latest_ids))):
+                last_messages[message.conversation_id] = message
+            
+            unread = await db.execute(
+                select(Message.conversation_id, func.count(Message.id))
+                .where(
+                    Message.conversation_id.in_(conversation_ids),
+                    Message.sender_id != user_id,
+                    Message.status != 'read'
+                )
+                .group_by(Message.conversation_id)
+            )
+            unread_counts = dict(unread.all())
         
-        # Build response with additional user and message info
         chat_list = []
         total_unread = 0
-        
         for conv in conversations:
-            # Get the other user's info
-            other_user_id = conv.get_other_user_id(current_user.user_id)
-            other_user = db.query(User).filter(User.user_id == other_user_id).first()
-            
+            other_user = other_users.get(conv.get_other_user_id(user_id))
             if not other_user:
                 continue
-                
-            # Get the last message
-            last_message = db.query(Message).filter(
-                Message.conversation_id == conv.id
-            ).order_by(desc(Message.created_at)).first()
-            
-            # Get unread count for this conversation
-            unread_count = db.query(Message).filter(
-                and_(
-                    Message.conversation_id == conv.id,
-                    Message.sender_id != current_user.user_id,
-                    Message.status != 'read'
-                )
-            ).count()
             
+            last_message = last_messages.get(conv.id)
+            unread_count = unread_counts.get(conv.id, 0)
             total_unread += unread_count
             
-            chat_item = ChatListItem(
+            chat_list.append(ChatListItem(
                 conversation_id=conv.id,
                 other_user_id=other_user.user_id,
                 other_user_name=f"{other_user.first_name} {other_user.last_name}",
-                other_user_avatar=f"/placeholder.svg?height=40&width=40&text={other_user.first_name[0]}{other_user.last_name[0]}",
+                other_user_avatar=_avatar(other_user),
                 last_message_content=last_message.content if last_message else "No messages yet",
                 last_message_at=last_message.created_at if last_message else conv.created_at,
                 unread_count=unread_count,
                 conversation_type=conv.conversation_type,
                 context_title=conv.context_title
-            )
-            chat_list.append(chat_item)
+            ))
         
         return ChatListResponse(
             conversations=chat_list,
@@ -224,27 +286,22 @@ def create_conversation(
         )
 
 @router.get("/conversations/{conversation_id}/messages", response_model=List[MessageResponse])
-def get_conversation_messages(
+async def get_conversation_messages(
     conversation_id: int,
-    current_user = Depends(get_current_user_dependency),
-    db: Session = Depends(get_db),
+    current_user = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
     skip: int = 0,
     limit: int = 50
 ):
     """
-    Get messages for a specific conversation
+    Get messages for a specific conversation (native async)
     """
     try:
         # Verify user is part of this conversation
-        conversation = db.query(Conversation).filter(
-            and_(
-                Conversation.id == conversation_id,
-                or_(
-                    Conversation.user1_id == current_user.user_id,
-                    Conversation.user2_id == current_user.user_id
-                )
-            )
-        ).first()
+        conversation = await db.scalar(select(Conversation).where(
+            Conversation.id == conversation_id,
+            _participant_filter(current_user.user_id)
+        ))
         
         if not conversation:
             raise HTTPException(
@@ -253,60 +310,44 @@ def get_conversation_messages(
             )
         
         # Get messages
-        messages = db.query(Message).filter(
-            and_(
-                Message.conversation_id == conversation_id,
-                Message.is_deleted == False
-            )
-        ).order_by(desc(Message.created_at)).offset(skip).limit(limit).all()
+        messages = (await db.scalars(
+            select(Message)
+            .where(Message.conversation_id == conversation_id, Message.is_deleted == False)
+            .order_by(desc(Message.created_at))
+            .offset(skip)
+            .limit(limit)
+        )).all()
         
         # Reverse to get chronological order
-        messages.reverse()
+        messages = list(reversed(messages))
         
-        # Build response with sender info
-        response_messages = []
-        for msg in messages:
-            sender = db.query(User).filter(User.user_id == msg.sender_id).first()
-            
-            message_response = MessageResponse(
-                message_id=msg.id,
-                conversation_id=msg.conversation_id,
-                sender_id=msg.sender_id,
-                content=msg.content,
-                message_type=msg.message_type,
-                created_at=msg.created_at,
-                updated_at=msg.updated_at,
-                status=msg.status,
-                is_edited=msg.is_edited,
-                is_deleted=msg.is_deleted,
-                file_url=msg.file_url,
-                file_name=msg.file_name,
-                file_size=msg.file_size,
-                latitude=msg.latitude,
-                longitude=msg.longitude,
-                location_address=msg.location_address,
-                sender_name=f"{sender.first_name} {sender.last_name}" if sender else "Unknown",
-                sender_avatar=f"/placeholder.svg?height=40&width=40&text={sender.first_name[0]}{sender.last_name[0]}" if sender else None,
-                is_current_user=msg.sender_id == current_user.user_id
-            )
-            response_messages.append(message_response)
+        # Senders are the two participants: one lookup for both
+        senders = await load_users(db, [conversation.user1_id, conversation.user2_id])
+        response_messages = [
+            _message_response(msg, senders.get(msg.sender_id), current_user.user_id)
+            for msg in messages
+        ]
         
         # Mark messages as read
-        db.query(Message).filter(
-            and_(
+        await db.execute(
+            update(Message)
+            .where(
                 Message.conversation_id == conversation_id,
                 Message.sender_id != current_user.user_id,
                 Message.status != 'read'
             )
-        ).update({Message.status: 'read'})
+            .values(status='read')
+            .execution_options(synchronize_session=False)
+        )
         
-        db.commit()
+        await db.commit()
         
         return response_messages
         
     except HTTPException:
         raise
     except Exception as e:
+        await db.rollback()
         logger.error(f"Error getting messages: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -316,23 +357,21 @@ def get_conversation_messages(
 @router.post("/messages", response_model=MessageResponse)
 async def send_message(
     message_data: MessageCreate,
-    current_user = Depends(get_current_user_dependency),
-    db: Session = Depends(get_db)
+    current_user = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Send a message in a conversation
+
+    Native async, so the database round trips no longer block the event
+    loop (this handler was already async but used the sync session).
     """
     try:
         # Verify user is part of the conversation
-        conversation = db.query(Conversation).filter(
-            and_(
-                Conversation.id == message_data.conversation_id,
-                or_(
-                    Conversation.user1_id == current_user.user_id,
-                    Conversation.user2_id == current_user.user_id
-                )
-            )
-        ).first()
+        conversation = await db.scalar(select(Conversation).where(
+            Conversation.id == message_data.conversation_id,
+            _participant_filter(current_user.user_id)
+        ))
         
         if not conversation:
             raise HTTPException(
@@ -352,39 +391,18 @@ async def send_message(
         )
         
         db.add(new_message)
+        # Flush first so the id and created_at exist before they're copied onto the conversation
+        await db.flush()
         
         # Update conversation last message info
         conversation.last_message_id = new_message.id
         conversation.last_message_at = new_message.created_at
         conversation.updated_at = new_message.created_at
         
-        db.commit()
-        db.refresh(new_message)
-        
-        # Build response
-        sender = db.query(User).filter(User.user_id == current_user.user_id).first()
-        
-        response_message = MessageResponse(
-            message_id=new_message.id,
-            conversation_id=new_message.conversation_id,
-            sender_id=new_message.sender_id,
-            content=new_message.content,
-            message_type=new_message.message_type,
-            created_at=new_message.created_at,
-            updated_at=new_message.updated_at,
-            status=new_message.status,
-            is_edited=new_message.is_edited,
-            is_deleted=new_message.is_deleted,
-            file_url=new_message.file_url,
-            file_name=new_message.file_name,
-            file_size=new_message.file_size,
-            latitude=new_message.latitude,
-            longitude=new_message.longitude,
-            location_address=new_message.location_address,
-            sender_name=f"{sender.first_name} {sender.last_name}" if sender else "Unknown",
-            sender_avatar=f"/placeholder.svg?height=40&width=40&text={sender.first_name[0]}{sender.last_name[0]}" if sender else None,
-            is_current_user=True
-        )
+        await db.commit()
+        
+        sender = current_user
+        response_message = _message_response(new_message, sender, current_user.user_id)
         
         # Broadcast message to WebSocket clients
         try:
@@ -395,8 +413,8 @@ async def send_message(
                 'content': new_message.content,
                 'message_type': new_message.message_type.value,
                 'created_at': new_message.created_at.isoformat(),
-                'sender_name': f"{sender.first_name} {sender.last_name}" if sender else "Unknown",
-                'sender_avatar': f"/placeholder.svg?height=40&width=40&text={sender.first_name[0]}{sender.last_name[0]}" if sender else None,
+                'sender_name': f"{sender.first_name} {sender.last_name}",
+                'sender_avatar': _avatar(sender),
                 'latitude': new_message.latitude,
                 'longitude': new_message.longitude,
                 'location_address': new_message.location_address,
@@ -405,7 +423,7 @@ async def send_message(
             
             logger.info(f"Broadcasting message to conversation {new_message.conversation_id}")
             
-            # Use synchronous wrapper to avoid event loop issues
+            # Emitted from a Socket.IO background task so a slow client can't delay the response
             chat_manager.broadcast_message_sync(message_data_ws, new_message.conversation_id)
             
         except Exception as e:
@@ -417,7 +435,7 @@ async def send_message(
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Error sending message: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
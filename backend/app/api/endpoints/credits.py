@@ -1,34 +1,46 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status, Query
 from sqlalchemy.orm import Session
+from sqlalchemy import select
 from typing import List, Optional
 from decimal import Decimal
 import logging
 
 from ...db.database import get_db
 from ...core.credit_manager import CreditManager, InsufficientCreditsError
+from ...core.etag import conditional_get, weak_etag
+from ...core.fast_json import fast_json
+from ...db.models.user import User
 from ...schemas.timeTransaction import (
     TransactionResponse, TransactionListResponse, BalanceResponse, CreditTransferRequest
 )
-from .users import get_current_user_dependency
+from .users import get_current_user_dependency, get_current_user_async
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 @router.get("/balance", response_model=BalanceResponse)
-def get_user_balance(
-    current_user = Depends(get_current_user_dependency),
-    db: Session = Depends(get_db)
+async def get_user_balance(
+    request: Request,
+    response: Response,
+    current_user = Depends(get_current_user_async)
 ):
-    """Get current user's credit balance and statistics"""
+    """
+    Get current user's credit balance and statistics
+
+    Native async: the user row loaded for authentication already carries the
+    balance, so this is a single query on the event loop. The ETag is the
+    row's version, so an unchanged balance is a 304.
+    """
     try:
-        credit_manager = CreditManager(db)
-        
-        current_balance = credit_manager.get_user_balance(current_user.user_id)
-        print(current_user.total_credits_earned)
+        unchanged = conditional_get(
+            request, response, weak_etag("balance", current_user.user_id, current_user.version), private=True
+        )
+        if unchanged:
+            return unchanged
         return BalanceResponse(
             user_id=current_user.user_id,
-            current_balance=current_balance,
+            current_balance=Decimal(str(current_user.time_credits)) if current_user.time_credits else Decimal('0.00'),
             total_earned=current_user.total_credits_earned or Decimal('0.00'),
             total_spent=current_user.total_credits_spent or Decimal('0.00'),
             last_updated=current_user.last_login or current_user.date_joined
@@ -44,15 +56,22 @@ def get_user_balance(
 @router.get("/balance/{user_id}", response_model=BalanceResponse)
 def get_user_balance_by_id(
     user_id: int,
+    request: Request,
+    response: Response,
     current_user = Depends(get_current_user_dependency),
     db: Session = Depends(get_db)
 ):
     """Get any user's credit balance (for service providers to check customer balance)"""
     try:
+        version = db.scalar(select(User.version).where(User.user_id == user_id))
+        if version is not None:
+            unchanged = conditional_get(request, response, weak_etag("balance", user_id, version), private=True)
+            if unchanged:
+                return unchanged
+        
         credit_manager = CreditManager(db)
         
         # Get the target user
-        from ...db.models.user import User
         user = db.query(User).filter(User.user_id == user_id).first()
         if not user:
             raise HTTPException(
@@ -96,11 +115,12 @@ def get_user_transactions(
         
         current_balance = credit_manager.get_user_balance(current_user.user_id)
         
-        return TransactionListResponse(
-            transactions=[TransactionResponse.from_orm(tx) for tx in transactions],
-            total_count=total_count,
-            current_balance=current_balance
-        )
+        # The ledger rows are serialized straight from their attributes, not through from_orm() per row
+        return fast_json(TransactionListResponse, {
+            "transactions": transactions,
+            "total_count": total_count,
+            "current_balance": current_balance
+        })
         
     except Exception as e:
         logger.error(f"Error getting transactions for user {current_user.user_id}: {str(e)}")
@@ -0,0 +1,73 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+import logging
+
+from ...db.database import get_db
+from ...db.models.service import Service, ServiceStatusEnum
+from ...db.models.request import Request, RequestStatusEnum
+from ...core.matching import MatchingEngine
+from ...schemas.matching import MatchListResponse
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+@router.get("/requests/{request_id}", response_model=MatchListResponse)
+def match_services_for_request(
+    request_id: int,
+    limit: int = Query(10, ge=1, le=50),
+    db: Session = Depends(get_db)
+):
+    """
+    Best matching active services for a request
+    """
+    request = db.query(Request).filter(Request.request_id == request_id).first()
+    if not request:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Request not found"
+        )
+    if request.status != RequestStatusEnum.active:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Only active requests can be matched"
+        )
+
+    matches = MatchingEngine(db).match_services_for_request(request, limit=limit)
+
+    return {
+        "source_type": "request",
+        "source_id": request_id,
+        "matches": matches
+    }
+
+@router.get("/services/{service_id}", response_model=MatchListResponse)
+def match_requests_for_service(
+    service_id: int,
+    limit: int = Query(10, ge=1, le=50),
+    db: Session = Depends(get_db)
+):
+    """
+    Best matching open requests for a service
+    """
+    service = db.query(Service).filter(Service.service_id == service_id).first()
+    if not service:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Service not found"
+        )
+    if service.status != ServiceStatusEnum.active:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Only active services can be matched"
+        )
+
+    matches = MatchingEngine(db).match_requests_for_service(service, limit=limit)
+
+    return {
+        "source_type": "service",
+        "source_id": service_id,
+        "matches": matches
+    }
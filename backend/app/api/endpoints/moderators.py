@@ -1,6 +1,6 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Body
+from fastapi import APIRouter, Depends, HTTPException, status, Body, Header, Query, Response
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, contains_eager
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy import desc
 from typing import List, Optional
@@ -12,12 +12,20 @@ from ...db.models.moderator import Moderator, ModeratorStatus
 from ...db.models.user import User
 from ...db.models.modRequest import ModRequest, ModRequestStatus
 from ...db.models.report import Report
+from ...db.models.service import Service
+from ...db.models.request import Request
 from ...schemas.moderator import (
     ModeratorCreate, ModeratorUpdate, ModeratorResponse, 
     ModeratorLogin, ModeratorLoginResponse, ModeratorStats
 )
 from ...schemas.report import ReportResponse, ReportSummary
 from ...core.security import verify_password, hash_password as get_password_hash, create_access_token, decode_access_token
+from ...core.search import SearchEngine
+from ...core.report_analytics import ReportAnalytics, invalidate_report_stats
+from ...core.report_queries import report_details_query, filter_reports, load_report_page, report_response
+from ...core.response_cache import invalidate_response_cache
+from ...core.streaming import cached_count, invalidate_counts, keyset_page, ndjson_response, wants_ndjson
+from ...db.models.searchIndex import SearchEntityTypeEnum
 from .users import get_current_user_dependency, get_current_admin_dependency
 
 # Configure logging
@@ -350,6 +358,10 @@ def update_moderator_status(
             detail="An error occurred while updating moderator status"
         )
 
+def _moderator_user_name(user: Optional[User]) -> str:
+    # Moderator views show first names only
+    return user.first_name if user else "Unknown User"
+
 @router.get("/reports", response_model=List[ReportResponse])
 def get_reports_for_moderator(
     status_filter: Optional[str] = None,
@@ -364,60 +376,13 @@ def get_reports_for_moderator(
     Get all reports for moderator review with user details
     """
     try:
-        # Query reports
-        query = db.query(Report)
+        # Query reports with reporter, reported user, service and request eager-loaded
+        query = filter_reports(report_details_query(db), status_filter, report_type, category)
+        reports = load_report_page(query, limit, offset)
         
-        # Apply filters
-        if status_filter:
-            query = query.filter(Report.status == status_filter)
-        if report_type:
-            query = query.filter(Report.report_type == report_type)
-        if category:
-            query = query.filter(Report.category == category)
-        
-        # Order by creation date (newest first)
-        query = query.order_by(desc(Report.created_at))
-        
-        # Apply pagination
-        reports = query.offset(offset).limit(limit).all()
-        
-        # Fetch user details for each report
-        detailed_reports = []
-        for report in reports:
-            # Get reporter information
-            reporter = db.query(User).filter(User.user_id == report.reporter_id).first()
-            # Get reported user information
-            reported_user = db.query(User).filter(User.user_id == report.reported_user_id).first()
-            
-            # Create report dict matching ReportResponse schema
-            report_dict = {
-                "report_id": report.report_id,
-                "reporter_id": report.reporter_id,
-                "reported_user_id": report.reported_user_id,
-                "reported_service_id": report.reported_service_id,
-                "reported_request_id": report.reported_request_id,
-                "report_type": report.report_type,
-                "category": report.category,
-                "title": report.title,
-                "description": report.description,
-                "status": report.status,
-                "assigned_admin_id": getattr(report, 'assigned_admin_id', None),
-                "admin_notes": report.admin_notes,
-                "resolution": getattr(report, 'resolution', None),
-                "created_at": report.created_at,
-                "updated_at": report.updated_at,
-                "resolved_at": report.resolved_at,
-                # Add user names as expected by schema
-                "reporter_name": reporter.first_name if reporter else "Unknown User",
-                "reported_user_name": reported_user.first_name if reported_user else "Unknown User",
-                "service_title": None,  # TODO: Fetch service title if needed
-                "request_title": None   # TODO: Fetch request title if needed
-            }
-            detailed_reports.append(report_dict)
+        detailed_reports = [report_response(report, user_name=_moderator_user_name) for report in reports]
         
         logger.info(f"Moderator {current_moderator.moderator_id} accessed {len(detailed_reports)} reports with user details")
-        # print(detailed_reports)
-        # print("Hello")
         return detailed_reports
         
     except Exception as e:
@@ -457,6 +422,7 @@ def update_report_for_moderator(
             report.resolved_at = datetime.utcnow()
         
         db.commit()
+        invalidate_report_stats()
         db.refresh(report)
         
         logger.info(f"Moderator {current_moderator.moderator_id} updated report {report_id} to {status_update}")
@@ -482,21 +448,7 @@ def get_report_stats_for_moderator(
     Get report statistics for moderator
     """
     try:
-        total_reports = db.query(Report).count()
-        pending_reports = db.query(Report).filter(Report.status == 'pending').count()
-        under_review_reports = db.query(Report).filter(Report.status == 'under_review').count()
-        resolved_reports = db.query(Report).filter(Report.status == 'resolved').count()
-        dismissed_reports = db.query(Report).filter(Report.status == 'dismissed').count()
-        escalated_reports = db.query(Report).filter(Report.status == 'escalated').count()
-        
-        return ReportSummary(
-            total_reports=total_reports,
-            pending_reports=pending_reports,
-            under_review_reports=under_review_reports,
-            resolved_reports=resolved_reports,
-            dismissed_reports=dismissed_reports,
-            escalated_reports=escalated_reports
-        )
+        return ReportSummary(**ReportAnalytics(db).summary())
         
     except Exception as e:
         logger.error(f"Error fetching report stats for moderator: {str(e)}")
@@ -550,6 +502,7 @@ def moderate_user_action(
         
         # Save the changes
         db.commit()
+        invalidate_counts(_COUNT_PREFIX)
         db.refresh(user)
         
         logger.info(f"Moderator {current_moderator.moderator_id} performed action '{action}' on user {user_id}")
@@ -574,163 +527,222 @@ def moderate_user_action(
 
 # User Management Endpoints
 
+MODERATION_PAGE_SIZE = 50
+MODERATION_MAX_PAGE_SIZE = 200
+_COUNT_PREFIX = "moderation-count"
+
+def _moderation_users_query(db: Session, status_filter: Optional[str], search: Optional[str]):
+    query = db.query(User)
+    if status_filter:
+        query = query.filter(User.status == status_filter)
+    if search:
+        search_term = f"%{search}%"
+        query = query.filter(
+            (User.first_name.ilike(search_term)) |
+            (User.last_name.ilike(search_term)) |
+            (User.email.ilike(search_term))
+        )
+    return query
+
+def _moderation_user_row(user: User) -> dict:
+    return {
+        "id": user.user_id,
+        "username": f"{user.first_name} {user.last_name}",
+        "email": user.email,
+        "first_name": user.first_name,
+        "last_name": user.last_name,
+        "status": user.status,
+        "created_at": user.date_joined,
+        "last_login": user.last_login,
+        "phone_number": user.phone_number,
+        "location": user.location,
+        "time_credits": float(user.time_credits) if user.time_credits else 0.0
+    }
+
+def _invalid_cursor() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Invalid cursor"
+    )
+
 @router.get("/users", response_model=dict)
 def get_users_for_moderation(
-    status: Optional[str] = None,
+    response: Response,
+    status_filter: Optional[str] = Query(None, alias="status"),
     search: Optional[str] = None,
+    limit: int = Query(MODERATION_PAGE_SIZE, ge=1, le=MODERATION_MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="next_cursor value from the previous page"),
+    format: Optional[str] = Query(None, description="ndjson to stream every matching user"),
+    accept: Optional[str] = Header(None),
     current_moderator = Depends(get_current_moderator),
     db: Session = Depends(get_db)
 ):
-    """Get users for moderation purposes"""
-    from ...db.models.user import User
+    """
+    Get users for moderation purposes, newest first.
+
+    Returns one page plus next_cursor (also in the X-Next-Cursor header);
+    pass it back as `cursor` for the next page. With ?format=ndjson (or
+    Accept: application/x-ndjson) every matching user is streamed instead.
+    """
+    if wants_ndjson(format, accept):
+        return ndjson_response(
+            lambda stream_db: _moderation_users_query(stream_db, status_filter, search).order_by(desc(User.user_id)),
+            _moderation_user_row
+        )
     
-    print(f"=== DEBUG: get_users_for_moderation called ===")
-    print(f"Status filter: {status}")
-    print(f"Search filter: {search}")
+    # user_id increases with date_joined and, unlike date_joined, is never NULL
+    try:
+        users, next_cursor = keyset_page(
+            _moderation_users_query(db, status_filter, search), (User.user_id,), limit,
+            cursor=cursor, types=(int,), cursor_values=lambda user: (user.user_id,)
+        )
+    except ValueError:
+        raise _invalid_cursor()
     
-    # First, let's get the total count of all users
-    total_users_count = db.query(User).count()
-    print(f"Total users in database: {total_users_count}")
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     
-    query = db.query(User)
+    return {
+        "users": [_moderation_user_row(user) for user in users],
+        "total_count": cached_count((_COUNT_PREFIX, "users"), db.query(User)),
+        "filtered_count": cached_count(
+            (_COUNT_PREFIX, "users", status_filter, search),
+            _moderation_users_query(db, status_filter, search)
+        ),
+        "next_cursor": next_cursor
+    }
+
+# Content Management Endpoints
+
+def _moderation_services_query(db: Session, status_filter: Optional[str], search: Optional[str]):
+    query = db.query(Service).join(User, Service.creator_id == User.user_id).options(contains_eager(Service.creator))
     
-    if status:
-        print(f"Filtering by status: {status}")
-        query = query.filter(User.status == status)
+    if status_filter:
+        query = query.filter(Service.status == status_filter)
     
     if search:
-        search_term = f"%{search}%"
+        # Served by the search_terms index instead of a leading-wildcard ILIKE scan
         query = query.filter(
-            (User.first_name.ilike(search_term)) |
-            (User.last_name.ilike(search_term)) |
-            (User.email.ilike(search_term))
+            SearchEngine(db).match_filter(search, SearchEntityTypeEnum.service, match_creator=True)
         )
+    return query
+
+def _moderation_service_row(service: Service) -> dict:
+    return {
+        "id": service.service_id,
+        "type": "service",
+        "title": service.title,
+        "description": service.description,
+        "status": service.status,
+        "creator_name": f"{service.creator.first_name} {service.creator.last_name}",
+        "created_at": service.created_at,
+        "category": service.category,
+        "location": service.location
+    }
+
+def _moderation_requests_query(db: Session, status_filter: Optional[str], search: Optional[str]):
+    query = db.query(Request).join(User, Request.creator_id == User.user_id).options(contains_eager(Request.creator))
     
-    users = query.order_by(desc(User.date_joined)).all()
-    print(f"Query returned {len(users)} users")
-    
-    # Let's also check what statuses exist in the database
-    all_statuses = db.query(User.status).distinct().all()
-    print(f"Available user statuses in database: {[status[0] for status in all_statuses]}")
-    
-    result_users = []
-    for user in users:
-        result_users.append({
-            "id": user.user_id,
-            "username": f"{user.first_name} {user.last_name}",
-            "email": user.email,
-            "first_name": user.first_name,
-            "last_name": user.last_name,
-            "status": user.status,
-            "created_at": user.date_joined,
-            "last_login": user.last_login,
-            "phone_number": user.phone_number,
-            "location": user.location,
-            "time_credits": float(user.time_credits) if user.time_credits else 0.0
-        })
+    if status_filter:
+        query = query.filter(Request.status == status_filter)
     
-    # Return both the users and the total count
-    response = {
-        "users": result_users,
-        "total_count": total_users_count,
-        "filtered_count": len(result_users)
+    if search:
+        # Served by the search_terms index instead of a leading-wildcard ILIKE scan
+        query = query.filter(
+            SearchEngine(db).match_filter(search, SearchEntityTypeEnum.request, match_creator=True)
+        )
+    return query
+
+def _moderation_request_row(request: Request) -> dict:
+    return {
+        "id": request.request_id,
+        "type": "request",
+        "title": request.title,
+        "description": request.description,
+        "status": request.status,
+        "creator_name": f"{request.creator.first_name} {request.creator.last_name}",
+        "created_at": request.created_at,
+        "category": request.category,
+        "location": request.location,
+        "budget": str(request.budget) if request.budget else None
     }
+
+def _content_listing(
+    model, id_column, build_query, serialize, entity: str,
+    response: Response, status_filter, search, limit, cursor, format, accept, db: Session
+):
+    """Shared body of the service and request moderation listings"""
+    if wants_ndjson(format, accept):
+        return ndjson_response(
+            lambda stream_db: build_query(stream_db, status_filter, search).order_by(
+                desc(model.created_at), desc(id_column)
+            ),
+            serialize
+        )
     
-    print(f"Returning {len(result_users)} filtered users out of {total_users_count} total users")
-    print("=== END DEBUG ===")
+    try:
+        rows, next_cursor = keyset_page(
+            build_query(db, status_filter, search), (model.created_at, id_column), limit,
+            cursor=cursor, types=(datetime, int),
+            cursor_values=lambda row: (row.created_at, getattr(row, id_column.key))
+        )
+    except ValueError:
+        raise _invalid_cursor()
     
-    return response
-
-# Content Management Endpoints
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    response.headers["X-Total-Count"] = str(cached_count(
+        (_COUNT_PREFIX, entity, status_filter, search),
+        build_query(db, status_filter, search)
+    ))
+    
+    return [serialize(row) for row in rows]
 
 @router.get("/services", response_model=List[dict])
 def get_services_for_moderation(
-    status: Optional[str] = None,
+    response: Response,
+    status_filter: Optional[str] = Query(None, alias="status"),
     search: Optional[str] = None,
+    limit: int = Query(MODERATION_PAGE_SIZE, ge=1, le=MODERATION_MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
+    format: Optional[str] = Query(None, description="ndjson to stream every matching service"),
+    accept: Optional[str] = Header(None),
     current_moderator = Depends(get_current_moderator),
     db: Session = Depends(get_db)
 ):
-    """Get services for content moderation"""
-    from ...db.models.service import Service
-    from ...db.models.user import User
-    
-    query = db.query(Service).join(User, Service.creator_id == User.user_id)
-    
-    if status:
-        query = query.filter(Service.status == status)
-    
-    if search:
-        search_term = f"%{search}%"
-        query = query.filter(
-            (Service.title.ilike(search_term)) |
-            (Service.description.ilike(search_term)) |
-            (User.first_name.ilike(search_term)) |
-            (User.last_name.ilike(search_term)) |
-            (User.email.ilike(search_term))
-        )
-    
-    services = query.order_by(desc(Service.created_at)).all()
-    
-    result = []
-    for service in services:
-        result.append({
-            "id": service.service_id,
-            "type": "service",
-            "title": service.title,
-            "description": service.description,
-            "status": service.status,
-            "creator_name": f"{service.creator.first_name} {service.creator.last_name}",
-            "created_at": service.created_at,
-            "category": service.category,
-            "location": service.location
-        })
-    
-    return result
+    """
+    Get services for content moderation, newest first.
+
+    One page per call; the X-Next-Cursor header continues the listing and
+    X-Total-Count holds the (briefly cached) number of matches.
+    ?format=ndjson streams every match instead.
+    """
+    return _content_listing(
+        Service, Service.service_id, _moderation_services_query, _moderation_service_row, "services",
+        response, status_filter, search, limit, cursor, format, accept, db
+    )
 
 @router.get("/requests", response_model=List[dict])
 def get_requests_for_moderation(
-    status: Optional[str] = None,
+    response: Response,
+    status_filter: Optional[str] = Query(None, alias="status"),
     search: Optional[str] = None,
+    limit: int = Query(MODERATION_PAGE_SIZE, ge=1, le=MODERATION_MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
+    format: Optional[str] = Query(None, description="ndjson to stream every matching request"),
+    accept: Optional[str] = Header(None),
     current_moderator = Depends(get_current_moderator),
     db: Session = Depends(get_db)
 ):
-    """Get requests for content moderation"""
-    from ...db.models.request import Request
-    from ...db.models.user import User
-    
-    query = db.query(Request).join(User, Request.creator_id == User.user_id)
-    
-    if status:
-        query = query.filter(Request.status == status)
-    
-    if search:
-        search_term = f"%{search}%"
-        query = query.filter(
-            (Request.title.ilike(search_term)) |
-            (Request.description.ilike(search_term)) |
-            (User.first_name.ilike(search_term)) |
-            (User.last_name.ilike(search_term)) |
-            (User.email.ilike(search_term))
-        )
-    
-    requests = query.order_by(desc(Request.created_at)).all()
-    
-    result = []
-    for request in requests:
-        result.append({
-            "id": request.request_id,
-            "type": "request",
-            "title": request.title,
-            "description": request.description,
-            "status": request.status,
-            "creator_name": f"{request.creator.first_name} {request.creator.last_name}",
-            "created_at": request.created_at,
-            "category": request.category,
-            "location": request.location,
-            "budget": str(request.budget) if request.budget else None
-        })
-    
-    return result
+    """
+    Get requests for content moderation, newest first.
+
+    Paged and streamed the same way as /services.
+    """
+    return _content_listing(
+        Request, Request.request_id, _moderation_requests_query, _moderation_request_row, "requests",
+        response, status_filter, search, limit, cursor, format, accept, db
+    )
 
 @router.put("/services/{service_id}")
 def moderate_service(
@@ -751,8 +763,11 @@ def moderate_service(
         )
     
     if action == "delete":
+        SearchEngine(db).remove(SearchEntityTypeEnum.service, service_id)
         db.delete(service)
         db.commit()
+        invalidate_counts(_COUNT_PREFIX)
+        invalidate_response_cache("services", f"service:{service_id}")
         logger.info(f"Moderator {current_moderator.moderator_id} deleted service {service_id}")
         return {"message": "Service deleted successfully"}
     
@@ -771,6 +786,8 @@ def moderate_service(
     
     service.status = status_mapping[action]
     db.commit()
+    invalidate_counts(_COUNT_PREFIX)
+    invalidate_response_cache("services", f"service:{service_id}")
     db.refresh(service)
     
     logger.info(f"Moderator {current_moderator.moderator_id} updated service {service_id} status to {service.status}")
@@ -800,8 +817,11 @@ def moderate_request(
         )
     
     if action == "delete":
+        SearchEngine(db).remove(SearchEntityTypeEnum.request, request_id)
         db.delete(request)
         db.commit()
+        invalidate_counts(_COUNT_PREFIX)
+        invalidate_response_cache("requests", f"request:{request_id}")
         logger.info(f"Moderator {current_moderator.moderator_id} deleted request {request_id}")
         return {"message": "Request deleted successfully"}
     
@@ -820,6 +840,8 @@ def moderate_request(
     
     request.status = status_mapping[action]
     db.commit()
+    invalidate_counts(_COUNT_PREFIX)
+    invalidate_response_cache("requests", f"request:{request_id}")
     db.refresh(request)
     
     logger.info(f"Moderator {current_moderator.moderator_id} updated request {request_id} status to {request.status}")
@@ -4,7 +4,7 @@ from sqlalchemy import and_, func, desc
 from typing import List, Optional
 import logging
 
-from ...db.database import get_db
+from ...db.database import get_db, get_read_db
 from ...db.models.rating import Rating
 from ...db.models.user import User
 from ...db.models.service import Service
@@ -13,6 +13,7 @@ from ...schemas.rating import (
     RatingCreate, RatingUpdate, RatingResponse, 
     RatingListResponse, ServiceRatingStats, ProviderRatingStats
 )
+from ...core.response_cache import invalidate_response_cache
 from .users import get_current_user_dependency
 
 # Configure logging
@@ -21,6 +22,12 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+def invalidate_rating_caches(service_id: int, provider_id: int):
+    """Rating lists and stats, plus the services whose responses embed the average"""
+    invalidate_response_cache(
+        "services", f"service:{service_id}", f"ratings:service:{service_id}", f"ratings:user:{provider_id}"
+    )
+
 @router.post("/", response_model=RatingResponse)
 def create_rating(
     rating_data: RatingCreate,
@@ -103,6 +110,7 @@ def create_rating(
         db.add(new_rating)
         db.commit()
         db.refresh(new_rating)
+        invalidate_rating_caches(new_rating.service_id, new_rating.provider_id)
         
         # Get additional info for response
         rater = db.query(User).filter(User.user_id == current_user.user_id).first()
@@ -139,7 +147,7 @@ def get_service_ratings(
     service_id: int,
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Get all ratings for a specific service
@@ -201,7 +209,7 @@ def get_provider_ratings(
     provider_id: int,
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Get all ratings for a specific service provider
@@ -263,7 +271,7 @@ def get_provider_ratings(
 @router.get("/service/{service_id}/stats", response_model=ServiceRatingStats)
 def get_service_rating_stats(
     service_id: int,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Get rating statistics for a specific service
@@ -332,6 +340,7 @@ def update_rating(
         
         db.commit()
         db.refresh(rating)
+        invalidate_rating_caches(rating.service_id, rating.provider_id)
         
         # Get additional info for response
         rater = db.query(User).filter(User.user_id == current_user.user_id).first()
@@ -388,8 +397,10 @@ def delete_rating(
                 detail="Rating not found or not yours"
             )
         
+        service_id, provider_id = rating.service_id, rating.provider_id
         db.delete(rating)
         db.commit()
+        invalidate_rating_caches(service_id, provider_id)
         
         logger.info(f"Rating deleted: {rating_id}")
         return {"message": "Rating deleted successfully"}
@@ -407,7 +418,7 @@ def delete_rating(
 @router.get("/provider/{provider_id}/stats", response_model=ProviderRatingStats)
 def get_provider_rating_stats(
     provider_id: int,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Get rating statistics for a specific service provider
@@ -4,13 +4,17 @@ from sqlalchemy import and_, or_, desc
 from typing import List, Optional
 from datetime import datetime
 
-from ...db.database import get_db
+from ...db.database import get_db, get_read_db
 from ...db.models.report import Report
 from ...db.models.user import User
 from ...db.models.service import Service
 from ...db.models.request import Request
 from ...db.models.admin import Admin
 from ...schemas.report import ReportCreate, ReportResponse, ReportUpdate, ReportSummary, ReportStats
+from ...core.report_analytics import ReportAnalytics, invalidate_report_stats
+from ...core.report_queries import (
+    report_details_query, filter_reports, load_report_page, load_report, report_response
+)
 from .users import get_current_user_dependency, get_current_admin_dependency
 
 router = APIRouter(tags=["reports"])
@@ -105,6 +109,7 @@ async def create_report(
     
     db.add(db_report)
     db.commit()
+    invalidate_report_stats()
     db.refresh(db_report)
     
     return await get_report_with_details(db_report.report_id, db)
@@ -121,7 +126,7 @@ async def get_reports(
 ):
     """Get reports (admin only or user's own reports)"""
     
-    query = db.query(Report)
+    query = report_details_query(db)
     
     # For regular users, only show their own reports
     if not is_admin(current_user):
@@ -133,24 +138,12 @@ async def get_reports(
         )
     
     # Apply filters
-    if status_filter:
-        query = query.filter(Report.status == status_filter)
-    if report_type:
-        query = query.filter(Report.report_type == report_type)
-    if category:
-        query = query.filter(Report.category == category)
+    query = filter_reports(query, status_filter, report_type, category)
     
-    # Order by creation date (newest first)
-    query = query.order_by(desc(Report.created_at))
+    # Newest first page; related users/services/requests come in one IN-query each
+    reports = load_report_page(query, limit, offset)
     
-    # Apply pagination
-    reports = query.offset(offset).limit(limit).all()
-    
-    # Get detailed information for each report
-    detailed_reports = []
-    for report in reports:
-        detailed_report = await get_report_with_details(report.report_id, db)
-        detailed_reports.append(detailed_report)
+    detailed_reports = [ReportResponse(**report_response(report)) for report in reports]
     
     return detailed_reports
 
@@ -209,13 +202,14 @@ async def update_report(
         report.resolved_at = datetime.utcnow()
     
     db.commit()
+    invalidate_report_stats()
     db.refresh(report)
     
     return await get_report_with_details(report_id, db)
 
 @router.get("/stats/summary", response_model=ReportSummary)
 async def get_report_summary(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user_dependency)
 ):
     """Get report summary statistics (admin only)"""
@@ -226,21 +220,7 @@ async def get_report_summary(
             detail="Only admins can view report statistics"
         )
     
-    total_reports = db.query(Report).count()
-    pending_reports = db.query(Report).filter(Report.status == 'pending').count()
-    under_review_reports = db.query(Report).filter(Report.status == 'under_review').count()
-    resolved_reports = db.query(Report).filter(Report.status == 'resolved').count()
-    dismissed_reports = db.query(Report).filter(Report.status == 'dismissed').count()
-    escalated_reports = db.query(Report).filter(Report.status == 'escalated').count()
-    
-    return ReportSummary(
-        total_reports=total_reports,
-        pending_reports=pending_reports,
-        under_review_reports=under_review_reports,
-        resolved_reports=resolved_reports,
-        dismissed_reports=dismissed_reports,
-        escalated_reports=escalated_reports
-    )
+    return ReportSummary(**ReportAnalytics(db).summary())
 
 @router.get("/user/{user_id}/stats", response_model=ReportStats)
 async def get_user_report_stats(
@@ -260,13 +240,13 @@ async def get_user_report_stats(
     reports_made_count = db.query(Report).filter(Report.reporter_id == user_id).count()
     reports_received_count = db.query(Report).filter(Report.reported_user_id == user_id).count()
     
-    # Get recent reports (last 5)
-    recent_reports_made = db.query(Report).filter(Report.reporter_id == user_id).order_by(desc(Report.created_at)).limit(5).all()
-    recent_reports_received = db.query(Report).filter(Report.reported_user_id == user_id).order_by(desc(Report.created_at)).limit(5).all()
+    # Get recent reports (last 5) with their related rows eager-loaded
+    recent_reports_made = load_report_page(report_details_query(db).filter(Report.reporter_id == user_id), limit=5)
+    recent_reports_received = load_report_page(report_details_query(db).filter(Report.reported_user_id == user_id), limit=5)
     
     # Convert to detailed responses
-    detailed_made = [await get_report_with_details(r.report_id, db) for r in recent_reports_made]
-    detailed_received = [await get_report_with_details(r.report_id, db) for r in recent_reports_received]
+    detailed_made = [ReportResponse(**report_response(r)) for r in recent_reports_made]
+    detailed_received = [ReportResponse(**report_response(r)) for r in recent_reports_received]
     
     return ReportStats(
         user_id=user_id,
@@ -303,31 +283,11 @@ async def get_weekly_reports_stats(
                 detail="Invalid date format. Use YYYY-MM-DD"
             )
     
-    # Generate the weekly data based on the actual date range
-    weekly_data = []
-    days = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
-    
-    # Instead of forcing a single week, let's count reports by day of week within the date range
-    day_counts = {day: 0 for day in days}
-    
-    # Get all reports within the date range
-    reports_in_range = db.query(Report).filter(
-        Report.created_at >= start_date_obj,
-        Report.created_at <= end_date_obj + timedelta(days=1)  # Include end date
-    ).all()
-    
-    # Count reports by day of week
-    for report in reports_in_range:
-        day_of_week = report.created_at.strftime('%a')  # Get day abbreviation (Mon, Tue, etc.)
-        if day_of_week in day_counts:
-            day_counts[day_of_week] += 1
-    
-    # Create the response data
-    for day in days:
-        weekly_data.append({
-            'day': day,
-            'reports': day_counts[day]
-        })
+    # Count reports by day of week within the date range (in SQL)
+    weekly_data = ReportAnalytics(db).weekday_counts(
+        start_date_obj,
+        end_date_obj + timedelta(days=1)  # Include end date
+    )
     
     return {
         'weekly_reports': weekly_data,
@@ -348,38 +308,23 @@ async def get_reports_summary(
     
     from datetime import datetime, timedelta
     
-    # If no date range provided, get all reports
+    # If no date range provided, count all reports
+    start_date_obj = end_date_obj = None
     if start_date and end_date:
         try:
             start_date_obj = datetime.fromisoformat(start_date)
-            end_date_obj = datetime.fromisoformat(end_date)
-            
-            total_reports = db.query(Report).filter(
-                Report.created_at >= start_date_obj,
-                Report.created_at <= end_date_obj + timedelta(days=1)
-            ).count()
+            end_date_obj = datetime.fromisoformat(end_date) + timedelta(days=1)
         except ValueError:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Invalid date format. Use YYYY-MM-DD"
             )
-    else:
-        total_reports = db.query(Report).count()
     
-    # Get status breakdown
-    pending_reports = db.query(Report).filter(Report.status == 'pending').count()
-    under_review_reports = db.query(Report).filter(Report.status == 'under_review').count()
-    resolved_reports = db.query(Report).filter(Report.status == 'resolved').count()
-    dismissed_reports = db.query(Report).filter(Report.status == 'dismissed').count()
-    escalated_reports = db.query(Report).filter(Report.status == 'escalated').count()
+    # Total and status breakdown from one GROUP BY over the same range
+    summary = ReportAnalytics(db).summary(start_date_obj, end_date_obj)
     
     return {
-        'total_reports': total_reports,
-        'pending_reports': pending_reports,
-        'under_review_reports': under_review_reports,
-        'resolved_reports': resolved_reports,
-        'dismissed_reports': dismissed_reports,
-        'escalated_reports': escalated_reports,
+        **summary,
         'date_range': {
             'start_date': start_date,
             'end_date': end_date
@@ -390,47 +335,11 @@ async def get_reports_summary(
 async def get_report_with_details(report_id: int, db: Session) -> ReportResponse:
     """Get a report with all related details"""
     
-    report = db.query(Report).filter(Report.report_id == report_id).first()
+    report = load_report(db, report_id)
     if not report:
         return None
     
-    # Get related data
-    reporter = db.query(User).filter(User.user_id == report.reporter_id).first()
-    reported_user = db.query(User).filter(User.user_id == report.reported_user_id).first()
-    
-    service_title = None
-    request_title = None
-    
-    if report.reported_service_id:
-        service = db.query(Service).filter(Service.service_id == report.reported_service_id).first()
-        service_title = service.title if service else None
-    
-    if report.reported_request_id:
-        request_obj = db.query(Request).filter(Request.request_id == report.reported_request_id).first()
-        request_title = request_obj.title if request_obj else None
-    
-    return ReportResponse(
-        report_id=report.report_id,
-        reporter_id=report.reporter_id,
-        reported_service_id=report.reported_service_id,
-        reported_request_id=report.reported_request_id,
-        reported_user_id=report.reported_user_id,
-        report_type=report.report_type,
-        category=report.category,
-        title=report.title,
-        description=report.description,
-        status=report.status,
-        assigned_admin_id=report.assigned_admin_id,
-        admin_notes=report.admin_notes,
-        resolution=report.resolution,
-        created_at=report.created_at,
-        updated_at=report.updated_at,
-        resolved_at=report.resolved_at,
-        reporter_name=f"{reporter.first_name} {reporter.last_name}" if reporter else None,
-        reported_user_name=f"{reported_user.first_name} {reported_user.last_name}" if reported_user else None,
-        service_title=service_title,
-        request_title=request_title
-    )
+    return ReportResponse(**report_response(report))
 
 def is_admin(user: User) -> bool:
     """Check if user is an admin"""
@@ -10,6 +10,8 @@ from ...db.models.requestProposal import RequestProposal, ProposalStatusEnum
 from ...db.models.request import Request
 from ...db.models.user import User
 from ...schemas.requestProposal import ProposalCreate, ProposalResponse, ProposalUpdate
+from ...core.email import queue_proposal_received_email
+from ...core.fast_json import fast_json
 from .users import get_current_user_dependency
 
 # Configure logging
@@ -65,11 +67,15 @@ def create_proposal(
         )
 
         db.add(new_proposal)
+
+        # Notify the request's creator in the same transaction
+        proposer = db.query(User).filter(User.user_id == current_user.user_id).first()
+        queue_proposal_received_email(db, new_proposal, request, request.creator, proposer)
+
         db.commit()
         db.refresh(new_proposal)
 
         # Get proposer name for the response
-        proposer = db.query(User).filter(User.user_id == current_user.user_id).first()
         proposer_name = f"{proposer.first_name} {proposer.last_name}" if proposer else "Unknown"
         
         # Create response data
@@ -167,7 +173,7 @@ def get_proposals(
                 "proposer_name": proposer_name
             })
         
-        return response_proposals
+        return fast_json(ProposalResponse, response_proposals, many=True)
         
     except HTTPException:
         raise
@@ -1,13 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request as HTTPRequest, Response, status
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 import logging
 
-from ...db.database import get_db
+from ...db.database import get_db, get_async_read_db
 from ...db.models.request import Request
 from ...db.models.user import User
 from ...schemas.request import RequestCreate, RequestResponse, RequestUpdate
+from ...core.search import SearchEngine
+from ...core.tags import TagManager, request_tag_filter, request_skill_filter
+from ...core.async_queries import find_tag_id, load_users
+from ...core.response_cache import invalidate_response_cache
+from ...core.etag import conditional_get, version_stamp, weak_etag
+from ...core.fast_json import fast_json
+from ...core.geo import geocode_entity, parse_near, proximity_filter, sort_by_distance, MAX_RADIUS_KM
+from ...db.models.searchIndex import SearchEntityTypeEnum
 from .users import get_current_user_dependency
 
 # Configure logging
@@ -16,6 +26,11 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+def request_stamp_query(requests):
+    """Version stamp query for the requests in ``requests`` (a subquery) and their creators"""
+    creators = select(func.coalesce(func.sum(User.version), 0)).where(User.user_id.in_(select(requests.c.creator_id)))
+    return select(*version_stamp(requests.c.request_id, requests.c.version), creators.scalar_subquery())
+
 @router.post("/", response_model=RequestResponse, status_code=status.HTTP_201_CREATED)
 def create_request(
     request_data: RequestCreate, 
@@ -52,9 +67,20 @@ def create_request(
             skills=skills_string
         )
 
+        geocode_entity(new_request, request_data.latitude, request_data.longitude)
+
         db.add(new_request)
+        tag_manager = TagManager(db)
+        tag_manager.set_request_tags(new_request, request_data.tags)
+        tag_manager.set_request_skills(new_request, request_data.skills)
+        db.flush()
+
+        # Index in the same transaction so search never sees a half-written request
+        SearchEngine(db).index_request(new_request)
+
         db.commit()
         db.refresh(new_request)
+        invalidate_response_cache("requests")
 
         # Get creator name for the response
         creator = db.query(User).filter(User.user_id == current_user.user_id).first()
@@ -70,6 +96,8 @@ def create_request(
             "category": new_request.category,
             "budget": new_request.budget,
             "location": new_request.location,
+            "latitude": float(new_request.latitude) if new_request.latitude is not None else None,
+            "longitude": float(new_request.longitude) if new_request.longitude is not None else None,
             "deadline": new_request.deadline,
             "urgency": new_request.urgency,
             "whats_included": new_request.whats_included,
@@ -97,82 +125,120 @@ def create_request(
         )
 
 @router.get("/", response_model=List[RequestResponse])
-def get_requests(
+async def get_requests(
+    http_request: HTTPRequest,
+    response: Response,
     skip: int = 0, 
     limit: int = 100, 
     category: str = None,
     urgency: str = None,
     exclude_creator_id: int = None,
-    db: Session = Depends(get_db)
+    tag: str = None,
+    skill: str = None,
+    near: str = None,
+    radius_km: float = 25.0,
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """
-    Get all service requests with optional filtering
+    Get all service requests with optional filtering by category, urgency, tag and skill
     Can also exclude requests by a specific creator_id
+    With near=lat,lon only requests within radius_km are returned, nearest first
+
+    Native async: runs on the event loop, not the threadpool. Creators for
+    the page are loaded with one query. Answers 304 when If-None-Match
+    carries the current ETag, before loading the page.
     """
-    from ...db.models.user import User
-    
-    query = db.query(Request)
+    query = select(Request)
     
     if category:
-        query = query.filter(Request.category == category)
+        query = query.where(Request.category == category)
+    
+    # Tag and skill filters are served by the request_tags/request_skills indexes
+    if tag:
+        tag_id = await find_tag_id(db, tag)
+        if tag_id is None:
+            return []
+        query = query.where(request_tag_filter(tag_id))
+    if skill:
+        skill_id = await find_tag_id(db, skill)
+        if skill_id is None:
+            return []
+        query = query.where(request_skill_filter(skill_id))
     
     if urgency:
-        query = query.filter(Request.urgency == urgency)
+        query = query.where(Request.urgency == urgency)
     
     # Exclude requests by specific creator_id if provided
     if exclude_creator_id:
-        query = query.filter(Request.creator_id != exclude_creator_id)
+        query = query.where(Request.creator_id != exclude_creator_id)
+    
+    if near:
+        try:
+            latitude, longitude = parse_near(near)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        if not 0 < radius_km <= MAX_RADIUS_KM:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"radius_km must be between 0 and {MAX_RADIUS_KM:g}"
+            )
+        query = query.where(proximity_filter(Request, latitude, longitude, radius_km))
+    
+    stamp = tuple((await db.execute(request_stamp_query(query.subquery()))).one())
+    unchanged = conditional_get(http_request, response, weak_etag("requests", http_request.url.query, stamp))
+    if unchanged:
+        return unchanged
     
-    requests = query.offset(skip).limit(limit).all()
+    if near:
+        # Only rows in the geohash cells around the point are loaded, then ranked by exact distance
+        candidates = (await db.scalars(query)).all()
+        page = sort_by_distance(candidates, latitude, longitude, radius_km)[skip:skip + limit]
+    else:
+        page = [(request, None) for request in (await db.scalars(query.offset(skip).limit(limit))).all()]
+    
+    creators = await load_users(db, [request.creator_id for request, _ in page])
     
-    # Process each request to format the response correctly
     response_requests = []
-    for request in requests:
-        # Get creator name
-        creator = db.query(User).filter(User.user_id == request.creator_id).first()
-        creator_name = f"{creator.first_name} {creator.last_name}" if creator else "Unknown"
-        
-        # Debug print for user data in list endpoint
-        if creator:
-            print(f"DEBUG - Creator data for request list item {request.request_id}:")
-            print(f"  user_id: {creator.user_id}")
-            print(f"  name: {creator.first_name} {creator.last_name}")
-            print(f"  email: {creator.email}")
-            print(f"  date_joined: {creator.date_joined}")
-            print(f"  date_joined type: {type(creator.date_joined)}")
-        else:
-            print(f"DEBUG - No creator found for request {request.request_id} with creator_id {request.creator_id}")
-        
+    for request, distance_km in page:
+        creator = creators.get(request.creator_id)
         response_requests.append({
             "request_id": request.request_id,
             "creator_id": request.creator_id,
-            "creator_name": creator_name,
+            "creator_name": f"{creator.first_name} {creator.last_name}" if creator else "Unknown",
             "creator_date_joined": creator.date_joined if creator else None,
             "title": request.title,
             "description": request.description,
             "category": request.category,
             "budget": request.budget,
             "location": request.location,
+            "latitude": float(request.latitude) if request.latitude is not None else None,
+            "longitude": float(request.longitude) if request.longitude is not None else None,
             "deadline": request.deadline,
             "urgency": request.urgency,
             "whats_included": request.whats_included,
             "requirements": request.requirements,
             "tags": request.get_tags_list(),
             "skills": request.get_skills_list(),
-            "created_at": request.created_at
+            "created_at": request.created_at,
+            "distance_km": distance_km
         })
-    print(response_requests)
-    return response_requests
+    return fast_json(RequestResponse, response_requests, many=True, response=response)
 
 @router.get("/{request_id}", response_model=RequestResponse)
 def get_request(
     request_id: int, 
+    http_request: HTTPRequest,
+    response: Response,
     db: Session = Depends(get_db)
 ):
     """
-    Get a specific request by ID
+    Get a specific request by ID (304 when If-None-Match carries the current ETag)
     """
-    from ...db.models.user import User
+    stamp = tuple(db.execute(request_stamp_query(select(Request).where(Request.request_id == request_id).subquery())).one())
+    if stamp[0]:
+        unchanged = conditional_get(http_request, response, weak_etag("request", request_id, stamp))
+        if unchanged:
+            return unchanged
     
     request = db.query(Request).filter(Request.request_id == request_id).first()
     
@@ -207,6 +273,8 @@ def get_request(
         "category": request.category,
         "budget": request.budget,
         "location": request.location,
+        "latitude": float(request.latitude) if request.latitude is not None else None,
+        "longitude": float(request.longitude) if request.longitude is not None else None,
         "deadline": request.deadline,
         "urgency": request.urgency,
         "whats_included": request.whats_included,
@@ -216,7 +284,7 @@ def get_request(
         "created_at": request.created_at
     }
     
-    return response_data
+    return fast_json(RequestResponse, response_data, response=response)
 
 @router.put("/{request_id}", response_model=RequestResponse)
 def update_request(
@@ -264,17 +332,27 @@ def update_request(
     if request_data.requirements is not None:
         request.requirements = request_data.requirements
     
+    # Re-geocode when the location or coordinates change
+    if request_data.latitude is not None and request_data.longitude is not None:
+        geocode_entity(request, request_data.latitude, request_data.longitude)
+    elif request_data.location is not None:
+        geocode_entity(request)
+    
     # Update tags if provided
     if request_data.tags is not None:
         request.tags = ",".join(request_data.tags) if request_data.tags else None
+        TagManager(db).set_request_tags(request, request_data.tags)
     
     # Update skills if provided
     if request_data.skills is not None:
         request.skills = ",".join(request_data.skills) if request_data.skills else None
+        TagManager(db).set_request_skills(request, request_data.skills)
     
     try:
+        SearchEngine(db).index_request(request)
         db.commit()
         db.refresh(request)
+        invalidate_response_cache("requests", f"request:{request_id}")
         
         # Get creator name
         creator = db.query(User).filter(User.user_id == request.creator_id).first()
@@ -290,6 +368,8 @@ def update_request(
             "category": request.category,
             "budget": request.budget,
             "location": request.location,
+            "latitude": float(request.latitude) if request.latitude is not None else None,
+            "longitude": float(request.longitude) if request.longitude is not None else None,
             "deadline": request.deadline,
             "urgency": request.urgency,
             "whats_included": request.whats_included,
@@ -334,8 +414,10 @@ def delete_request(
         )
     
     try:
+        SearchEngine(db).remove(SearchEntityTypeEnum.request, request.request_id)
         db.delete(request)
         db.commit()
+        invalidate_response_cache("requests", f"request:{request_id}")
         return None
     except Exception as e:
         db.rollback()
@@ -0,0 +1,80 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from typing import Optional
+import logging
+
+from ...db.database import get_db
+from ...db.models.searchIndex import SearchEntityTypeEnum
+from ...db.models.service import ServiceStatusEnum
+from ...core.search import SearchEngine
+from ...schemas.search import SearchResponse
+from .moderators import get_current_moderator
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+@router.get("/", response_model=SearchResponse)
+def search(
+    q: str = Query(..., min_length=1, max_length=200, description="Search text; every word is prefix-matched"),
+    type: Optional[SearchEntityTypeEnum] = Query(None, description="Restrict to services or requests"),
+    category: Optional[str] = None,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db)
+):
+    """
+    Ranked search over active services and requests (title, description, tags and skills)
+    """
+    results, total_count = SearchEngine(db).search(
+        q,
+        entity_type=type,
+        category=category,
+        statuses=[ServiceStatusEnum.active.value],
+        skip=skip,
+        limit=limit
+    )
+
+    return {
+        "query": q,
+        "results": results,
+        "total_count": total_count,
+        "skip": skip,
+        "limit": limit
+    }
+
+@router.get("/moderation", response_model=SearchResponse)
+def search_for_moderation(
+    q: str = Query(..., min_length=1, max_length=200),
+    type: Optional[SearchEntityTypeEnum] = None,
+    category: Optional[str] = None,
+    status: Optional[ServiceStatusEnum] = Query(None, description="active, suspended or closed; all statuses when omitted"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    current_moderator = Depends(get_current_moderator),
+    db: Session = Depends(get_db)
+):
+    """
+    Moderator search: includes every status and also matches creator name/email prefixes
+    """
+    results, total_count = SearchEngine(db).search(
+        q,
+        entity_type=type,
+        category=category,
+        statuses=[status.value] if status else None,
+        skip=skip,
+        limit=limit,
+        match_creator=True
+    )
+
+    logger.info(f"Moderator {current_moderator.moderator_id} searched for '{q}' ({total_count} matches)")
+
+    return {
+        "query": q,
+        "results": results,
+        "total_count": total_count,
+        "skip": skip,
+        "limit": limit
+    }
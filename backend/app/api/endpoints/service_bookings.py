@@ -1,17 +1,25 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy.orm import Session, aliased, selectinload
 from sqlalchemy.exc import IntegrityError
-from typing import List
+from sqlalchemy import and_, func, or_, select
+from typing import List, Optional, Tuple
+import base64
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta
 
 from ...db.database import get_db
 from ...db.models.serviceBooking import ServiceBooking, BookingStatusEnum
 from ...db.models.service import Service
 from ...db.models.user import User
-from ...schemas.serviceBooking import BookingCreate, BookingResponse, BookingUpdate
+from ...schemas.serviceBooking import BookingCreate, BookingResponse, BookingUpdate, BookingAvailabilityResponse
 from ...core.credit_manager import CreditManager, InsufficientCreditsError
+from ...core.scheduling import (
+    SchedulingEngine, BookingConflictError, BLOCKING_STATUSES, MAX_AVAILABILITY_RANGE_DAYS, to_naive_utc
+)
 from ...db.models.timeTransaction import ReferenceTypeEnum
+from ...core.email import queue_booking_confirmed_email
+from ...core.etag import conditional_get, version_stamp, weak_etag
+from ...core.fast_json import fast_json
 from .users import get_current_user_dependency
 
 # Configure logging
@@ -20,6 +28,78 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+def full_name(user: Optional[User]) -> str:
+    return f"{user.first_name} {user.last_name}" if user else "Unknown"
+
+def format_booking_response(booking: ServiceBooking) -> dict:
+    """
+    Format a booking for response. Uses the service/user relationships, so
+    callers listing many bookings should eager-load them.
+    """
+    service = booking.service
+    return {
+        "booking_id": booking.booking_id,
+        "service_id": booking.service_id,
+        "user_id": booking.user_id,
+        "creator_id": service.creator_id if service else None,  # Keep for backward compatibility
+        "scheduled_datetime": booking.scheduled_datetime,
+        "end_datetime": booking.end_datetime,
+        "duration_minutes": booking.duration_minutes,
+        "message": booking.message,
+        "time_credits_used": booking.time_credits_used,
+        "status": booking.status,
+        "booking_date": booking.booking_date,
+        "booker_name": full_name(booking.user),
+        "service_provider_name": full_name(service.creator) if service else "Unknown",
+        "service_title": service.title if service else "Unknown Service"
+    }
+
+def encode_booking_cursor(booking: ServiceBooking) -> str:
+    raw = f"{booking.scheduled_datetime.isoformat()}|{booking.booking_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_booking_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Inverse of encode_booking_cursor; raises ValueError on garbage"""
+    try:
+        scheduled, booking_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(scheduled), int(booking_id)
+    except Exception as e:
+        raise ValueError(str(e))
+
+def booking_stamp_query(owner_column, user_id: int):
+    """Version stamp query for a user's bookings on one side, with their services, bookers and providers"""
+    booker, provider = aliased(User), aliased(User)
+    return (
+        select(
+            *version_stamp(ServiceBooking.booking_id, ServiceBooking.version),
+            func.coalesce(func.sum(Service.version), 0),
+            func.coalesce(func.sum(booker.version), 0),
+            func.coalesce(func.sum(provider.version), 0),
+        )
+        .select_from(ServiceBooking)
+        .outerjoin(Service, Service.service_id == ServiceBooking.service_id)
+        .outerjoin(booker, booker.user_id == ServiceBooking.user_id)
+        .outerjoin(provider, provider.user_id == Service.creator_id)
+        .where(owner_column == user_id)
+    )
+
+def conflict_exception(error: BookingConflictError) -> HTTPException:
+    """409 response listing the clashing time ranges and the next free slots"""
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail={
+            "message": "The provider is already booked at this time",
+            "conflicts": [
+                {"start": booking.scheduled_datetime.isoformat(), "end": booking.end_datetime.isoformat()}
+                for booking in error.conflicts
+            ],
+            "suggested_slots": [
+                {"start": start.isoformat(), "end": end.isoformat()}
+                for start, end in error.suggestions
+            ]
+        }
+    )
+
 @router.post("/", response_model=BookingResponse, status_code=status.HTTP_201_CREATED)
 def create_booking(
     booking_data: BookingCreate, 
@@ -49,40 +129,18 @@ def create_booking(
             status=BookingStatusEnum.pending
         )
 
+        # Locks the provider's calendar and rejects overlapping bookings
+        SchedulingEngine(db).reserve(new_booking, service)
+
         db.add(new_booking)
         db.commit()
         db.refresh(new_booking)
 
-        # Get booker name (person making the booking)
-        booker = db.query(User).filter(User.user_id == current_user.user_id).first()
-        booker_name = f"{booker.first_name} {booker.last_name}" if booker else "Unknown"
-        
-        # Get service provider name (person who created the service)
-        service_provider = db.query(User).filter(User.user_id == service.creator_id).first()
-        service_provider_name = f"{service_provider.first_name} {service_provider.last_name}" if service_provider else "Unknown"
-        
-        # Get service title for the response
-        service_title = service.title if service else "Unknown Service"
-        
-        # Create response data
-        response_data = {
-            "booking_id": new_booking.booking_id,
-            "service_id": new_booking.service_id,
-            "user_id": new_booking.user_id,
-            "scheduled_datetime": new_booking.scheduled_datetime,
-            "duration_minutes": new_booking.duration_minutes,
-            "message": new_booking.message,
-            "time_credits_used": new_booking.time_credits_used,
-            "status": new_booking.status,
-            "booking_date": new_booking.booking_date,
-            "booker_name": booker_name,
-            "service_provider_name": service_provider_name,
-            "service_title": service_title,
-            "creator_id": service.creator_id  # Keep this for backward compatibility
-        }
-
-        return response_data
+        return format_booking_response(new_booking)
 
+    except BookingConflictError as e:
+        db.rollback()
+        raise conflict_exception(e)
     except IntegrityError as e:
         db.rollback()
         logger.error(f"Database integrity error: {str(e)}")
@@ -102,61 +160,92 @@ def create_booking(
 
 @router.get("/", response_model=List[BookingResponse])
 def get_bookings(
+    request: Request,
+    response: Response,
     skip: int = 0, 
-    limit: int = 100, 
+    limit: int = Query(100, ge=1, le=200),
+    status_filter: Optional[BookingStatusEnum] = Query(None, alias="status"),
+    role: Optional[str] = Query(None, description="booker or provider; both when omitted"),
+    scheduled_from: Optional[datetime] = Query(None, alias="from"),
+    scheduled_to: Optional[datetime] = Query(None, alias="to"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
     db: Session = Depends(get_db),
     current_user = Depends(get_current_user_dependency)
 ):
     """
-    Get all bookings for the current user
+    Get bookings for the current user, as the booker and/or the provider.
+
+    Ordered by scheduled time, newest first. Pass the X-Next-Cursor response
+    header back as `cursor` to get the next page. Answers 304 when
+    If-None-Match carries the current ETag, before loading any booking.
     """
+    if role not in (None, "booker", "provider"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="role must be 'booker' or 'provider'"
+        )
+
     try:
-        # Get bookings where the user is either the service creator or the booking user
-        user_services = db.query(Service).filter(Service.creator_id == current_user.user_id).all()
-        service_ids = [service.service_id for service in user_services]
-        
-        # Query for bookings where user is either the service provider or the customer
-        bookings = db.query(ServiceBooking).filter(
-            (ServiceBooking.user_id == current_user.user_id) | 
-            (ServiceBooking.service_id.in_(service_ids))
-        ).offset(skip).limit(limit).all()
-        
-        # Process each booking to format the response correctly
-        response_bookings = []
-        for booking in bookings:
-            # Get service details
-            service = db.query(Service).filter(Service.service_id == booking.service_id).first()
-            service_title = service.title if service else "Unknown Service"
-            creator_id = service.creator_id if service else None
-            
-            # Get booker details (person who made the booking)
-            booker = db.query(User).filter(User.user_id == booking.user_id).first()
-            booker_name = f"{booker.first_name} {booker.last_name}" if booker else "Unknown"
-            
-            # Get service provider details (person who created the service)
-            if service and service.creator_id:
-                service_provider = db.query(User).filter(User.user_id == service.creator_id).first()
-                service_provider_name = f"{service_provider.first_name} {service_provider.last_name}" if service_provider else "Unknown"
-            else:
-                service_provider_name = "Unknown"
-            
-            response_bookings.append({
-                "booking_id": booking.booking_id,
-                "service_id": booking.service_id,
-                "user_id": booking.user_id,
-                "creator_id": creator_id,  # Keep for backward compatibility
-                "scheduled_datetime": booking.scheduled_datetime,
-                "duration_minutes": booking.duration_minutes,
-                "message": booking.message,
-                "time_credits_used": booking.time_credits_used,
-                "status": booking.status,
-                "booking_date": booking.booking_date,
-                "booker_name": booker_name,
-                "service_provider_name": service_provider_name,
-                "service_title": service_title
-            })
-        
-        return response_bookings
+        after = decode_booking_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+    try:
+        # One keyset query per role, each walking its own (user, scheduled_datetime, booking_id)
+        # index; a single OR across user_id/provider_id could use neither index for ordering
+        owner_columns = []
+        if role in (None, "booker"):
+            owner_columns.append(ServiceBooking.user_id)
+        if role in (None, "provider"):
+            owner_columns.append(ServiceBooking.provider_id)
+
+        stamp = tuple(
+            tuple(db.execute(booking_stamp_query(owner_column, current_user.user_id)).one())
+            for owner_column in owner_columns
+        )
+        etag = weak_etag("bookings", current_user.user_id, request.url.query, stamp)
+        unchanged = conditional_get(request, response, etag, private=True)
+        if unchanged:
+            return unchanged
+
+        fetch = limit + 1 if after else skip + limit + 1
+        merged = {}
+        for owner_column in owner_columns:
+            query = db.query(ServiceBooking).options(
+                selectinload(ServiceBooking.service).selectinload(Service.creator),
+                selectinload(ServiceBooking.user)
+            ).filter(owner_column == current_user.user_id)
+
+            if status_filter:
+                query = query.filter(ServiceBooking.status == status_filter)
+            if scheduled_from:
+                query = query.filter(ServiceBooking.scheduled_datetime >= to_naive_utc(scheduled_from))
+            if scheduled_to:
+                query = query.filter(ServiceBooking.scheduled_datetime < to_naive_utc(scheduled_to))
+            if after:
+                after_datetime, after_id = after
+                query = query.filter(or_(
+                    ServiceBooking.scheduled_datetime < after_datetime,
+                    and_(ServiceBooking.scheduled_datetime == after_datetime, ServiceBooking.booking_id < after_id)
+                ))
+
+            for booking in query.order_by(
+                ServiceBooking.scheduled_datetime.desc(), ServiceBooking.booking_id.desc()
+            ).limit(fetch).all():
+                merged[booking.booking_id] = booking
+
+        ordered = sorted(merged.values(), key=lambda b: (b.scheduled_datetime, b.booking_id), reverse=True)
+        if not after:
+            ordered = ordered[skip:]
+        page = ordered[:limit]
+
+        if len(ordered) > limit:
+            response.headers["X-Next-Cursor"] = encode_booking_cursor(page[-1])
+
+        return fast_json(BookingResponse, [format_booking_response(booking) for booking in page], many=True, response=response)
         
     except Exception as e:
         logger.error(f"Error fetching bookings: {str(e)}")
@@ -165,6 +254,48 @@ def get_bookings(
             detail=f"An error occurred while fetching bookings: {str(e)}"
         )
 
+@router.get("/availability", response_model=BookingAvailabilityResponse)
+def get_booking_availability(
+    service_id: int,
+    range_start: datetime = Query(..., alias="from"),
+    range_end: datetime = Query(..., alias="to"),
+    duration_minutes: Optional[int] = Query(None, ge=1, le=480, description="Only return windows at least this long"),
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_user_dependency)
+):
+    """
+    Free windows for a service between from and to: the service's availability
+    slots minus the provider's pending/confirmed bookings
+    """
+    service = db.query(Service).filter(Service.service_id == service_id).first()
+    if not service:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Service not found"
+        )
+
+    range_start, range_end = to_naive_utc(range_start), to_naive_utc(range_end)
+    if range_end <= range_start:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="'to' must be after 'from'"
+        )
+    if range_end - range_start > timedelta(days=MAX_AVAILABILITY_RANGE_DAYS):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Range cannot exceed {MAX_AVAILABILITY_RANGE_DAYS} days"
+        )
+
+    windows = SchedulingEngine(db).free_windows(service, range_start, range_end, min_minutes=duration_minutes or 0)
+
+    return {
+        "service_id": service.service_id,
+        "provider_id": service.creator_id,
+        "from": range_start,
+        "to": range_end,
+        "free_windows": [{"start": start, "end": end} for start, end in windows]
+    }
+
 @router.get("/{booking_id}", response_model=BookingResponse)
 def get_booking(
     booking_id: int, 
@@ -190,37 +321,7 @@ def get_booking(
             detail="You don't have permission to view this booking"
         )
     
-    # Get service title
-    service_title = service.title if service else "Unknown Service"
-    
-    # Get booker details (person who made the booking)
-    booker = db.query(User).filter(User.user_id == booking.user_id).first()
-    booker_name = f"{booker.first_name} {booker.last_name}" if booker else "Unknown"
-    
-    # Get service provider details (person who created the service)
-    if service and service.creator_id:
-        service_provider = db.query(User).filter(User.user_id == service.creator_id).first()
-        service_provider_name = f"{service_provider.first_name} {service_provider.last_name}" if service_provider else "Unknown"
-    else:
-        service_provider_name = "Unknown"
-    
-    response_data = {
-        "booking_id": booking.booking_id,
-        "service_id": booking.service_id,
-        "user_id": booking.user_id,
-        "creator_id": service.creator_id,  # Keep for backward compatibility
-        "scheduled_datetime": booking.scheduled_datetime,
-        "duration_minutes": booking.duration_minutes,
-        "message": booking.message,
-        "time_credits_used": booking.time_credits_used,
-        "status": booking.status,
-        "booking_date": booking.booking_date,
-        "booker_name": booker_name,
-        "service_provider_name": service_provider_name,
-        "service_title": service_title
-    }
-    
-    return response_data
+    return format_booking_response(booking)
 
 @router.put("/{booking_id}", response_model=BookingResponse)
 def update_booking(
@@ -256,6 +357,19 @@ def update_booking(
     if booking_data.message is not None:
         booking.message = booking_data.message
     
+    # Re-check the provider's calendar when the booking moves or becomes active again
+    target_status = booking.status
+    if booking_data.status in [e.value for e in BookingStatusEnum]:
+        target_status = BookingStatusEnum(booking_data.status)
+    rescheduled = booking_data.scheduled_datetime is not None or booking_data.duration_minutes is not None
+    reactivated = booking.status not in BLOCKING_STATUSES and target_status in BLOCKING_STATUSES
+    if rescheduled or reactivated:
+        try:
+            SchedulingEngine(db).reserve(booking, service, status=target_status)
+        except BookingConflictError as e:
+            db.rollback()
+            raise conflict_exception(e)
+    
     # Handle status changes with credit transfers
     old_status = booking.status
     if booking_data.status is not None:
@@ -316,42 +430,16 @@ def update_booking(
                 # Don't fail the status update if refund fails - log and continue
         
         booking.status = new_status
+        
+        # Let the customer know once the provider confirms
+        if new_status == BookingStatusEnum.confirmed and old_status != BookingStatusEnum.confirmed:
+            queue_booking_confirmed_email(db, booking, service, booking.user, service.creator)
     
     try:
         db.commit()
         db.refresh(booking)
         
-        # Get service title
-        service_title = service.title if service else "Unknown Service"
-        
-        # Get booker details (person who made the booking)
-        booker = db.query(User).filter(User.user_id == booking.user_id).first()
-        booker_name = f"{booker.first_name} {booker.last_name}" if booker else "Unknown"
-        
-        # Get service provider details (person who created the service)
-        if service and service.creator_id:
-            service_provider = db.query(User).filter(User.user_id == service.creator_id).first()
-            service_provider_name = f"{service_provider.first_name} {service_provider.last_name}" if service_provider else "Unknown"
-        else:
-            service_provider_name = "Unknown"
-        
-        response_data = {
-            "booking_id": booking.booking_id,
-            "service_id": booking.service_id,
-            "user_id": booking.user_id,
-            "creator_id": service.creator_id,  # Keep for backward compatibility
-            "scheduled_datetime": booking.scheduled_datetime,
-            "duration_minutes": booking.duration_minutes,
-            "message": booking.message,
-            "time_credits_used": booking.time_credits_used,
-            "status": booking.status,
-            "booking_date": booking.booking_date,
-            "booker_name": booker_name,
-            "service_provider_name": service_provider_name,
-            "service_title": service_title
-        }
-        
-        return response_data
+        return format_booking_response(booking)
         
     except Exception as e:
         db.rollback()
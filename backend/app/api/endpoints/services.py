@@ -1,14 +1,25 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, select
 from typing import List
 import logging
 
-from ...db.database import get_db
+from ...db.database import get_db, get_async_read_db
 from ...db.models.service import Service
 from ...db.models.rating import Rating
+from ...db.models.user import User
 from ...schemas.service import ServiceCreate, ServiceResponse, ServiceUpdate
+from ...core.search import SearchEngine
+from ...core.tags import TagManager, service_tag_filter
+from ...core.async_queries import find_tag_id, load_users, service_rating_stats
+from ...core.availability import encode_availability, parse_available, availability_filter
+from ...core.response_cache import invalidate_response_cache
+from ...core.etag import conditional_get, version_stamp, weak_etag
+from ...core.fast_json import fast_json
+from ...core.geo import geocode_entity, parse_near, proximity_filter, sort_by_distance, MAX_RADIUS_KM
+from ...db.models.searchIndex import SearchEntityTypeEnum
 from .users import get_current_user_dependency
 
 # Configure logging
@@ -31,63 +42,55 @@ def get_service_rating_stats(db: Session, service_id: int):
         'total_reviews': rating_stats.total_reviews if rating_stats.total_reviews else 0
     }
 
-def format_service_response(service: Service, db: Session, creator_name: str = None):
-    """
-    Format service data for response including rating statistics
-    """
-    from ...db.models.user import User
-    
-    # Map boolean fields to list for response
-    availability_map = {
-        "weekday-mornings": service.availability_weekday_morning,
-        "weekday-afternoons": service.availability_weekday_afternoon,
-        "weekday-evenings": service.availability_weekday_evening,
-        "weekend-mornings": service.availability_weekend_morning,
-        "weekend-afternoons": service.availability_weekend_afternoon,
-        "weekend-evenings": service.availability_weekend_evening,
-        "flexible": service.availability_flexible
-    }
-    
-    availability_response = [option for option, value in availability_map.items() if value]
-    
-    # Convert tags string to list
-    tags_response = []
-    if service.tags:
-        tags_response = service.tags.split(",")
-    
-    # Get rating statistics
-    rating_stats = get_service_rating_stats(db, service.service_id)
-    
-    # If creator_name is not provided, get it from the database
-    creator_date_joined = None
+def service_response(service: Service, creator, average_rating: float, total_reviews: int, creator_name: str = None):
+    """Response dict for a service whose creator and rating stats are already loaded"""
     if creator_name is None:
-        creator = db.query(User).filter(User.user_id == service.creator_id).first()
         creator_name = f"{creator.first_name} {creator.last_name}" if creator else "Unknown"
-        creator_date_joined = creator.date_joined if creator else None
-    else:
-        # If creator_name is provided, we still need to get the date_joined
-        creator = db.query(User).filter(User.user_id == service.creator_id).first()
-        creator_date_joined = creator.date_joined if creator else None
 
     return {
         "service_id": service.service_id,
         "creator_id": service.creator_id,
         "creator_name": creator_name,
-        "creator_date_joined": creator_date_joined,
+        "creator_date_joined": creator.date_joined if creator else None,
         "title": service.title,
         "description": service.description,
         "category": service.category,
         "time_credits_per_hour": service.time_credits_per_hour,
         "location": service.location,
-        "availability": availability_response,
+        "latitude": float(service.latitude) if service.latitude is not None else None,
+        "longitude": float(service.longitude) if service.longitude is not None else None,
+        "availability": service.get_availability_list(),
         "whats_included": service.whats_included,
         "requirements": service.requirements,
-        "tags": tags_response,
-        "average_rating": rating_stats['average_rating'],
-        "total_reviews": rating_stats['total_reviews'],
+        "tags": service.tags.split(",") if service.tags else [],
+        "average_rating": average_rating,
+        "total_reviews": total_reviews,
         "created_at": service.created_at
     }
 
+def service_stamp_queries(services):
+    """Version stamp queries for the services in ``services`` (a subquery), their creators and ratings"""
+    creators = select(func.coalesce(func.sum(User.version), 0)).where(User.user_id.in_(select(services.c.creator_id)))
+    return (
+        select(*version_stamp(services.c.service_id, services.c.version), creators.scalar_subquery()),
+        select(*version_stamp(Rating.rating_id, Rating.version)).where(Rating.service_id.in_(select(services.c.service_id))),
+    )
+
+def format_service_response(service: Service, db: Session, creator_name: str = None):
+    """
+    Format service data for response including rating statistics
+    """
+    from ...db.models.user import User
+    
+    # Get rating statistics
+    rating_stats = get_service_rating_stats(db, service.service_id)
+    
+    creator = db.query(User).filter(User.user_id == service.creator_id).first()
+
+    return service_response(
+        service, creator, rating_stats['average_rating'], rating_stats['total_reviews'], creator_name
+    )
+
 @router.post("/", response_model=ServiceResponse, status_code=status.HTTP_201_CREATED)
 def create_service(
     service_data: ServiceCreate, 
@@ -100,25 +103,6 @@ def create_service(
     from ...db.models.user import User
     
     try:
-        # Map availability list to individual boolean fields
-        availability_map = {
-            "weekday-mornings": "availability_weekday_morning",
-            "weekday-afternoons": "availability_weekday_afternoon",
-            "weekday-evenings": "availability_weekday_evening",
-            "weekend-mornings": "availability_weekend_morning",
-            "weekend-afternoons": "availability_weekend_afternoon",
-            "weekend-evenings": "availability_weekend_evening",
-            "flexible": "availability_flexible"
-        }
-        
-        # Create a dictionary with all availability fields set to False by default
-        availability_dict = {field: False for field in availability_map.values()}
-        
-        # Set the selected availability options to True
-        for option in service_data.availability:
-            if option in availability_map:
-                availability_dict[availability_map[option]] = True
-        
         # Convert tags list to comma-separated string if provided
         tags_string = None
         if service_data.tags:
@@ -135,12 +119,21 @@ def create_service(
             whats_included=service_data.whats_included,
             requirements=service_data.requirements,
             tags=tags_string,
-            **availability_dict
+            availability_mask=encode_availability(service_data.availability)
         )
 
+        geocode_entity(new_service, service_data.latitude, service_data.longitude)
+
         db.add(new_service)
+        TagManager(db).set_service_tags(new_service, service_data.tags)
+        db.flush()
+
+        # Index in the same transaction so search never sees a half-written service
+        SearchEngine(db).index_service(new_service)
+
         db.commit()
         db.refresh(new_service)
+        invalidate_response_cache("services")
 
         # Get creator name for the response
         creator = db.query(User).filter(User.user_id == current_user.user_id).first()
@@ -167,57 +160,113 @@ def create_service(
         )
 
 @router.get("/", response_model=List[ServiceResponse])
-def get_services(
+async def get_services(
+    request: Request,
+    response: Response,
     skip: int = 0, 
     limit: int = 100, 
     category: str = None,
     creator_id: int = None,
     exclude_creator_id: int = None,
-    db: Session = Depends(get_db)
+    tag: str = None,
+    available: str = None,
+    near: str = None,
+    radius_km: float = 25.0,
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """
-    Get all services with optional filtering by category and creator_id
+    Get all services with optional filtering by category, tag and creator_id
     Can also exclude services by a specific creator_id
+    available= takes comma-separated slots and matches services free in any of them (or flexible)
+    With near=lat,lon only services within radius_km are returned, nearest first
+
+    Native async: runs on the event loop, not the threadpool. Creators and
+    rating stats for the page are loaded with one query each. Answers 304
+    when If-None-Match carries the current ETag, before loading the page.
     """
-    from ...db.models.user import User
-    
-    query = db.query(Service)
+    query = select(Service)
     
     if category:
-        query = query.filter(Service.category == category)
+        query = query.where(Service.category == category)
+    
+    # Filter by tag through the service_tags index
+    if tag:
+        tag_id = await find_tag_id(db, tag)
+        if tag_id is None:
+            return []
+        query = query.where(service_tag_filter(tag_id))
+    
+    # Availability is one IN predicate on the indexed bitmask column
+    if available:
+        try:
+            wanted = parse_available(available)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        query = query.where(availability_filter(Service.availability_mask, wanted))
     
     # Add filter by creator_id if provided
     if creator_id:
-        query = query.filter(Service.creator_id == creator_id)
+        query = query.where(Service.creator_id == creator_id)
     
     # Exclude services by specific creator_id if provided
     if exclude_creator_id:
-        query = query.filter(Service.creator_id != exclude_creator_id)
+        query = query.where(Service.creator_id != exclude_creator_id)
+    
+    if near:
+        try:
+            latitude, longitude = parse_near(near)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        if not 0 < radius_km <= MAX_RADIUS_KM:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"radius_km must be between 0 and {MAX_RADIUS_KM:g}"
+            )
+        query = query.where(proximity_filter(Service, latitude, longitude, radius_km))
     
-    services = query.offset(skip).limit(limit).all()
+    stamp = ()
+    for stamp_query in service_stamp_queries(query.subquery()):
+        stamp += tuple((await db.execute(stamp_query)).one())
+    unchanged = conditional_get(request, response, weak_etag("services", request.url.query, stamp))
+    if unchanged:
+        return unchanged
+    
+    if near:
+        # Only rows in the geohash cells around the point are loaded, then ranked by exact distance
+        candidates = (await db.scalars(query)).all()
+        page = sort_by_distance(candidates, latitude, longitude, radius_km)[skip:skip + limit]
+    else:
+        page = [(service, None) for service in (await db.scalars(query.offset(skip).limit(limit))).all()]
+    
+    creators = await load_users(db, [service.creator_id for service, _ in page])
+    ratings = await service_rating_stats(db, [service.service_id for service, _ in page])
     
-    # Process each service to format the response correctly
     response_services = []
-    for service in services:
-        # Get creator name
-        creator = db.query(User).filter(User.user_id == service.creator_id).first()
-        creator_name = f"{creator.first_name} {creator.last_name}" if creator else "Unknown"
-        
-        # Use the helper function to format response
-        service_data = format_service_response(service, db, creator_name)
+    for service, distance_km in page:
+        average_rating, total_reviews = ratings.get(service.service_id, (0.0, 0))
+        service_data = service_response(service, creators.get(service.creator_id), average_rating, total_reviews)
+        service_data["distance_km"] = distance_km
         response_services.append(service_data)
     
-    return response_services
+    return fast_json(ServiceResponse, response_services, many=True, response=response)
 
 @router.get("/{service_id}", response_model=ServiceResponse)
 def get_service(
     service_id: int, 
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db)
 ):
     """
-    Get a specific service by ID
+    Get a specific service by ID (304 when If-None-Match carries the current ETag)
     """
-    from ...db.models.user import User
+    stamp = ()
+    for stamp_query in service_stamp_queries(select(Service).where(Service.service_id == service_id).subquery()):
+        stamp += tuple(db.execute(stamp_query).one())
+    if stamp[0]:
+        unchanged = conditional_get(request, response, weak_etag("service", service_id, stamp))
+        if unchanged:
+            return unchanged
     
     service = db.query(Service).filter(Service.service_id == service_id).first()
     
@@ -234,7 +283,7 @@ def get_service(
     # Use the helper function to format response
     response_data = format_service_response(service, db, creator_name)
     
-    return response_data
+    return fast_json(ServiceResponse, response_data, response=response)
 
 @router.put("/{service_id}", response_model=ServiceResponse)
 def update_service(
@@ -246,6 +295,8 @@ def update_service(
     """
     Update an existing service
     """
+    from ...db.models.user import User
+    
     # Get the service
     service = db.query(Service).filter(Service.service_id == service_id).first()
     
@@ -278,39 +329,26 @@ def update_service(
     if service_data.requirements is not None:
         service.requirements = service_data.requirements
     
+    # Re-geocode when the location or coordinates change
+    if service_data.latitude is not None and service_data.longitude is not None:
+        geocode_entity(service, service_data.latitude, service_data.longitude)
+    elif service_data.location is not None:
+        geocode_entity(service)
+    
     # Update tags if provided
     if service_data.tags is not None:
         service.tags = ",".join(service_data.tags) if service_data.tags else None
+        TagManager(db).set_service_tags(service, service_data.tags)
     
     # Update availability if provided
     if service_data.availability is not None:
-        # Reset all availability fields
-        service.availability_weekday_morning = False
-        service.availability_weekday_afternoon = False
-        service.availability_weekday_evening = False
-        service.availability_weekend_morning = False
-        service.availability_weekend_afternoon = False
-        service.availability_weekend_evening = False
-        service.availability_flexible = False
-        
-        # Set the selected availability options
-        availability_map = {
-            "weekday-mornings": "availability_weekday_morning",
-            "weekday-afternoons": "availability_weekday_afternoon",
-            "weekday-evenings": "availability_weekday_evening",
-            "weekend-mornings": "availability_weekend_morning",
-            "weekend-afternoons": "availability_weekend_afternoon",
-            "weekend-evenings": "availability_weekend_evening",
-            "flexible": "availability_flexible"
-        }
-        
-        for option in service_data.availability:
-            if option in availability_map:
-                setattr(service, availability_map[option], True)
+        service.availability_mask = encode_availability(service_data.availability)
     
     try:
+        SearchEngine(db).index_service(service)
         db.commit()
         db.refresh(service)
+        invalidate_response_cache("services", f"service:{service_id}")
         
         # Get creator name
         creator = db.query(User).filter(User.user_id == service.creator_id).first()
@@ -354,8 +392,10 @@ def delete_service(
         )
     
     try:
+        SearchEngine(db).remove(SearchEntityTypeEnum.service, service.service_id)
         db.delete(service)
         db.commit()
+        invalidate_response_cache("services", f"service:{service_id}", f"ratings:service:{service_id}")
         return None
     except Exception as e:
         db.rollback()
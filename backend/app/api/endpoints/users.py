@@ -1,20 +1,20 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Body
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy import func
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional, Optional
 from datetime import datetime, timedelta
 from decimal import Decimal
-from pytz import timezone
-from mysql.connector import connect, Error as MySQLError
 import logging
 
 
-from ...db.database import create_connection
-from ...db.database import get_db
+from ...db.database import get_db, get_async_db
 from ...db.models.user import User
 from ...db.models.admin import Admin
 from ...core.credit_manager import CreditManager
+from ...core.geo import geocode_entity
+from ...core.response_cache import invalidate_response_cache
 from ...schemas.user import (
     UserCreate, 
     UserResponse, 
@@ -32,7 +32,7 @@ from ...core.security import (
     create_password_reset_token,
     verify_password_reset_token
 )
-from ...core.email import send_password_reset_email
+from ...core.email import queue_password_reset_email, FRONTEND_URL
 from fastapi.security import OAuth2PasswordBearer
 
 # Configure logging
@@ -43,6 +43,11 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="users/login")
 
 router = APIRouter()
 
+def timezone(name: str):
+    """pytz.timezone, imported on first use"""
+    from pytz import timezone as pytz_timezone
+    return pytz_timezone(name)
+
 def get_current_user_dependency(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
     from ...core.security import verify_token
     credentials_exception = HTTPException(
@@ -63,6 +68,26 @@ def get_current_user_dependency(token: str = Depends(oauth2_scheme), db: Session
     
     return user
 
+async def get_current_user_async(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)):
+    """get_current_user_dependency for native async endpoints (no threadpool hop)"""
+    from ...core.security import verify_token
+
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+    email = verify_token(token)
+    if email is None:
+        raise credentials_exception
+
+    user = await db.scalar(select(User).where(User.email == email))
+    if user is None:
+        raise credentials_exception
+
+    return user
+
 def get_current_admin_dependency(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
     """Dependency to get current admin user from token"""
     from ...core.security import verify_token
@@ -131,6 +156,7 @@ def register_user(user_data: UserCreate, db: Session = Depends(get_db)):
             time_credits=0,  # Start with 10 credits
             total_credits_earned=0  # Count initial credits as earned
         )
+        geocode_entity(new_user)
 
         db.add(new_user)
         db.commit()
@@ -285,23 +311,20 @@ def forgot_password(request: ForgotPasswordRequest, db: Session = Depends(get_db
             # Update user with reset token and expiration
             user.reset_token = reset_token
             user.reset_token_expires_at = expires_at
-            db.commit()
-            
-            logger.info(f"Reset token generated and saved for user: {request.email}")
             
             # Create reset link (adjust URL based on your frontend)
-            reset_link = f"http://localhost:3000/reset-password?token={reset_token}"
+            reset_link = f"{FRONTEND_URL}/reset-password?token={reset_token}"
             
-            # Send email
-            email_sent = send_password_reset_email(
+            # Queue the email in the same transaction; the outbox worker sends it
+            queue_password_reset_email(
+                db,
                 recipient_email=user.email,
                 reset_token=reset_token,
                 reset_link=reset_link
             )
+            db.commit()
             
-            if not email_sent:
-                logger.warning(f"Failed to send email to {user.email}, but continuing...")
-                # Don't fail the request if email sending fails in development
+            logger.info(f"Reset token generated and email queued for user: {request.email}")
         else:
             logger.info(f"No user found for email: {request.email}")
         
@@ -311,6 +334,7 @@ def forgot_password(request: ForgotPasswordRequest, db: Session = Depends(get_db
         }
         
     except Exception as e:
+        db.rollback()
         logger.error(f"Error in forgot_password endpoint: {str(e)}")
         # Return success message even on error to prevent information disclosure
         return {
@@ -467,8 +491,13 @@ def update_user_profile(
             if hasattr(db_user, field):
                 setattr(db_user, field, value)
         
+        if "location" in update_data:
+            geocode_entity(db_user)
+        
         db.commit()
         db.refresh(db_user)
+        # Names and avatars are embedded in catalog responses
+        invalidate_response_cache("catalog")
         
         return db_user
         
@@ -600,6 +629,7 @@ def delete_user_admin(user_id: int, db: Session = Depends(get_db)):
         # Delete the user
         db.delete(user)
         db.commit()
+        invalidate_response_cache("catalog")
 
         return {"message": "User deleted successfully"}
 
@@ -0,0 +1,47 @@
+"""
+Batched lookups for the native async endpoints.
+
+Under asyncio a relationship can't be lazy-loaded on attribute access, so
+async handlers fetch everything a response needs up front: one IN-query per
+kind of related row for the whole page, never one query per row.
+"""
+
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..db.models.rating import Rating
+from ..db.models.tag import Tag
+from ..db.models.user import User
+from .tags import canonical_tag
+
+async def find_tag_id(db: AsyncSession, name: str) -> Optional[int]:
+    """Async TagManager.find_tag_id"""
+    canonical = canonical_tag(name)
+    if not canonical:
+        return None
+    return await db.scalar(select(Tag.tag_id).where(Tag.name == canonical))
+
+async def load_users(db: AsyncSession, user_ids: Iterable[int]) -> Dict[int, User]:
+    """{user_id: User} for every id that exists"""
+    ids = {user_id for user_id in user_ids if user_id is not None}
+    if not ids:
+        return {}
+    result = await db.scalars(select(User).where(User.user_id.in_(ids)))
+    return {user.user_id: user for user in result}
+
+async def service_rating_stats(db: AsyncSession, service_ids: Iterable[int]) -> Dict[int, Tuple[float, int]]:
+    """{service_id: (average_rating, total_reviews)}; services without ratings are absent"""
+    ids = set(service_ids)
+    if not ids:
+        return {}
+    result = await db.execute(
+        select(Rating.service_id, func.avg(Rating.rating), func.count(Rating.rating_id))
+        .where(Rating.service_id.in_(ids))
+        .group_by(Rating.service_id)
+    )
+    return {
+        service_id: (float(average) if average else 0.0, count or 0)
+        for service_id, average, count in result
+    }
@@ -0,0 +1,75 @@
+"""
+Service availability stored as a bitmask.
+
+Each availability option is one bit of ``Service.availability_mask``.
+There are only 2**7 possible masks, so decoding, slot counting and filter
+expansion are all precomputed lookup tables rather than per-row dict work.
+"""
+
+from typing import Iterable, List, Optional
+
+# API option name -> bit position. Order is the order options are returned in.
+AVAILABILITY_OPTIONS = (
+    "weekday-mornings",
+    "weekday-afternoons",
+    "weekday-evenings",
+    "weekend-mornings",
+    "weekend-afternoons",
+    "weekend-evenings",
+    "flexible",
+)
+
+AVAILABILITY_BITS = {option: 1 << position for position, option in enumerate(AVAILABILITY_OPTIONS)}
+
+FLEXIBLE_BIT = AVAILABILITY_BITS["flexible"]
+ALL_MASKS = range(1 << len(AVAILABILITY_OPTIONS))
+
+# mask -> options list / number of concrete (non-flexible) slots
+_DECODE_TABLE = tuple(
+    tuple(option for option in AVAILABILITY_OPTIONS if mask & AVAILABILITY_BITS[option])
+    for mask in ALL_MASKS
+)
+_SLOT_COUNT_TABLE = tuple(bin(mask & ~FLEXIBLE_BIT).count("1") for mask in ALL_MASKS)
+
+def encode_availability(options: Optional[Iterable[str]]) -> int:
+    """Availability option names -> bitmask; unknown names raise ValueError"""
+    mask = 0
+    for option in options or []:
+        try:
+            mask |= AVAILABILITY_BITS[option]
+        except KeyError:
+            raise ValueError(f"Invalid availability option: {option}")
+    return mask
+
+def decode_availability(mask: Optional[int]) -> List[str]:
+    """Bitmask -> availability option names"""
+    return list(_DECODE_TABLE[mask or 0])
+
+def decode_many(masks: Iterable[Optional[int]]) -> List[List[str]]:
+    """Decode a whole page of masks with table lookups only"""
+    table = _DECODE_TABLE
+    return [list(table[mask or 0]) for mask in masks]
+
+def slot_count(mask: Optional[int]) -> int:
+    """Number of concrete time slots (flexible not counted)"""
+    return _SLOT_COUNT_TABLE[mask or 0]
+
+def parse_available(value: str) -> int:
+    """Parse an available= query parameter (comma-separated option names)"""
+    options = [part.strip() for part in value.split(",") if part.strip()]
+    if not options:
+        raise ValueError("available must list at least one availability option")
+    return encode_availability(options)
+
+def matching_masks(wanted: int) -> List[int]:
+    """
+    Every stored mask that is free in at least one wanted slot; flexible
+    services match any slot. Used as ``availability_mask IN (...)`` so the
+    availability index can serve the lookup.
+    """
+    wanted |= FLEXIBLE_BIT
+    return [mask for mask in ALL_MASKS if mask & wanted]
+
+def availability_filter(column, wanted: int):
+    """SQL predicate: column's availability overlaps the wanted slots"""
+    return column.in_(matching_masks(wanted))
@@ -0,0 +1,431 @@
+"""
+Bulk import of users and services from CSV or NDJSON (partner onboarding).
+
+Rows are streamed from the upload and handled ``batch_size`` at a time:
+
+- every row is validated with the same pydantic schema the API uses
+  (UserCreate / ServiceCreate); failures are reported per line and never
+  stop the import
+- duplicate emails (within the file or already registered) are checked with
+  one IN query per batch
+- passwords are hashed in a process pool, since bcrypt is CPU-bound and
+  holds the GIL
+- users are written with one multi-row INSERT per batch and their initial
+  bonus with one batched ledger write (CreditManager.add_initial_bonuses);
+  services are flushed together, with tags resolved and search terms
+  indexed once per batch
+- each batch commits on its own, so a failure late in a file keeps the
+  earlier batches
+
+CSV cells holding lists (availability, tags) use ``;`` as the separator.
+Services name their owner with a ``creator_email`` or ``creator_id`` column.
+"""
+
+import io
+import os
+import csv
+import json
+import time
+import logging
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from decimal import Decimal
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from ..db.models.service import Service
+from ..db.models.user import User
+from ..schemas.service import ServiceCreate
+from ..schemas.user import UserCreate
+from .availability import encode_availability
+from .credit_manager import CreditManager
+from .geo import geocode_entity
+from .search import SearchEngine
+from .security import hash_password
+from .tags import TagManager, canonical_tag
+
+logger = logging.getLogger(__name__)
+
+IMPORT_ENTITIES = ("users", "services")
+IMPORT_FORMATS = ("csv", "ndjson")
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "500"))
+# 0 = one hashing process per CPU
+IMPORT_HASH_WORKERS = int(os.getenv("IMPORT_HASH_WORKERS", "0"))
+INITIAL_BONUS = Decimal('10.00')
+
+LIST_SEPARATOR = ";"
+LIST_FIELDS = ("availability", "tags")
+MAX_REPORTED_ERRORS = 1000
+
+# Columns copied from a validated UserCreate into the users table
+USER_FIELDS = ("first_name", "last_name", "email", "phone_number", "gender", "age", "location")
+
+class BulkImportError(Exception):
+    """Raised for an unknown entity or format (row problems are reported, not raised)"""
+    pass
+
+class UnknownImportError(BulkImportError):
+    """Raised for an entity that can't be imported"""
+    pass
+
+@dataclass
+class RowError:
+    line: int
+    errors: List[str]
+
+@dataclass
+class ImportReport:
+    entity: str
+    dry_run: bool = False
+    rows: int = 0
+    imported: int = 0
+    failed: int = 0
+    batches: int = 0
+    duration_seconds: float = 0.0
+    errors: List[RowError] = field(default_factory=list)
+
+    def to_dict(self) -> dict:
+        return {
+            "entity": self.entity,
+            "dry_run": self.dry_run,
+            "rows": self.rows,
+            "imported": self.imported,
+            "failed": self.failed,
+            "batches": self.batches,
+            "duration_seconds": self.duration_seconds,
+            "errors": [{"line": error.line, "errors": error.errors} for error in self.errors],
+            "errors_truncated": self.failed > len(self.errors),
+        }
+
+# ----------------------------------------------------------------------
+# Parsing
+# ----------------------------------------------------------------------
+
+# (line number, row dict or None, parse error or None)
+ParsedRow = Tuple[int, Optional[dict], Optional[str]]
+
+def detect_format(filename: Optional[str], content_type: Optional[str] = None) -> str:
+    name = (filename or "").lower()
+    if name.endswith((".ndjson", ".jsonl")) or "ndjson" in (content_type or ""):
+        return "ndjson"
+    return "csv"
+
+def _clean_csv_row(row: dict) -> dict:
+    cleaned = {}
+    for key, value in row.items():
+        if key is None:     # more cells than headers
+            continue
+        value = value.strip() if isinstance(value, str) else value
+        if value == "":
+            value = None
+        elif key in LIST_FIELDS and value is not None:
+            value = [item.strip() for item in value.split(LIST_SEPARATOR) if item.strip()]
+        cleaned[key.strip()] = value
+    return cleaned
+
+def parse_rows(stream: io.IOBase, format: str) -> Iterator[ParsedRow]:
+    """Stream rows from a binary file object without reading it all into memory"""
+    if format not in IMPORT_FORMATS:
+        raise BulkImportError(f"Invalid format. Must be one of: {', '.join(IMPORT_FORMATS)}")
+    return _iter_rows(stream, format)
+
+def _iter_rows(stream: io.IOBase, format: str) -> Iterator[ParsedRow]:
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    try:
+        if format == "csv":
+            reader = csv.DictReader(text)
+            for row in reader:
+                yield reader.line_num, _clean_csv_row(row), None
+            return
+        for line_number, line in enumerate(text, 1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as e:
+                yield line_number, None, f"Invalid JSON: {e}"
+                continue
+            if not isinstance(row, dict):
+                yield line_number, None, "Each line must be a JSON object"
+                continue
+            yield line_number, row, None
+    finally:
+        text.detach()       # leave closing the underlying file to its owner
+
+def _validation_messages(error: ValidationError) -> List[str]:
+    return [f"{'.'.join(str(part) for part in item['loc'])}: {item['msg']}" for item in error.errors()]
+
+def _batches(rows: Iterable[ParsedRow], size: int) -> Iterator[List[ParsedRow]]:
+    iterator = iter(rows)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+# ----------------------------------------------------------------------
+# Importer
+# ----------------------------------------------------------------------
+
+class BulkImporter:
+    """Validates and writes one import file, batch by batch"""
+
+    def __init__(
+        self,
+        db: Session,
+        entity: str,
+        batch_size: int = IMPORT_BATCH_SIZE,
+        hash_workers: int = IMPORT_HASH_WORKERS,
+        dry_run: bool = False,
+        initial_bonus: Decimal = INITIAL_BONUS,
+        max_reported_errors: Optional[int] = MAX_REPORTED_ERRORS
+    ):
+        if entity not in IMPORT_ENTITIES:
+            raise UnknownImportError(f"Unknown import '{entity}'. Must be one of: {', '.join(IMPORT_ENTITIES)}")
+        self.db = db
+        self.entity = entity
+        self.batch_size = max(1, batch_size)
+        self.hash_workers = hash_workers or os.cpu_count() or 1
+        self.dry_run = dry_run
+        self.initial_bonus = initial_bonus
+        self.max_reported_errors = max_reported_errors     # None keeps every rejected line
+        self.report = ImportReport(entity=entity, dry_run=dry_run)
+        self._seen_emails = set()
+
+    def run(self, rows: Iterable[ParsedRow]) -> ImportReport:
+        started = time.perf_counter()
+        with self._hash_pool() as executor:
+            for batch in _batches(rows, self.batch_size):
+                self.report.rows += len(batch)
+                self.report.batches += 1
+                if self.entity == "users":
+                    self._import_users(batch, executor)
+                else:
+                    self._import_services(batch)
+        self.report.errors.sort(key=lambda error: error.line)
+        self.report.duration_seconds = round(time.perf_counter() - started, 2)
+        logger.info(
+            f"Imported {self.report.imported}/{self.report.rows} {self.entity} "
+            f"({self.report.failed} failed) in {self.report.duration_seconds}s"
+        )
+        return self.report
+
+    @contextmanager
+    def _hash_pool(self) -> Iterator[Optional[Executor]]:
+        if self.entity != "users" or self.dry_run or self.hash_workers <= 1:
+            yield None
+            return
+        # spawn: forking a threaded server process (DB pool, event loop) is unsafe
+        executor = ProcessPoolExecutor(
+            max_workers=self.hash_workers, mp_context=multiprocessing.get_context("spawn")
+        )
+        try:
+            yield executor
+        finally:
+            executor.shutdown()
+
+    def _fail(self, line: int, errors: List[str]) -> None:
+        self.report.failed += 1
+        if self.max_reported_errors is None or len(self.report.errors) < self.max_reported_errors:
+            self.report.errors.append(RowError(line=line, errors=errors))
+
+    # ------------------------------------------------------------------
+    # Users
+    # ------------------------------------------------------------------
+
+    def _validate_users(self, batch: List[ParsedRow]) -> List[Tuple[int, UserCreate]]:
+        valid = []
+        for line, row, parse_error in batch:
+            if parse_error:
+                self._fail(line, [parse_error])
+                continue
+            try:
+                user = UserCreate(**row)
+            except ValidationError as e:
+                self._fail(line, _validation_messages(e))
+                continue
+            if user.email in self._seen_emails:
+                self._fail(line, ["email: Duplicate email in this file"])
+                continue
+            self._seen_emails.add(user.email)
+            valid.append((line, user))
+
+        if valid:
+            emails = [user.email for _, user in valid]
+            registered = {email for (email,) in self.db.query(User.email).filter(User.email.in_(emails))}
+            if registered:
+                for line, user in valid:
+                    if user.email in registered:
+                        self._fail(line, ["email: Email already registered"])
+                valid = [(line, user) for line, user in valid if user.email not in registered]
+        return valid
+
+    def _user_row(self, user: UserCreate, password_hash: str) -> dict:
+        entity = User(**{name: getattr(user, name) for name in USER_FIELDS})
+        geocode_entity(entity)
+        row = {name: getattr(entity, name) for name in USER_FIELDS + ("latitude", "longitude", "geohash")}
+        row.update(password_hash=password_hash, time_credits=0, total_credits_earned=0)
+        return row
+
+    def _import_users(self, batch: List[ParsedRow], executor: Optional[Executor]) -> None:
+        valid = self._validate_users(batch)
+        if not valid:
+            return
+        if self.dry_run:
+            self.report.imported += len(valid)
+            return
+
+        passwords = [user.password for _, user in valid]
+        if executor:
+            chunksize = max(1, len(passwords) // (self.hash_workers * 4))
+            hashes = list(executor.map(hash_password, passwords, chunksize=chunksize))
+        else:
+            hashes = [hash_password(password) for password in passwords]
+        rows = [(line, self._user_row(user, password_hash)) for (line, user), password_hash in zip(valid, hashes)]
+
+        try:
+            self.db.execute(insert(User), [row for _, row in rows])
+            self._grant_bonuses([row["email"] for _, row in rows])
+            self.db.commit()
+            self.report.imported += len(rows)
+        except IntegrityError:
+            # Someone registered one of these emails since the check; retry row by row to find it
+            self.db.rollback()
+            self._insert_users_one_by_one(rows)
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            logger.error(f"User import batch failed: {str(e)}")
+            for line, _ in rows:
+                self._fail(line, [f"Database error: {e.__class__.__name__}"])
+
+    def _insert_users_one_by_one(self, rows: List[Tuple[int, dict]]) -> None:
+        for line, row in rows:
+            try:
+                self.db.execute(insert(User), [row])
+                self._grant_bonuses([row["email"]])
+                self.db.commit()
+                self.report.imported += 1
+            except IntegrityError:
+                self.db.rollback()
+                self._fail(line, ["email: Email already registered"])
+            except SQLAlchemyError as e:
+                self.db.rollback()
+                self._fail(line, [f"Database error: {e.__class__.__name__}"])
+
+    def _grant_bonuses(self, emails: List[str]) -> None:
+        if not self.initial_bonus:
+            return
+        user_ids = [user_id for (user_id,) in self.db.query(User.user_id).filter(User.email.in_(emails))]
+        CreditManager(self.db).add_initial_bonuses(user_ids, amount=self.initial_bonus)
+
+    # ------------------------------------------------------------------
+    # Services
+    # ------------------------------------------------------------------
+
+    def _resolve_creators(self, rows: List[Tuple[int, dict]]) -> Dict[Tuple[str, object], int]:
+        """{("email", value) | ("id", value): user_id} with one query per key kind"""
+        emails = {row["creator_email"] for _, row in rows if row.get("creator_email")}
+        ids = set()
+        for _, row in rows:
+            if row.get("creator_id") is not None:
+                try:
+                    ids.add(int(row["creator_id"]))
+                except (TypeError, ValueError):
+                    pass
+
+        creators = {}
+        if emails:
+            for user_id, email in self.db.query(User.user_id, User.email).filter(User.email.in_(emails)):
+                creators[("email", email)] = user_id
+        if ids:
+            for (user_id,) in self.db.query(User.user_id).filter(User.user_id.in_(ids)):
+                creators[("id", user_id)] = user_id
+        return creators
+
+    def _creator_for(self, row: dict, creators: Dict[Tuple[str, object], int]) -> Tuple[Optional[int], Optional[str]]:
+        if row.get("creator_email"):
+            user_id = creators.get(("email", row["creator_email"]))
+            return (user_id, None) if user_id else (None, f"creator_email: No user with email {row['creator_email']}")
+        if row.get("creator_id") is not None:
+            try:
+                user_id = creators.get(("id", int(row["creator_id"])))
+            except (TypeError, ValueError):
+                return None, "creator_id: Must be an integer"
+            return (user_id, None) if user_id else (None, f"creator_id: No user with id {row['creator_id']}")
+        return None, "creator_email: creator_email or creator_id is required"
+
+    def _import_services(self, batch: List[ParsedRow]) -> None:
+        parsed = []
+        for line, row, parse_error in batch:
+            if parse_error:
+                self._fail(line, [parse_error])
+            else:
+                parsed.append((line, row))
+        if not parsed:
+            return
+
+        creators = self._resolve_creators(parsed)
+        valid = []
+        for line, row in parsed:
+            creator_id, creator_error = self._creator_for(row, creators)
+            data = {key: value for key, value in row.items() if key not in ("creator_email", "creator_id")}
+            try:
+                service = ServiceCreate(**data)
+            except ValidationError as e:
+                self._fail(line, ([creator_error] if creator_error else []) + _validation_messages(e))
+                continue
+            if creator_error:
+                self._fail(line, [creator_error])
+                continue
+            valid.append((line, creator_id, service))
+
+        if not valid:
+            return
+        if self.dry_run:
+            self.report.imported += len(valid)
+            return
+
+        try:
+            tag_manager = TagManager(self.db)
+            # Resolve/create every tag in the batch with one lookup
+            tags_by_name = {
+                tag.name: tag
+                for tag in tag_manager.get_tags([name for _, _, data in valid for name in (data.tags or [])])
+            }
+
+            services = []
+            for line, creator_id, data in valid:
+                service = Service(
+                    creator_id=creator_id,
+                    title=data.title,
+                    description=data.description,
+                    category=data.category,
+                    time_credits_per_hour=data.time_credits_per_hour,
+                    location=data.location,
+                    whats_included=data.whats_included,
+                    requirements=data.requirements,
+                    tags=",".join(data.tags) if data.tags else None,
+                    availability_mask=encode_availability(data.availability)
+                )
+                geocode_entity(service, data.latitude, data.longitude)
+                names = dict.fromkeys(canonical_tag(name) for name in (data.tags or []))
+                service.tag_entries = [tags_by_name[name] for name in names if name in tags_by_name]
+                services.append(service)
+
+            self.db.add_all(services)
+            self.db.flush()
+            SearchEngine(self.db).index_new_services(services)
+            self.db.commit()
+            self.report.imported += len(services)
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            logger.error(f"Service import batch failed: {str(e)}")
+            for line, _, _ in valid:
+                self._fail(line, [f"Database error: {e.__class__.__name__}"])
@@ -0,0 +1,301 @@
+"""
+Caches.
+
+``TTLCache`` is a small in-process TTL cache. Entries expire after their TTL
+and can be dropped early by key prefix when the underlying data changes. It
+is per worker process: with several workers, invalidation only reaches the
+worker that made the change, so TTLs should stay short enough that the
+other workers' staleness is acceptable.
+
+``CacheStore`` holds whole responses (``CacheEntry``) for the response cache
+(app/core/response_cache.py): an in-process LRU, optionally backed by Redis
+(RESPONSE_CACHE_REDIS_URL) so every worker shares entries. Entries carry
+tags; invalidating a tag bumps its version, and an entry stored under an
+older version of any of its tags is treated as a miss. With Redis the
+versions live there too, so an invalidation in one worker reaches all of
+them.
+"""
+
+import os
+import time
+import pickle
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+class TTLCache:
+    """Thread-safe dict of key -> (expires_at, value)"""
+
+    def __init__(self, default_ttl: float = 30.0, max_entries: int = 1024):
+        self.default_ttl = default_ttl
+        self.max_entries = max_entries
+        self._entries: Dict[Hashable, Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return default
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = time.monotonic() + (self.default_ttl if ttl is None else ttl)
+        with self._lock:
+            if len(self._entries) >= self.max_entries and key not in self._entries:
+                self._evict_expired()
+                if len(self._entries) >= self.max_entries:
+                    # Still full: drop the entry closest to expiring
+                    del self._entries[min(self._entries, key=lambda k: self._entries[k][0])]
+            self._entries[key] = (expires_at, value)
+
+    def get_or_set(self, key: Hashable, loader: Callable[[], Any], ttl: Optional[float] = None) -> Any:
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = loader()
+            self.set(key, value, ttl)
+        return value
+
+    def invalidate(self, prefix: str = "") -> int:
+        """Drop every entry whose key (or first key element) starts with prefix"""
+        with self._lock:
+            doomed = [key for key in self._entries if _key_prefix(key).startswith(prefix)]
+            for key in doomed:
+                del self._entries[key]
+            return len(doomed)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def _evict_expired(self) -> None:
+        now = time.monotonic()
+        for key in [key for key, (expires_at, _) in self._entries.items() if expires_at <= now]:
+            del self._entries[key]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+def _key_prefix(key: Hashable) -> str:
+    if isinstance(key, tuple):
+        return str(key[0]) if key else ""
+    return str(key)
+
+# ----------------------------------------------------------------------
+# Response cache storage
+# ----------------------------------------------------------------------
+
+@dataclass
+class CacheEntry:
+    status: int
+    headers: List[Tuple[bytes, bytes]]
+    body: bytes
+    stored_at: float            # wall clock, comparable across workers
+    fresh_until: float
+    stale_until: float          # may be served while revalidating until then
+    tags: Tuple[str, ...]
+    tag_versions: Tuple[int, ...]
+
+    def is_fresh(self, now: float) -> bool:
+        return now < self.fresh_until
+
+    def is_usable(self, now: float) -> bool:
+        return now < self.stale_until
+
+class LRUCache:
+    """Thread-safe bounded mapping; the least recently used entry goes first"""
+
+    def __init__(self, max_entries: int = 2048):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+class RedisBackend:
+    """Shared entries and tag versions in Redis (needs the optional ``redis`` package)"""
+
+    def __init__(self, url: str, namespace: str = "timenest:cache"):
+        import redis    # optional dependency, only needed when a Redis URL is configured
+        self.client = redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        self.namespace = namespace
+
+    def _key(self, kind: str, name: str) -> str:
+        return f"{self.namespace}:{kind}:{name}"
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        raw = self.client.get(self._key("entry", key))
+        return pickle.loads(raw) if raw else None
+
+    def set(self, key: str, entry: CacheEntry) -> None:
+        ttl = max(1, int(entry.stale_until - time.time()) + 1)
+        self.client.set(self._key("entry", key), pickle.dumps(entry), ex=ttl)
+
+    def tag_versions(self, tags: Sequence[str]) -> Tuple[int, ...]:
+        if not tags:
+            return ()
+        values = self.client.mget([self._key("tag", tag) for tag in tags])
+        return tuple(int(value) if value else 0 for value in values)
+
+    def bump_tags(self, tags: Sequence[str]) -> None:
+        pipeline = self.client.pipeline()
+        for tag in tags:
+            pipeline.incr(self._key("tag", tag))
+        pipeline.execute()
+
+    def try_lock(self, key: str, ttl_seconds: float) -> bool:
+        """Cross-worker lock so only one worker revalidates a stale entry"""
+        return bool(self.client.set(self._key("lock", key), b"1", nx=True, px=int(ttl_seconds * 1000)))
+
+class CacheStore:
+    """Response entries in a local LRU, optionally shared through Redis, with tag-versioned invalidation"""
+
+    def __init__(self, max_entries: int = 2048, redis_url: Optional[str] = None):
+        self.local = LRUCache(max_entries)
+        self.shared: Optional[RedisBackend] = None
+        if redis_url:
+            try:
+                self.shared = RedisBackend(redis_url)
+            except ImportError:
+                logger.warning("RESPONSE_CACHE_REDIS_URL is set but the redis package is not installed; using the in-process cache only")
+        self._tag_versions: Dict[str, int] = {}
+        self._invalidated_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self.metrics = {
+            "hits": 0, "stale_hits": 0, "misses": 0, "stores": 0, "invalidations": 0,
+            "revalidations": 0, "coalesced": 0, "shared_hits": 0, "shared_errors": 0,
+        }
+
+    def count(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self.metrics[name] += amount
+
+    def tag_versions(self, tags: Sequence[str]) -> Tuple[int, ...]:
+        if self.shared:
+            try:
+                return self.shared.tag_versions(tags)
+            except Exception as e:
+                self.count("shared_errors")
+                logger.warning(f"Response cache: Redis tag lookup failed: {e}")
+                return tuple(-1 for _ in tags)     # never matches: behave as a miss
+        with self._lock:
+            return tuple(self._tag_versions.get(tag, 0) for tag in tags)
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """A usable (fresh or stale) entry whose tags are all current, else None"""
+        now = time.time()
+        entry = self.local.get(key)
+        if entry is None and self.shared:
+            try:
+                entry = self.shared.get(key)
+            except Exception as e:
+                self.count("shared_errors")
+                logger.warning(f"Response cache: Redis get failed: {e}")
+            if entry is not None:
+                self.count("shared_hits")
+                self.local.set(key, entry)
+        if entry is None or not entry.is_usable(now):
+            return None
+        if entry.tag_versions != self.tag_versions(entry.tags):
+            self.local.delete(key)
+            return None
+        return entry
+
+    def set(self, key: str, entry: CacheEntry) -> None:
+        self.local.set(key, entry)
+        self.count("stores")
+        if self.shared:
+            try:
+                self.shared.set(key, entry)
+            except Exception as e:
+                self.count("shared_errors")
+                logger.warning(f"Response cache: Redis set failed: {e}")
+
+    def invalidate_tags(self, tags: Iterable[str]) -> None:
+        tags = list(dict.fromkeys(tags))
+        if not tags:
+            return
+        with self._lock:
+            now = time.time()
+            for tag in tags:
+                self._tag_versions[tag] = self._tag_versions.get(tag, 0) + 1
+                self._invalidated_at[tag] = now
+            self.metrics["invalidations"] += len(tags)
+        if self.shared:
+            try:
+                self.shared.bump_tags(tags)
+            except Exception as e:
+                self.count("shared_errors")
+                logger.error(f"Response cache: Redis invalidation of {tags} failed: {e}")
+
+    def invalidated_within(self, tags: Sequence[str], seconds: float) -> bool:
+        """Was any of these tags invalidated by this process in the last ``seconds``?"""
+        if seconds <= 0:
+            return False
+        cutoff = time.time() - seconds
+        with self._lock:
+            return any(self._invalidated_at.get(tag, 0.0) > cutoff for tag in tags)
+
+    def try_lock(self, key: str, ttl_seconds: float) -> bool:
+        if not self.shared:
+            return True
+        try:
+            return self.shared.try_lock(key, ttl_seconds)
+        except Exception:
+            return True
+
+    def clear(self) -> None:
+        self.local.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            metrics = dict(self.metrics)
+        served = metrics["hits"] + metrics["stale_hits"] + metrics["coalesced"]
+        lookups = served + metrics["misses"]
+        return {
+            "backend": "lru+redis" if self.shared else "lru",
+            "entries": len(self.local),
+            "max_entries": self.local.max_entries,
+            "evictions": self.local.evictions,
+            "hit_ratio": round(served / lookups, 3) if lookups else 0.0,
+            **metrics,
+        }
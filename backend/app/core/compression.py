@@ -0,0 +1,196 @@
+"""
+Response compression.
+
+``CompressionMiddleware`` compresses responses with brotli (when the
+optional ``brotli`` package is installed) or gzip, whichever the client's
+Accept-Encoding prefers. It leaves alone:
+- bodies smaller than the minimum size (COMPRESSION_MINIMUM_SIZE bytes),
+  where the framing costs more than it saves;
+- responses that already have a Content-Encoding, and content types that
+  are already compressed (images, archives, ...);
+- paths under COMPRESSION_EXCLUDE_PATHS (Socket.IO by default) and routes
+  disabled through ``CompressionRule``.
+
+Streaming responses (NDJSON exports and listings) are compressed chunk by
+chunk, flushing after each one, so clients still receive rows as they are
+produced. Server-sent events are never compressed.
+
+Weak ETags (app/core/etag.py) stay valid across encodings. The response
+cache stores uncompressed bodies, so one entry serves every encoding.
+"""
+
+import os
+import re
+import zlib
+from dataclasses import dataclass
+from typing import Optional, Sequence, Tuple
+
+try:
+    import brotli
+except ImportError:     # optional: gzip only without it
+    brotli = None
+
+COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "true").lower() == "true"
+COMPRESSION_MINIMUM_SIZE = int(os.getenv("COMPRESSION_MINIMUM_SIZE", "1024"))
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+COMPRESSION_EXCLUDE_PATHS = tuple(
+    path.strip() for path in os.getenv("COMPRESSION_EXCLUDE_PATHS", "/socket.io").split(",") if path.strip()
+)
+
+# Already compressed, or must reach the client unbuffered
+SKIPPED_CONTENT_TYPES = re.compile(
+    r"^(image/(?!svg)|video/|audio/|font/woff|application/(zip|gzip|x-gzip|x-brotli|pdf|octet-stream)|text/event-stream)"
+)
+
+@dataclass(frozen=True)
+class CompressionRule:
+    """Overrides for paths starting with ``prefix``: off entirely, or another minimum size"""
+    prefix: str
+    enabled: bool = True
+    minimum_size: Optional[int] = None
+
+def choose_encoding(accept_encoding: str, brotli_available: bool = brotli is not None) -> Optional[str]:
+    """'br', 'gzip' or None from an Accept-Encoding header, honouring q-values (br wins ties)"""
+    weights = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            weights[name.strip()] = quality
+    candidates = [("br", 2)] if brotli_available else []
+    candidates.append(("gzip", 1))
+    best = None
+    for encoding, preference in candidates:
+        quality = weights.get(encoding, weights.get("*", 0.0))
+        if quality > 0 and (best is None or (quality, preference) > best[0]):
+            best = ((quality, preference), encoding)
+    return best[1] if best else None
+
+class _Compressor:
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        self.encoding = encoding
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=brotli_quality)
+        else:
+            self._zlib = zlib.compressobj(gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes, flush: bool) -> bytes:
+        """Compress a chunk; flush=True makes everything so far decodable by the client"""
+        if self.encoding == "br":
+            out = self._brotli.process(data)
+            return out + self._brotli.flush() if flush else out
+        out = self._zlib.compress(data)
+        return out + self._zlib.flush(zlib.Z_SYNC_FLUSH) if flush else out
+
+    def finish(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._brotli.process(data) + self._brotli.finish()
+        return self._zlib.compress(data) + self._zlib.flush()
+
+class CompressionMiddleware:
+    """Negotiated brotli/gzip compression of HTTP responses (pure ASGI, streaming-safe)"""
+
+    def __init__(
+        self,
+        app,
+        minimum_size: int = COMPRESSION_MINIMUM_SIZE,
+        gzip_level: int = COMPRESSION_GZIP_LEVEL,
+        brotli_quality: int = COMPRESSION_BROTLI_QUALITY,
+        exclude_paths: Sequence[str] = COMPRESSION_EXCLUDE_PATHS,
+        rules: Sequence[CompressionRule] = ()
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.rules = tuple(CompressionRule(path, enabled=False) for path in exclude_paths) + tuple(rules)
+
+    def _settings(self, path: str) -> Tuple[bool, int]:
+        """(enabled, minimum_size) for a path; the longest matching rule prefix wins"""
+        matches = [rule for rule in self.rules if path.startswith(rule.prefix)]
+        if not matches:
+            return True, self.minimum_size
+        rule = max(matches, key=lambda rule: len(rule.prefix))
+        return rule.enabled, rule.minimum_size if rule.minimum_size is not None else self.minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        enabled, minimum_size = self._settings(scope["path"])
+        encoding = None
+        if enabled:
+            request_headers = dict(scope.get("headers") or [])
+            encoding = choose_encoding(request_headers.get(b"accept-encoding", b"").decode("latin-1"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        compressor: Optional[_Compressor] = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start, compressor, passthrough
+            if message["type"] == "http.response.start":
+                start = message
+                headers = {name.lower(): value for name, value in message.get("headers", [])}
+                content_type = headers.get(b"content-type", b"").decode("latin-1")
+                passthrough = (
+                    b"content-encoding" in headers
+                    or message["status"] < 200 or message["status"] in (204, 304)
+                    or bool(SKIPPED_CONTENT_TYPES.match(content_type))
+                )
+                if passthrough:
+                    await send(message)
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if compressor is None:
+                if not more_body and len(body) < minimum_size:
+                    passthrough = True
+                    await send(start)
+                    await send(message)
+                    return
+                compressor = _Compressor(encoding, self.gzip_level, self.brotli_quality)
+                if more_body:
+                    await send(self._start(start, encoding, None))
+                    await send({"type": "http.response.body", "body": compressor.compress(body, flush=True), "more_body": True})
+                else:
+                    compressed = compressor.finish(body)
+                    await send(self._start(start, encoding, len(compressed)))
+                    await send({"type": "http.response.body", "body": compressed})
+                return
+            if more_body:
+                await send({"type": "http.response.body", "body": compressor.compress(body, flush=True), "more_body": True})
+            else:
+                await send({"type": "http.response.body", "body": compressor.finish(body)})
+
+        await self.app(scope, receive, send_compressed)
+
+    @staticmethod
+    def _start(message, encoding: str, content_length: Optional[int]):
+        headers = [
+            (name, value) for name, value in message.get("headers", [])
+            if name.lower() not in (b"content-length", b"vary")
+        ]
+        vary = [value for name, value in message.get("headers", []) if name.lower() == b"vary"]
+        vary_values = {part.strip().lower() for value in vary for part in value.split(b",")}
+        if b"accept-encoding" not in vary_values:
+            vary.append(b"Accept-Encoding")
+        headers.append((b"vary", b", ".join(vary)))
+        headers.append((b"content-encoding", encoding.encode()))
+        if content_length is not None:
+            headers.append((b"content-length", str(content_length).encode()))
+        return dict(message, headers=headers)
@@ -1,7 +1,7 @@
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 from decimal import Decimal
-from typing import Optional, Tuple
+from typing import List, Optional, Tuple
 import logging
 
 from ..db.models.user import User
@@ -155,6 +155,42 @@ class CreditManager:
         
         return transaction
     
+    def add_initial_bonuses(self, user_ids: List[int], amount: Decimal = Decimal('10.00')) -> int:
+        """
+        Batched add_initial_bonus for bulk imports: one balance lookup, one
+        multi-row ledger insert and one balance UPDATE for all users.
+        Caller is responsible for committing.
+        """
+        if not user_ids:
+            return 0
+        
+        balances = {
+            user_id: Decimal(str(credits)) if credits else Decimal('0.00')
+            for user_id, credits in self.db.query(User.user_id, User.time_credits).filter(User.user_id.in_(user_ids))
+        }
+        
+        self.db.execute(TimeTransaction.__table__.insert(), [
+            {
+                "user_id": user_id,
+                "amount": amount,
+                "transaction_type": TransactionTypeEnum.initial_bonus,
+                "reference_type": ReferenceTypeEnum.registration,
+                "reference_id": user_id,
+                "description": f"Initial credits: {amount} credits",
+                "balance_before": balance,
+                "balance_after": balance + amount,
+            }
+            for user_id, balance in balances.items()
+        ])
+        
+        self.db.query(User).filter(User.user_id.in_(list(balances))).update({
+            User.time_credits: func.coalesce(User.time_credits, 0) + amount,
+            User.total_credits_earned: func.coalesce(User.total_credits_earned, 0) + amount,
+        }, synchronize_session=False)
+        
+        logger.info(f"Initial bonus of {amount} credits added to {len(balances)} users")
+        return len(balances)
+    
     def refund_credits(
         self,
         original_reference_id: int,
@@ -0,0 +1,369 @@
+"""
+Weekly digest emails.
+
+Users are streamed in user_id order, ``chunk_size`` at a time. Everything a
+digest needs for a chunk is fetched with a handful of set-based queries over
+the whole chunk (interests, unread message counts, credits earned), never
+per user. New services and requests from the digest window are loaded once
+per run and indexed by category and tag, so picking a user's items is a few
+dictionary lookups. Each chunk's emails are rendered, added to the outbox in
+one batch and committed before the next chunk is read, so memory stays
+bounded by the chunk size plus the (capped) list of new items.
+
+Interest model (same idea as the matching engine): users who offer services
+hear about new requests in their categories/tags, users who posted requests
+hear about new services in theirs.
+"""
+
+import heapq
+import logging
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session
+
+from ..db.models.conversation import Conversation
+from ..db.models.message import Message, MessageStatus
+from ..db.models.request import Request, RequestStatusEnum
+from ..db.models.service import Service, ServiceStatusEnum
+from ..db.models.tag import service_tags, request_tags
+from ..db.models.timeTransaction import TimeTransaction, TransactionTypeEnum
+from ..db.models.user import User
+from .email import FRONTEND_URL
+from .email_outbox import enqueue_emails
+from .email_templates import render_email, render_partial
+
+logger = logging.getLogger(__name__)
+
+DIGEST_CHUNK_SIZE = 500
+DIGEST_WINDOW_DAYS = 7
+ITEMS_PER_DIGEST = 5
+
+# Newest items per kind considered in one run; bounds memory on busy weeks
+MAX_NEW_ITEMS = 5000
+
+EARNING_TYPES = (TransactionTypeEnum.service_earning, TransactionTypeEnum.request_earning)
+
+@dataclass
+class DigestItem:
+    kind: str                   # "service" or "request"
+    item_id: int
+    creator_id: int
+    title: str
+    category: str
+    credits: Decimal
+    created_at: datetime
+    tag_ids: frozenset = frozenset()
+
+@dataclass
+class Interests:
+    categories: Set[str] = field(default_factory=set)
+    tag_ids: Set[int] = field(default_factory=set)
+
+@dataclass
+class DigestRunMetrics:
+    started_at: Optional[datetime] = None
+    duration_seconds: float = 0.0
+    chunks: int = 0
+    users_scanned: int = 0
+    users_skipped: int = 0          # Nothing to report
+    emails_queued: int = 0
+    already_queued: int = 0         # Digest for this week was already in the outbox
+    new_services: int = 0
+    new_requests: int = 0
+    users_per_second: float = 0.0
+    peak_rss_mb: float = 0.0
+
+def _rank(pair: Tuple[int, DigestItem]):
+    return pair[0], pair[1].created_at
+
+class ItemIndex:
+    """New items of one kind, indexed by category and tag"""
+
+    def __init__(self, items: List[DigestItem]):
+        self.by_category: Dict[str, List[DigestItem]] = defaultdict(list)
+        self.by_tag: Dict[int, List[DigestItem]] = defaultdict(list)
+        for item in items:
+            self.by_category[item.category.lower()].append(item)
+            for tag_id in item.tag_ids:
+                self.by_tag[tag_id].append(item)
+
+    def top_for(self, user_id: int, interests: Interests, limit: int) -> List[Tuple[int, DigestItem]]:
+        """Best (score, item) pairs for a user: shared tags count double, a matching category once"""
+        scores: Dict[int, Tuple[int, DigestItem]] = {}
+        for tag_id in interests.tag_ids:
+            for item in self.by_tag.get(tag_id, ()):
+                if item.creator_id != user_id:
+                    score, _ = scores.get(item.item_id, (0, item))
+                    scores[item.item_id] = (score + 2, item)
+        for category in interests.categories:
+            for item in self.by_category.get(category, ()):
+                if item.creator_id != user_id:
+                    score, _ = scores.get(item.item_id, (0, item))
+                    scores[item.item_id] = (score + 1, item)
+        return heapq.nlargest(limit, scores.values(), key=_rank)
+
+class DigestGenerator:
+    """Builds and queues the weekly digest for every active user"""
+
+    def __init__(
+        self,
+        db: Session,
+        now: Optional[datetime] = None,
+        chunk_size: int = DIGEST_CHUNK_SIZE,
+        window_days: int = DIGEST_WINDOW_DAYS,
+        dry_run: bool = False
+    ):
+        self.db = db
+        self.now = now or datetime.utcnow()
+        self.since = self.now - timedelta(days=window_days)
+        self.chunk_size = chunk_size
+        self.dry_run = dry_run
+        iso_year, iso_week, _ = self.now.isocalendar()
+        self.week_key = f"{iso_year}-W{iso_week:02d}"
+        self.metrics = DigestRunMetrics()
+
+    # ------------------------------------------------------------------
+    # Run-wide data
+    # ------------------------------------------------------------------
+
+    def _load_new_items(self, kind: str) -> List[DigestItem]:
+        if kind == "service":
+            model, id_column, credits_column, link_table, link_column = (
+                Service, Service.service_id, Service.time_credits_per_hour, service_tags, service_tags.c.service_id
+            )
+            active = Service.status == ServiceStatusEnum.active
+        else:
+            model, id_column, credits_column, link_table, link_column = (
+                Request, Request.request_id, Request.budget, request_tags, request_tags.c.request_id
+            )
+            active = Request.status == RequestStatusEnum.active
+
+        rows = self.db.query(
+            id_column, model.creator_id, model.title, model.category, credits_column, model.created_at
+        ).filter(
+            active,
+            model.created_at >= self.since,
+            model.created_at < self.now
+        ).order_by(model.created_at.desc()).limit(MAX_NEW_ITEMS).all()
+        if not rows:
+            return []
+
+        tags: Dict[int, Set[int]] = defaultdict(set)
+        ids = [row[0] for row in rows]
+        for offset in range(0, len(ids), 1000):
+            for item_id, tag_id in self.db.query(link_column, link_table.c.tag_id).filter(
+                link_column.in_(ids[offset:offset + 1000])
+            ).all():
+                tags[item_id].add(tag_id)
+
+        return [
+            DigestItem(
+                kind=kind,
+                item_id=item_id,
+                creator_id=creator_id,
+                title=title,
+                category=category or "",
+                credits=credits,
+                created_at=created_at,
+                tag_ids=frozenset(tags.get(item_id, ()))
+            )
+            for item_id, creator_id, title, category, credits, created_at in rows
+        ]
+
+    # ------------------------------------------------------------------
+    # Per-chunk set-based lookups
+    # ------------------------------------------------------------------
+
+    def _user_chunks(self):
+        last_id = 0
+        while True:
+            chunk = self.db.query(User.user_id, User.email, User.first_name, User.last_name).filter(
+                User.user_id > last_id,
+                User.status == 'Active'
+            ).order_by(User.user_id).limit(self.chunk_size).all()
+            if not chunk:
+                return
+            yield chunk
+            last_id = chunk[-1][0]
+
+    def _interests(self, user_ids: List[int]) -> Tuple[Dict[int, Interests], Dict[int, Interests]]:
+        """(offers, needs): categories/tags of each user's services and of their requests"""
+        offers: Dict[int, Interests] = defaultdict(Interests)
+        needs: Dict[int, Interests] = defaultdict(Interests)
+
+        for creator_id, category in self.db.query(Service.creator_id, Service.category).filter(
+            Service.creator_id.in_(user_ids)
+        ).distinct():
+            offers[creator_id].categories.add((category or "").lower())
+        for creator_id, category in self.db.query(Request.creator_id, Request.category).filter(
+            Request.creator_id.in_(user_ids)
+        ).distinct():
+            needs[creator_id].categories.add((category or "").lower())
+
+        for creator_id, tag_id in self.db.query(Service.creator_id, service_tags.c.tag_id).join(
+            service_tags, service_tags.c.service_id == Service.service_id
+        ).filter(Service.creator_id.in_(user_ids)).distinct():
+            offers[creator_id].tag_ids.add(tag_id)
+        for creator_id, tag_id in self.db.query(Request.creator_id, request_tags.c.tag_id).join(
+            request_tags, request_tags.c.request_id == Request.request_id
+        ).filter(Request.creator_id.in_(user_ids)).distinct():
+            needs[creator_id].tag_ids.add(tag_id)
+
+        return offers, needs
+
+    def _unread_counts(self, user_ids: List[int]) -> Dict[int, int]:
+        """Unread messages sent to each user, counted from both conversation sides"""
+        counts: Dict[int, int] = defaultdict(int)
+        for participant in (Conversation.user1_id, Conversation.user2_id):
+            rows = self.db.query(participant, func.count(Message.id)).join(
+                Message, Message.conversation_id == Conversation.id
+            ).filter(
+                participant.in_(user_ids),
+                Message.sender_id != participant,
+                Message.status != MessageStatus.read,
+                or_(Message.is_deleted.is_(None), Message.is_deleted.is_(False))
+            ).group_by(participant).all()
+            for user_id, count in rows:
+                counts[user_id] += count
+        return counts
+
+    def _credits_earned(self, user_ids: List[int]) -> Dict[int, Decimal]:
+        rows = self.db.query(TimeTransaction.user_id, func.sum(TimeTransaction.amount)).filter(
+            TimeTransaction.user_id.in_(user_ids),
+            TimeTransaction.transaction_type.in_(EARNING_TYPES),
+            TimeTransaction.created_at >= self.since,
+            TimeTransaction.created_at < self.now
+        ).group_by(TimeTransaction.user_id).all()
+        return {user_id: Decimal(total or 0) for user_id, total in rows}
+
+    # ------------------------------------------------------------------
+    # Rendering
+    # ------------------------------------------------------------------
+
+    def _item_values(self, item: DigestItem) -> dict:
+        path = "services" if item.kind == "service" else "requests"
+        return {
+            "title": item.title,
+            "kind": "Service" if item.kind == "service" else "Request",
+            "category": item.category,
+            "credits": item.credits,
+            "link": f"{FRONTEND_URL}/{path}/{item.item_id}",
+        }
+
+    def _summary(self, services: int, requests: int) -> str:
+        parts = []
+        if requests:
+            parts.append(f"{requests} new request{'s' if requests != 1 else ''}")
+        if services:
+            parts.append(f"{services} new service{'s' if services != 1 else ''}")
+        if not parts:
+            return "Here is what happened on your TimeNest account this week"
+        return f"{' and '.join(parts)} match{'es' if services + requests == 1 else ''} your interests this week"
+
+    def _render(self, user, items: List[DigestItem], unread: int, credits: Decimal) -> dict:
+        user_id, email, first_name, last_name = user
+        values = [self._item_values(item) for item in items]
+        rendered = render_email(
+            "weekly_digest",
+            recipient_email=email,
+            recipient_name=f"{first_name} {last_name}".strip(),
+            summary=self._summary(
+                sum(1 for item in items if item.kind == "service"),
+                sum(1 for item in items if item.kind == "request")
+            ),
+            items_html="".join(render_partial("weekly_digest_item", "html", **value) for value in values),
+            items_text="\n".join(render_partial("weekly_digest_item", "txt", **value) for value in values),
+            unread_messages=unread,
+            credits_earned=f"{credits:.2f}",
+            browse_link=f"{FRONTEND_URL}/services"
+        )
+        return {
+            "recipient": email,
+            "subject": rendered.subject,
+            "text_body": rendered.text,
+            "html_body": rendered.html,
+            "dedupe_key": f"weekly-digest:{user_id}:{self.week_key}",
+        }
+
+    # ------------------------------------------------------------------
+    # Run
+    # ------------------------------------------------------------------
+
+    def _process_chunk(self, chunk, services: ItemIndex, requests: ItemIndex) -> None:
+        user_ids = [user[0] for user in chunk]
+        offers, needs = self._interests(user_ids)
+        unread = self._unread_counts(user_ids)
+        earned = self._credits_earned(user_ids)
+
+        emails = []
+        for user in chunk:
+            user_id = user[0]
+            # Providers hear about new requests, requesters about new services
+            picked = []
+            if user_id in offers:
+                picked += requests.top_for(user_id, offers[user_id], ITEMS_PER_DIGEST)
+            if user_id in needs:
+                picked += services.top_for(user_id, needs[user_id], ITEMS_PER_DIGEST)
+            picked = [item for _, item in heapq.nlargest(ITEMS_PER_DIGEST, picked, key=_rank)]
+
+            unread_count = unread.get(user_id, 0)
+            credits = earned.get(user_id, Decimal("0"))
+            if not picked and not unread_count and not credits:
+                self.metrics.users_skipped += 1
+                continue
+            emails.append(self._render(user, picked, unread_count, credits))
+
+        if self.dry_run:
+            self.metrics.emails_queued += len(emails)
+            return
+
+        added = enqueue_emails(self.db, emails)
+        self.db.commit()
+        # Drop the queued rows from the identity map so memory doesn't grow with the run
+        self.db.expunge_all()
+        self.metrics.emails_queued += added
+        self.metrics.already_queued += len(emails) - added
+
+    def run(self) -> DigestRunMetrics:
+        metrics = self.metrics
+        metrics.started_at = self.now
+        started = time.perf_counter()
+        import psutil
+        process = psutil.Process()
+
+        new_services = self._load_new_items("service")
+        new_requests = self._load_new_items("request")
+        metrics.new_services, metrics.new_requests = len(new_services), len(new_requests)
+        services, requests = ItemIndex(new_services), ItemIndex(new_requests)
+        logger.info(
+            f"Weekly digest {self.week_key}: {len(new_services)} new services, "
+            f"{len(new_requests)} new requests since {self.since}"
+        )
+
+        for chunk in self._user_chunks():
+            self._process_chunk(chunk, services, requests)
+            metrics.chunks += 1
+            metrics.users_scanned += len(chunk)
+            metrics.peak_rss_mb = max(metrics.peak_rss_mb, process.memory_info().rss / (1024 * 1024))
+            if metrics.chunks % 20 == 0:
+                elapsed = time.perf_counter() - started
+                logger.info(
+                    f"Weekly digest progress: {metrics.users_scanned} users, {metrics.emails_queued} queued, "
+                    f"{metrics.users_scanned / elapsed:.0f} users/s"
+                )
+
+        metrics.duration_seconds = round(time.perf_counter() - started, 3)
+        metrics.users_per_second = round(metrics.users_scanned / metrics.duration_seconds, 1) if metrics.duration_seconds else 0.0
+        metrics.peak_rss_mb = round(metrics.peak_rss_mb, 1)
+        logger.info(f"Weekly digest {self.week_key} finished: {vars(metrics)}")
+        return metrics
+
+def weekly_digest_job(db: Session, now: datetime, batch_size: int) -> int:
+    """Scheduler entry point; returns the number of digests queued"""
+    return DigestGenerator(db, now=now, chunk_size=batch_size).run().emails_queued
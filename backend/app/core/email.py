@@ -1,9 +1,13 @@
 import smtplib
 import os
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+import hashlib
+from typing import Optional, Tuple
 from dotenv import load_dotenv
 import logging
+from sqlalchemy.orm import Session
+from ..db.models.emailOutbox import EmailOutbox
+from .email_outbox import enqueue_email
+from .email_templates import render_email, compose_message
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -17,9 +21,94 @@ EMAIL_PASSWORD = os.getenv("EMAIL_PASSWORD")
 EMAIL_SERVER = os.getenv("EMAIL_SERVER", "smtp.gmail.com")
 EMAIL_PORT = int(os.getenv("EMAIL_PORT", "587"))
 
+# Base URL for links in emails
+FRONTEND_URL = os.getenv("FRONTEND_URL", "http://localhost:3000").rstrip("/")
+
+# Longest proposal text quoted in a notification email
+PROPOSAL_EXCERPT_LENGTH = 300
+
+def build_password_reset_email(recipient_email: str, reset_link: str) -> Tuple[str, str, str]:
+    """
+    Build the password reset email
+
+    Returns:
+        (subject, text_content, html_content)
+    """
+    rendered = render_email("password_reset", recipient_email=recipient_email, reset_link=reset_link)
+    return rendered.subject, rendered.text, rendered.html
+
+def queue_password_reset_email(db: Session, recipient_email: str, reset_token: str, reset_link: str) -> Optional[EmailOutbox]:
+    """
+    Add the password reset email to the outbox. Joins the caller's transaction,
+    so the email is only sent if the caller commits the new token.
+    """
+    subject, text_content, html_content = build_password_reset_email(recipient_email, reset_link)
+    token_digest = hashlib.sha256(reset_token.encode()).hexdigest()[:32]
+    return enqueue_email(
+        db,
+        recipient=recipient_email,
+        subject=subject,
+        text_body=text_content,
+        html_body=html_content,
+        dedupe_key=f"password-reset:{token_digest}"
+    )
+
+def _display_name(user) -> str:
+    return f"{user.first_name} {user.last_name}".strip() if user else "there"
+
+def queue_booking_confirmed_email(db: Session, booking, service, customer, provider) -> Optional[EmailOutbox]:
+    """Tell the customer their booking was confirmed (joins the caller's transaction)"""
+    rendered = render_email(
+        "booking_confirmed",
+        recipient_email=customer.email,
+        recipient_name=_display_name(customer),
+        provider_name=_display_name(provider),
+        service_title=service.title,
+        scheduled_at=booking.scheduled_datetime.strftime("%A, %d %B %Y at %H:%M UTC"),
+        duration_minutes=booking.duration_minutes or 60,
+        credits=booking.time_credits_used,
+        bookings_link=f"{FRONTEND_URL}/dashboard/my-bookings"
+    )
+    return enqueue_email(
+        db,
+        recipient=customer.email,
+        subject=rendered.subject,
+        text_body=rendered.text,
+        html_body=rendered.html,
+        # The row version before this confirmation: a later re-confirmation gets a new key
+        dedupe_key=f"booking-confirmed:{booking.booking_id}:v{booking.version}"
+    )
+
+def queue_proposal_received_email(db: Session, proposal, request, requester, proposer) -> Optional[EmailOutbox]:
+    """Tell a request's creator about a new proposal (joins the caller's transaction)"""
+    if proposal.proposal_id is None:
+        db.flush()      # the dedupe key is the proposal's id
+    excerpt = proposal.proposal_text or ""
+    if len(excerpt) > PROPOSAL_EXCERPT_LENGTH:
+        excerpt = excerpt[:PROPOSAL_EXCERPT_LENGTH].rsplit(" ", 1)[0] + "..."
+    rendered = render_email(
+        "proposal_received",
+        recipient_email=requester.email,
+        recipient_name=_display_name(requester),
+        proposer_name=_display_name(proposer),
+        request_title=request.title,
+        proposed_credits=proposal.proposed_credits,
+        proposal_excerpt=excerpt,
+        proposal_link=f"{FRONTEND_URL}/requests/{request.request_id}"
+    )
+    return enqueue_email(
+        db,
+        recipient=requester.email,
+        subject=rendered.subject,
+        text_body=rendered.text,
+        html_body=rendered.html,
+        dedupe_key=f"proposal-received:{proposal.proposal_id}"
+    )
+
 def send_password_reset_email(recipient_email: str, reset_token: str, reset_link: str) -> bool:
     """
-    Send a password reset email to the user
+    Send a password reset email to the user immediately, bypassing the outbox.
+    Request handlers should use queue_password_reset_email instead.
     
     Args:
         recipient_email: The email address to send the reset link to
@@ -36,206 +125,13 @@ def send_password_reset_email(recipient_email: str, reset_token: str, reset_link
             logger.info(f"Password reset link for {recipient_email}: {reset_link}")
             return True  # Return True for development mode
         
-        # Create message
-        msg = MIMEMultipart('alternative')
-        msg['Subject'] = "Reset Your TimeNest Password"
-        msg['From'] = EMAIL_USERNAME
-        msg['To'] = recipient_email
-
-        # Create HTML content with TimeNest theme
-        html_content = f"""
-        <!DOCTYPE html>
-        <html lang="en">
-        <head>
-            <meta charset="UTF-8">
-            <meta name="viewport" content="width=device-width, initial-scale=1.0">
-            <title>Reset Your TimeNest Password</title>
-            <style>
-                body {{
-                    font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'Helvetica Neue', Arial, sans-serif;
-                    line-height: 1.6;
-                    color: #333;
-                    max-width: 600px;
-                    margin: 0 auto;
-                    padding: 20px;
-                    background-color: #f8fafc;
-                }}
-                .container {{
-                    background-color: white;
-                    border-radius: 12px;
-                    padding: 40px;
-                    box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
-                }}
-                .header {{
-                    text-align: center;
-                    margin-bottom: 30px;
-                }}
-                .logo {{
-                    display: inline-flex;
-                    align-items: center;
-                    font-size: 24px;
-                    font-weight: bold;
-                    color: #2563eb;
-                    margin-bottom: 20px;
-                }}
-                .clock-icon {{
-                    width: 32px;
-                    height: 32px;
-                    margin-right: 8px;
-                    fill: currentColor;
-                }}
-                h1 {{
-                    color: #1f2937;
-                    margin-bottom: 10px;
-                    font-size: 28px;
-                }}
-                .subtitle {{
-                    color: #6b7280;
-                    font-size: 16px;
-                    margin-bottom: 30px;
-                }}
-                .content {{
-                    margin-bottom: 30px;
-                }}
-                .reset-button {{
-                    display: inline-block;
-                    background-color: #2563eb;
-                    color: white;
-                    padding: 14px 28px;
-                    text-decoration: none;
-                    border-radius: 8px;
-                    font-weight: 600;
-                    font-size: 16px;
-                    margin: 20px 0;
-                    transition: background-color 0.2s;
-                }}
-                .reset-button:hover {{
-                    background-color: #1d4ed8;
-                }}
-                .alternative-link {{
-                    background-color: #f3f4f6;
-                    padding: 15px;
-                    border-radius: 8px;
-                    margin: 20px 0;
-                    word-break: break-all;
-                    font-family: monospace;
-                    font-size: 14px;
-                }}
-                .footer {{
-                    margin-top: 40px;
-                    padding-top: 20px;
-                    border-top: 1px solid #e5e7eb;
-                    text-align: center;
-                    color: #6b7280;
-                    font-size: 14px;
-                }}
-                .warning {{
-                    background-color: #fef3c7;
-                    border: 1px solid #f59e0b;
-                    border-radius: 8px;
-                    padding: 15px;
-                    margin: 20px 0;
-                    color: #92400e;
-                }}
-                .security-note {{
-                    background-color: #eff6ff;
-                    border: 1px solid #3b82f6;
-                    border-radius: 8px;
-                    padding: 15px;
-                    margin: 20px 0;
-                    color: #1e40af;
-                }}
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <div class="header">
-                    <div class="logo">
-                        <svg class="clock-icon" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round">
-                            <circle cx="12" cy="12" r="10"/>
-                            <polyline points="12,6 12,12 16,14"/>
-                        </svg>
-                        TimeNest
-                    </div>
-                    <h1>Reset Your Password</h1>
-                    <p class="subtitle">We received a request to reset your TimeNest account password</p>
-                </div>
-
-                <div class="content">
-                    <p>Hello,</p>
-                    
-                    <p>You recently requested to reset your password for your TimeNest account. Click the button below to reset it:</p>
-                    
-                    <div style="text-align: center;">
-                        <a href="{reset_link}" class="reset-button">Reset My Password</a>
-                    </div>
-                    
-                    <div class="warning">
-                        <strong>⚠️ Important:</strong> This link will expire in 15 minutes for your security.
-                    </div>
-                    
-                    <p>If the button above doesn't work, you can copy and paste the following link into your browser:</p>
-                    
-                    <div class="alternative-link">
-                        {reset_link}
-                    </div>
-                    
-                    <div class="security-note">
-                        <strong>🔒 Security Note:</strong> If you didn't request this password reset, please ignore this email. Your password will remain unchanged, and your account is secure.
-                    </div>
-                    
-                    <p>If you're having trouble or didn't request this reset, please contact our support team.</p>
-                    
-                    <p>Best regards,<br>The TimeNest Team</p>
-                </div>
-
-                <div class="footer">
-                    <p>This email was sent to {recipient_email}</p>
-                    <p>TimeNest - Building stronger communities through service exchange</p>
-                    <p>© 2025 TimeNest. All rights reserved.</p>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
-
-        # Create plain text version as fallback
-        text_content = f"""
-        TimeNest - Reset Your Password
-
-        Hello,
-
-        You recently requested to reset your password for your TimeNest account.
-
-        To reset your password, please visit the following link:
-        {reset_link}
-
-        This link will expire in 15 minutes for your security.
-
-        If you didn't request this password reset, please ignore this email. Your password will remain unchanged.
-
-        If you're having trouble, please contact our support team.
-
-        Best regards,
-        The TimeNest Team
-
-        This email was sent to {recipient_email}
-        TimeNest - Building stronger communities through service exchange
-        © 2025 TimeNest. All rights reserved.
-        """
-
-        # Attach parts
-        part1 = MIMEText(text_content, 'plain')
-        part2 = MIMEText(html_content, 'html')
-        
-        msg.attach(part1)
-        msg.attach(part2)
+        subject, text_content, html_content = build_password_reset_email(recipient_email, reset_link)
 
         # Send email
         server = smtplib.SMTP(EMAIL_SERVER, EMAIL_PORT)
         server.starttls()
         server.login(EMAIL_USERNAME, EMAIL_PASSWORD)
-        text = msg.as_string()
+        text = compose_message(EMAIL_USERNAME, recipient_email, subject, text_content, html_content)
         server.sendmail(EMAIL_USERNAME, recipient_email, text)
         server.quit()
         
@@ -0,0 +1,441 @@
+"""
+Transactional email outbox.
+
+Request handlers never talk to SMTP. They add an ``EmailOutbox`` row in their
+own transaction (``enqueue_email``), and the outbox worker delivers due rows
+in batches over one persistent SMTP connection, retrying failures with
+exponential backoff. Rows are claimed with a short lease, so several API
+workers can run the outbox worker at the same time without double-sending.
+
+Local testing without a real mail server:
+
+    python -m aiosmtpd -n -l localhost:1025
+    EMAIL_DEV_MODE=false EMAIL_USE_TLS=false EMAIL_SERVER=localhost EMAIL_PORT=1025 python process_email_outbox.py
+"""
+
+import os
+import asyncio
+import hashlib
+import logging
+import random
+import smtplib
+import socket
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from dotenv import load_dotenv
+from sqlalchemy import event, func, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..db.database import SessionLocal
+from ..db.models.emailOutbox import EmailOutbox, EmailStatusEnum
+from .email_templates import compose_message
+from .scheduler import SystemClock, default_worker_id
+
+logger = logging.getLogger(__name__)
+
+load_dotenv()
+
+EMAIL_USERNAME = os.getenv("EMAIL_USERNAME")
+EMAIL_PASSWORD = os.getenv("EMAIL_PASSWORD")
+EMAIL_SERVER = os.getenv("EMAIL_SERVER", "smtp.gmail.com")
+EMAIL_PORT = int(os.getenv("EMAIL_PORT", "587"))
+EMAIL_FROM = os.getenv("EMAIL_FROM") or EMAIL_USERNAME or "no-reply@timenest.local"
+EMAIL_USE_TLS = os.getenv("EMAIL_USE_TLS", "true").lower() in ("1", "true", "yes")
+# Without credentials, emails are only logged (same as the old direct sender)
+EMAIL_DEV_MODE = os.getenv(
+    "EMAIL_DEV_MODE", "false" if EMAIL_USERNAME and EMAIL_PASSWORD else "true"
+).lower() in ("1", "true", "yes")
+
+EMAIL_BATCH_SIZE = int(os.getenv("EMAIL_BATCH_SIZE", "50"))
+EMAIL_POLL_SECONDS = float(os.getenv("EMAIL_POLL_SECONDS", "10"))
+EMAIL_TIMEOUT_SECONDS = 30
+EMAIL_LEASE_SECONDS = 120
+
+# Retry schedule: 30s, 1m, 2m, ... capped at an hour, then give up
+EMAIL_MAX_ATTEMPTS = 8
+EMAIL_RETRY_BASE_SECONDS = 30
+EMAIL_RETRY_MAX_SECONDS = 3600
+
+# Check a reused connection with NOOP after this long, and drop it when idle for longer
+SMTP_NOOP_AFTER_SECONDS = 30
+SMTP_IDLE_CLOSE_SECONDS = 240
+
+# Errors that mean the server or session is unusable; the message itself may be fine.
+# (SMTPException is an OSError, so OSError itself can't be listed here.)
+CONNECTION_ERRORS = (
+    smtplib.SMTPServerDisconnected,
+    smtplib.SMTPConnectError,
+    smtplib.SMTPHeloError,
+    smtplib.SMTPAuthenticationError,
+    ConnectionError,
+    TimeoutError,
+    socket.gaierror,
+)
+
+# ----------------------------------------------------------------------
+# Enqueue
+# ----------------------------------------------------------------------
+
+def enqueue_email(
+    db: Session,
+    recipient: str,
+    subject: str,
+    text_body: str,
+    html_body: Optional[str] = None,
+    dedupe_key: Optional[str] = None
+) -> Optional[EmailOutbox]:
+    """
+    Add an email to the outbox inside the caller's transaction (the caller
+    commits). Emails with a dedupe_key that is already queued are skipped,
+    including one queued concurrently by another transaction: the insert
+    runs in a savepoint, so losing that race never rolls back the caller's
+    work. Returns the queued row (None if a concurrent one isn't visible yet).
+    """
+    if dedupe_key is None:
+        digest = hashlib.sha256(f"{recipient}\n{subject}\n{text_body}".encode()).hexdigest()
+        dedupe_key = f"content:{digest}"
+
+    # Flush the caller's pending changes first, so their errors surface as their own and
+    # emails queued earlier in this transaction are visible to the query below
+    db.flush()
+    existing = db.query(EmailOutbox).filter(EmailOutbox.dedupe_key == dedupe_key).first()
+    if existing:
+        logger.info(f"Email {dedupe_key} already queued as {existing.email_id}; skipping")
+        return existing
+
+    email = EmailOutbox(
+        dedupe_key=dedupe_key,
+        recipient=recipient,
+        subject=subject,
+        text_body=text_body,
+        html_body=html_body,
+        status=EmailStatusEnum.pending,
+        attempts=0,
+        next_attempt_at=datetime.utcnow()
+    )
+    try:
+        with db.begin_nested():
+            db.add(email)
+    except IntegrityError:
+        logger.info(f"Email {dedupe_key} was queued concurrently; skipping")
+        return db.query(EmailOutbox).filter(EmailOutbox.dedupe_key == dedupe_key).first()
+
+    # Wake the worker once the row is actually committed
+    event.listen(db, "after_commit", lambda session: outbox_worker.notify(), once=True)
+    return email
+
+def enqueue_emails(db: Session, emails: List[dict]) -> int:
+    """
+    Bulk version of enqueue_email for batch jobs: one query finds which
+    dedupe keys are already queued, the rest are added to the caller's
+    transaction. Each dict needs recipient, subject, text_body and dedupe_key
+    (html_body optional). Returns how many were added.
+    """
+    keys = [email["dedupe_key"] for email in emails]
+    if not keys:
+        return 0
+    existing = {
+        row[0] for row in db.query(EmailOutbox.dedupe_key).filter(EmailOutbox.dedupe_key.in_(keys)).all()
+    }
+
+    now = datetime.utcnow()
+    added = []
+    for email in emails:
+        if email["dedupe_key"] in existing:
+            continue
+        existing.add(email["dedupe_key"])
+        added.append(EmailOutbox(
+            dedupe_key=email["dedupe_key"],
+            recipient=email["recipient"],
+            subject=email["subject"],
+            text_body=email["text_body"],
+            html_body=email.get("html_body"),
+            status=EmailStatusEnum.pending,
+            attempts=0,
+            next_attempt_at=now
+        ))
+    if added:
+        db.add_all(added)
+        event.listen(db, "after_commit", lambda session: outbox_worker.notify(), once=True)
+    return len(added)
+
+def retry_delay(attempts: int) -> timedelta:
+    """Exponential backoff with jitter for the given attempt count"""
+    seconds = min(EMAIL_RETRY_MAX_SECONDS, EMAIL_RETRY_BASE_SECONDS * 2 ** max(attempts - 1, 0))
+    return timedelta(seconds=seconds * random.uniform(0.8, 1.2))
+
+# ----------------------------------------------------------------------
+# SMTP connection
+# ----------------------------------------------------------------------
+
+class SMTPConnection:
+    """One persistent SMTP session, reopened when the server drops it"""
+
+    def __init__(
+        self,
+        host: str = EMAIL_SERVER,
+        port: int = EMAIL_PORT,
+        username: Optional[str] = EMAIL_USERNAME,
+        password: Optional[str] = EMAIL_PASSWORD,
+        use_tls: bool = EMAIL_USE_TLS
+    ):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.server: Optional[smtplib.SMTP] = None
+        self.last_used: Optional[datetime] = None
+        self.connects = 0
+
+    def _open(self) -> None:
+        server = smtplib.SMTP(self.host, self.port, timeout=EMAIL_TIMEOUT_SECONDS)
+        try:
+            if self.use_tls:
+                server.starttls()
+            if self.username and self.password:
+                server.login(self.username, self.password)
+        except Exception:
+            server.close()
+            raise
+        self.server = server
+        self.connects += 1
+        logger.info(f"Opened SMTP connection to {self.host}:{self.port}")
+
+    def _ensure(self) -> None:
+        if self.server is None:
+            self._open()
+            return
+        idle = (datetime.utcnow() - self.last_used).total_seconds() if self.last_used else 0
+        if idle > SMTP_NOOP_AFTER_SECONDS:
+            try:
+                if self.server.noop()[0] == 250:
+                    return
+            except (smtplib.SMTPException, *CONNECTION_ERRORS):
+                pass
+            self.close()
+            self._open()
+
+    def send(self, sender: str, recipient: str, message: str) -> None:
+        self._ensure()
+        try:
+            self.server.sendmail(sender, recipient, message)
+        except smtplib.SMTPServerDisconnected:
+            # Server hung up between messages; one reconnect per message
+            self.close()
+            self._open()
+            self.server.sendmail(sender, recipient, message)
+        self.last_used = datetime.utcnow()
+
+    def close_if_idle(self) -> None:
+        if self.server is not None and self.last_used is not None:
+            if (datetime.utcnow() - self.last_used).total_seconds() > SMTP_IDLE_CLOSE_SECONDS:
+                self.close()
+
+    def close(self) -> None:
+        if self.server is None:
+            return
+        try:
+            self.server.quit()
+        except Exception:
+            self.server.close()
+        self.server = None
+        self.last_used = None
+
+# ----------------------------------------------------------------------
+# Worker
+# ----------------------------------------------------------------------
+
+class OutboxWorker:
+    """Delivers due outbox rows; runs as an asyncio task or one batch at a time"""
+
+    def __init__(
+        self,
+        session_factory=SessionLocal,
+        connection: Optional[SMTPConnection] = None,
+        clock=None,
+        worker_id: Optional[str] = None,
+        batch_size: int = EMAIL_BATCH_SIZE,
+        dev_mode: bool = EMAIL_DEV_MODE
+    ):
+        self.session_factory = session_factory
+        self.connection = connection or SMTPConnection()
+        self.clock = clock or SystemClock()
+        self.worker_id = worker_id or default_worker_id()
+        self.batch_size = batch_size
+        self.dev_mode = dev_mode
+        self.metrics = {"batches": 0, "sent": 0, "retried": 0, "failed": 0, "last_error": None}
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._running = False
+
+    def claim_batch(self, db: Session) -> List[EmailOutbox]:
+        """Lease up to batch_size due emails to this worker"""
+        now = self.clock.now()
+        claimable = (
+            EmailOutbox.status == EmailStatusEnum.pending,
+            EmailOutbox.next_attempt_at <= now,
+            or_(EmailOutbox.locked_until.is_(None), EmailOutbox.locked_until < now)
+        )
+        ids = [
+            row[0] for row in db.query(EmailOutbox.email_id)
+            .filter(*claimable)
+            .order_by(EmailOutbox.next_attempt_at)
+            .limit(self.batch_size)
+            .all()
+        ]
+        if not ids:
+            return []
+
+        # Conditional update: rows another worker leased in the meantime are not taken
+        db.query(EmailOutbox).filter(EmailOutbox.email_id.in_(ids), *claimable).update({
+            EmailOutbox.locked_by: self.worker_id,
+            EmailOutbox.locked_until: now + timedelta(seconds=EMAIL_LEASE_SECONDS)
+        }, synchronize_session=False)
+        db.commit()
+
+        return db.query(EmailOutbox).filter(
+            EmailOutbox.email_id.in_(ids),
+            EmailOutbox.locked_by == self.worker_id
+        ).order_by(EmailOutbox.next_attempt_at).all()
+
+    def _mark_sent(self, email: EmailOutbox) -> None:
+        email.status = EmailStatusEnum.sent
+        email.attempts += 1
+        email.sent_at = self.clock.now()
+        email.last_error = None
+        email.locked_by = None
+        email.locked_until = None
+        self.metrics["sent"] += 1
+
+    def _mark_failed(self, email: EmailOutbox, error: Exception, permanent: bool = False) -> None:
+        email.attempts += 1
+        email.last_error = str(error)[:2000]
+        email.locked_by = None
+        email.locked_until = None
+        self.metrics["last_error"] = email.last_error
+        if permanent or email.attempts >= EMAIL_MAX_ATTEMPTS:
+            email.status = EmailStatusEnum.failed
+            self.metrics["failed"] += 1
+            logger.error(f"Giving up on email {email.email_id} to {email.recipient}: {error}")
+        else:
+            email.next_attempt_at = self.clock.now() + retry_delay(email.attempts)
+            self.metrics["retried"] += 1
+            logger.warning(
+                f"Email {email.email_id} to {email.recipient} failed (attempt {email.attempts}), "
+                f"retrying at {email.next_attempt_at}: {error}"
+            )
+
+    def deliver_batch(self) -> int:
+        """Claim and deliver one batch; returns how many emails were claimed"""
+        db = self.session_factory()
+        try:
+            batch = self.claim_batch(db)
+            if not batch:
+                self.connection.close_if_idle()
+                return 0
+
+            self.metrics["batches"] += 1
+            for index, email in enumerate(batch):
+                try:
+                    if self.dev_mode:
+                        logger.info(f"Development mode - email to {email.recipient}: {email.subject}\n{email.text_body}")
+                    else:
+                        message = compose_message(EMAIL_FROM, email.recipient, email.subject, email.text_body, email.html_body)
+                        self.connection.send(EMAIL_FROM, email.recipient, message)
+                    self._mark_sent(email)
+                except smtplib.SMTPRecipientsRefused as e:
+                    self._mark_failed(email, e, permanent=True)
+                except CONNECTION_ERRORS as e:
+                    # Server unreachable: back this one off and hand the rest back
+                    self.connection.close()
+                    self._mark_failed(email, e)
+                    for remaining in batch[index + 1:]:
+                        remaining.locked_by = None
+                        remaining.locked_until = None
+                    db.commit()
+                    break
+                except Exception as e:
+                    self._mark_failed(email, e)
+                # Commit per email so a crash never re-sends what already went out
+                db.commit()
+            return len(batch)
+        except Exception as e:
+            db.rollback()
+            self.metrics["last_error"] = str(e)
+            logger.error(f"Email outbox batch failed: {str(e)}")
+            return 0
+        finally:
+            db.close()
+
+    def drain(self, max_batches: int = 100) -> int:
+        """Deliver until nothing is due (or max_batches); returns emails processed"""
+        total = 0
+        for _ in range(max_batches):
+            claimed = self.deliver_batch()
+            total += claimed
+            if claimed < self.batch_size:
+                break
+        return total
+
+    def pending_counts(self, db: Session) -> dict:
+        rows = db.query(EmailOutbox.status, func.count(EmailOutbox.email_id)).group_by(EmailOutbox.status).all()
+        counts = {status.value: 0 for status in EmailStatusEnum}
+        for status_value, count in rows:
+            counts[getattr(status_value, "value", status_value)] = count
+        return counts
+
+    # ------------------------------------------------------------------
+    # Background task
+    # ------------------------------------------------------------------
+
+    def notify(self) -> None:
+        """Wake the worker early; safe to call from request threads"""
+        if self._loop is not None and self._wake is not None:
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    async def _run(self) -> None:
+        logger.info(f"Email outbox worker started on {self.worker_id} (dev mode: {self.dev_mode})")
+        while self._running:
+            self._wake.clear()
+            try:
+                claimed = await asyncio.to_thread(self.deliver_batch)
+            except Exception as e:
+                logger.error(f"Email outbox worker error: {e}")
+                claimed = 0
+            if claimed >= self.batch_size:
+                continue
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=EMAIL_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._loop = asyncio.get_running_loop()
+            self._wake = asyncio.Event()
+            self._running = True
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        self._running = False
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._loop = None
+        await asyncio.to_thread(self.connection.close)
+        logger.info("Email outbox worker stopped")
+
+# Shared instance started from main.py
+outbox_worker = OutboxWorker()
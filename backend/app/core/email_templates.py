@@ -0,0 +1,235 @@
+"""
+Precompiled email templates.
+
+Templates live in ``app/templates/email`` as ``<name>.html`` / ``<name>.txt``
+and use ``{{ slot }}`` placeholders (``{{ slot|raw }}`` skips HTML escaping).
+Each one is merged into the shared layout and split into its static chunks
+once, when the registry is first loaded; rendering afterwards is a single
+join of the static chunks and the escaped slot values.
+
+``compose_message`` builds the raw multipart/alternative message from a
+cached skeleton, with the bodies base64-encoded, so a large run (e.g. the
+weekly digest) spends its time in I/O rather than in ``email.mime``.
+"""
+
+import os
+import re
+import binascii
+import logging
+from dataclasses import dataclass
+from email.header import Header
+from functools import lru_cache
+from html import escape
+from typing import Dict, Mapping, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "templates", "email")
+
+_SLOT_PATTERN = re.compile(r"\{\{\s*([a-zA-Z_][a-zA-Z0-9_]*)(\|raw)?\s*\}\}")
+
+class TemplateError(Exception):
+    """Raised for unknown templates or missing slot values"""
+    pass
+
+@dataclass(frozen=True)
+class EmailTemplateSpec:
+    subject: str
+    heading: str = ""
+    subtitle: str = ""
+    layout: bool = True         # False for partials such as digest items
+
+# Subject/heading/subtitle may use the same slots as the body
+EMAIL_TEMPLATES: Dict[str, EmailTemplateSpec] = {
+    "password_reset": EmailTemplateSpec(
+        subject="Reset Your TimeNest Password",
+        heading="Reset Your Password",
+        subtitle="We received a request to reset your TimeNest account password",
+    ),
+    "booking_confirmed": EmailTemplateSpec(
+        subject="Your booking for {{ service_title }} is confirmed",
+        heading="Booking Confirmed",
+        subtitle="{{ service_title }} with {{ provider_name }}",
+    ),
+    "proposal_received": EmailTemplateSpec(
+        subject="New proposal for \"{{ request_title }}\"",
+        heading="You Have a New Proposal",
+        subtitle="{{ proposer_name }} wants to help with your request",
+    ),
+    "weekly_digest": EmailTemplateSpec(
+        subject="Your weekly TimeNest digest",
+        heading="Your Week on TimeNest",
+        subtitle="{{ summary }}",
+    ),
+    "weekly_digest_item": EmailTemplateSpec(subject="", layout=False),
+}
+
+# ----------------------------------------------------------------------
+# Compilation
+# ----------------------------------------------------------------------
+
+class CompiledTemplate:
+    """A template split into static chunks and (slot name, raw) pairs"""
+
+    __slots__ = ("name", "chunks", "slots", "escape_html")
+
+    def __init__(self, name: str, source: str, escape_html: bool):
+        self.name = name
+        self.escape_html = escape_html
+        chunks = []
+        slots = []
+        position = 0
+        for match in _SLOT_PATTERN.finditer(source):
+            chunks.append(source[position:match.start()])
+            slots.append((match.group(1), bool(match.group(2))))
+            position = match.end()
+        chunks.append(source[position:])
+        self.chunks = tuple(chunks)
+        self.slots = tuple(slots)
+
+    @property
+    def slot_names(self) -> Tuple[str, ...]:
+        return tuple(sorted({name for name, _ in self.slots}))
+
+    def render(self, values: Mapping[str, object]) -> str:
+        chunks = self.chunks
+        parts = [chunks[0]]
+        append = parts.append
+        escape_html = self.escape_html
+        try:
+            for index, (name, raw) in enumerate(self.slots, 1):
+                value = values[name]
+                value = value if isinstance(value, str) else str(value)
+                append(escape(value) if escape_html and not raw else value)
+                append(chunks[index])
+        except KeyError as e:
+            raise TemplateError(f"Template '{self.name}' is missing a value for {e}")
+        return "".join(parts)
+
+@dataclass(frozen=True)
+class RenderedEmail:
+    subject: str
+    text: str
+    html: str
+
+class EmailTemplate:
+    """Subject, plain-text and HTML variants of one email, compiled together"""
+
+    def __init__(self, name: str, spec: EmailTemplateSpec, layout_html: str, layout_text: str):
+        self.name = name
+        html_body = _read_template(f"{name}.html").rstrip("\n")
+        text_body = _read_template(f"{name}.txt").rstrip("\n")
+        if spec.layout:
+            html_body = _fill_layout(layout_html, spec, html_body)
+            text_body = _fill_layout(layout_text, spec, text_body)
+        self.subject = CompiledTemplate(f"{name}.subject", spec.subject, escape_html=False)
+        self.html = CompiledTemplate(f"{name}.html", html_body, escape_html=True)
+        self.text = CompiledTemplate(f"{name}.txt", text_body, escape_html=False)
+
+    def render(self, **values) -> RenderedEmail:
+        return RenderedEmail(
+            subject=self.subject.render(values),
+            text=self.text.render(values),
+            html=self.html.render(values)
+        )
+
+def _read_template(filename: str) -> str:
+    path = os.path.join(TEMPLATE_DIR, filename)
+    try:
+        with open(path, encoding="utf-8") as handle:
+            return handle.read()
+    except OSError as e:
+        raise TemplateError(f"Cannot read email template {path}: {e}")
+
+def _fill_layout(layout: str, spec: EmailTemplateSpec, body: str) -> str:
+    """Inline the body and header strings into the layout before compiling"""
+    fills = {"content": body, "heading": spec.heading, "subtitle": spec.subtitle, "subject": spec.subject}
+
+    def replace(match):
+        name = match.group(1)
+        return fills[name] if name in fills else match.group(0)
+
+    return _SLOT_PATTERN.sub(replace, layout)
+
+class EmailTemplateRegistry:
+    """All email templates, compiled once"""
+
+    def __init__(self, specs: Mapping[str, EmailTemplateSpec] = EMAIL_TEMPLATES):
+        layout_html = _read_template("layout.html")
+        layout_text = _read_template("layout.txt")
+        self.templates = {
+            name: EmailTemplate(name, spec, layout_html, layout_text)
+            for name, spec in specs.items()
+        }
+        logger.info(f"Compiled {len(self.templates)} email templates from {TEMPLATE_DIR}")
+
+    def get(self, name: str) -> EmailTemplate:
+        try:
+            return self.templates[name]
+        except KeyError:
+            raise TemplateError(f"Unknown email template: {name}")
+
+@lru_cache(maxsize=1)
+def get_email_templates() -> EmailTemplateRegistry:
+    return EmailTemplateRegistry()
+
+def render_email(name: str, **values) -> RenderedEmail:
+    """Render a named email template"""
+    return get_email_templates().get(name).render(**values)
+
+def render_partial(name: str, format: str, **values) -> str:
+    """Render only the html or txt variant of a partial (e.g. one digest item)"""
+    template = get_email_templates().get(name)
+    return (template.html if format == "html" else template.text).render(values)
+
+# ----------------------------------------------------------------------
+# MIME
+# ----------------------------------------------------------------------
+
+# '-' and '_' never occur in base64 output, so this boundary can't collide with a body
+MIME_BOUNDARY = "=_TimeNest_alternative_-_"
+
+_PART_TEMPLATE = (
+    "--" + MIME_BOUNDARY + "\n"
+    "Content-Type: text/{subtype}; charset=\"utf-8\"\n"
+    "MIME-Version: 1.0\n"
+    "Content-Transfer-Encoding: base64\n\n"
+)
+_TEXT_PART_HEADER = _PART_TEMPLATE.format(subtype="plain")
+_HTML_PART_HEADER = _PART_TEMPLATE.format(subtype="html")
+_MULTIPART_HEADERS = (
+    "Content-Type: multipart/alternative; boundary=\"" + MIME_BOUNDARY + "\"\n"
+    "MIME-Version: 1.0\n"
+)
+_CLOSING = "--" + MIME_BOUNDARY + "--\n"
+
+def _header_value(value: str) -> str:
+    # Strip line breaks so a value can never inject another header
+    value = " ".join(value.splitlines())
+    if value.isascii():
+        return value
+    return Header(value, "utf-8").encode()
+
+_BASE64_LINE = 76
+
+def _base64_body(body: str) -> str:
+    # One C-level encode, then wrap to 76-char lines (encodebytes loops per 57 bytes in Python)
+    encoded = binascii.b2a_base64(body.encode("utf-8"), newline=False).decode("ascii")
+    return "\n".join([encoded[i:i + _BASE64_LINE] for i in range(0, len(encoded), _BASE64_LINE)]) + "\n"
+
+def compose_message(sender: str, recipient: str, subject: str, text: str, html: Optional[str] = None) -> str:
+    """
+    Raw multipart/alternative message (same structure MIMEMultipart produced)
+    built from the cached skeleton.
+    """
+    parts = [
+        _MULTIPART_HEADERS,
+        "Subject: ", _header_value(subject), "\n",
+        "From: ", _header_value(sender), "\n",
+        "To: ", _header_value(recipient), "\n\n",
+        _TEXT_PART_HEADER, _base64_body(text),
+    ]
+    if html:
+        parts += [_HTML_PART_HEADER, _base64_body(html)]
+    parts.append(_CLOSING)
+    return "".join(parts)
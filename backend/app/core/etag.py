@@ -0,0 +1,59 @@
+"""
+Weak ETags and conditional GETs.
+
+A handler computes a cheap version stamp for the rows behind its response
+(counts, max ids and summed ``version`` counters, see app/db/versioning.py),
+turns it into a weak ETag together with the request's query string, and
+answers ``304 Not Modified`` when the client's If-None-Match already has
+it, before loading or formatting anything:
+
+    unchanged = conditional_get(request, response, weak_etag("services", request.url.query, stamp))
+    if unchanged:
+        return unchanged
+
+The ETags are weak because they identify the data, not the exact bytes
+(the same data may be compressed or serialized differently).
+"""
+
+import hashlib
+from typing import Optional
+
+from fastapi import Request, Response
+from sqlalchemy import func
+
+def weak_etag(*parts) -> str:
+    digest = hashlib.sha1(repr(parts).encode()).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+def _opaque(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+def if_none_match_matches(header: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against ``etag``"""
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return _opaque(etag) in (_opaque(tag) for tag in header.split(","))
+
+def etag_matches(request: Request, etag: str) -> bool:
+    return if_none_match_matches(request.headers.get("if-none-match"), etag)
+
+def not_modified(etag: str, private: bool = False) -> Response:
+    return Response(status_code=304, headers=cache_headers(etag, private))
+
+def cache_headers(etag: str, private: bool = False) -> dict:
+    """ETag plus Cache-Control asking clients to revalidate before reusing their copy"""
+    return {"ETag": etag, "Cache-Control": "private, no-cache" if private else "no-cache"}
+
+def conditional_get(request: Request, response: Response, etag: str, private: bool = False) -> Optional[Response]:
+    """A 304 response if the client's copy is current; otherwise sets the headers on ``response`` and returns None"""
+    if etag_matches(request, etag):
+        return not_modified(etag, private)
+    response.headers.update(cache_headers(etag, private))
+    return None
+
+def version_stamp(id_column, version_column) -> tuple:
+    """Aggregates that change whenever a row in the set is inserted, updated or deleted"""
+    return (func.count(id_column), func.max(id_column), func.coalesce(func.sum(version_column), 0))
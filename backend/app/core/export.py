@@ -0,0 +1,261 @@
+"""
+Streaming table exports for admins (CSV or NDJSON, optionally gzipped).
+
+Rows are read with a Core SELECT on a server-side cursor
+(``stream_results`` + ``yield_per``), so neither the database driver nor
+the ORM ever holds more than one chunk; each chunk is encoded (and
+compressed) and handed to the response before the next one is fetched.
+Rows are ordered by primary key so an export is a single index walk.
+"""
+
+import io
+import os
+import csv
+import zlib
+import enum
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import Enum as SQLEnum, Table, or_, select
+
+from ..db.database import read_engine
+from ..db.models.user import User
+from ..db.models.service import Service
+from ..db.models.request import Request
+from ..db.models.serviceBooking import ServiceBooking
+from ..db.models.timeTransaction import TimeTransaction
+from ..db.models.report import Report
+from ..db.models.message import Message
+from .streaming import ndjson_line
+
+logger = logging.getLogger(__name__)
+
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", "5000"))
+EXPORT_FORMATS = ("csv", "ndjson")
+
+# A slow client can leave MySQL waiting to write the next result packet;
+# the default 60s net_write_timeout would abort long exports mid-stream
+MYSQL_EXPORT_WRITE_TIMEOUT = int(os.getenv("EXPORT_MYSQL_WRITE_TIMEOUT", "3600"))
+
+class ExportError(Exception):
+    """Raised for unknown entities or invalid filters"""
+    pass
+
+class UnknownExportError(ExportError):
+    """Raised for an entity that has no export"""
+    pass
+
+@dataclass(frozen=True)
+class ExportSpec:
+    table: Table
+    columns: Tuple[str, ...]
+    time_column: str                            # since/until filter
+    user_columns: Tuple[str, ...] = ()          # user_id filter (any of them)
+    status_column: Optional[str] = "status"
+
+    @property
+    def key(self):
+        return list(self.table.primary_key.columns)[0]
+
+# Never export credentials (password hashes, reset tokens)
+EXPORTS: Dict[str, ExportSpec] = {
+    "users": ExportSpec(
+        User.__table__,
+        ("user_id", "first_name", "last_name", "email", "phone_number", "gender", "age", "location",
+         "time_credits", "total_credits_earned", "total_credits_spent", "services_completed_count",
+         "services_availed_count", "status", "date_joined", "last_login"),
+        time_column="date_joined",
+        user_columns=("user_id",),
+    ),
+    "services": ExportSpec(
+        Service.__table__,
+        ("service_id", "creator_id", "title", "description", "category", "time_credits_per_hour",
+         "location", "tags", "status", "created_at"),
+        time_column="created_at",
+        user_columns=("creator_id",),
+    ),
+    "requests": ExportSpec(
+        Request.__table__,
+        ("request_id", "creator_id", "title", "description", "category", "budget", "location",
+         "deadline", "urgency", "tags", "skills", "status", "created_at"),
+        time_column="created_at",
+        user_columns=("creator_id",),
+    ),
+    "bookings": ExportSpec(
+        ServiceBooking.__table__,
+        ("booking_id", "service_id", "user_id", "provider_id", "booking_date", "scheduled_datetime",
+         "end_datetime", "duration_minutes", "status", "time_credits_used"),
+        time_column="booking_date",
+        user_columns=("user_id", "provider_id"),
+    ),
+    "transactions": ExportSpec(
+        TimeTransaction.__table__,
+        ("transaction_id", "user_id", "amount", "transaction_type", "reference_type", "reference_id",
+         "description", "balance_before", "balance_after", "created_at"),
+        time_column="created_at",
+        user_columns=("user_id",),
+        status_column="transaction_type",
+    ),
+    "reports": ExportSpec(
+        Report.__table__,
+        ("report_id", "reporter_id", "reported_user_id", "reported_service_id", "reported_request_id",
+         "report_type", "category", "title", "description", "status", "assigned_admin_id",
+         "resolution", "created_at", "resolved_at"),
+        time_column="created_at",
+        user_columns=("reporter_id", "reported_user_id"),
+    ),
+    "messages": ExportSpec(
+        Message.__table__,
+        ("id", "conversation_id", "sender_id", "message_type", "content", "status", "is_edited",
+         "is_deleted", "created_at"),
+        time_column="created_at",
+        user_columns=("sender_id",),
+    ),
+}
+
+def get_export_spec(entity: str) -> ExportSpec:
+    try:
+        return EXPORTS[entity]
+    except KeyError:
+        raise UnknownExportError(f"Unknown export '{entity}'. Must be one of: {', '.join(EXPORTS)}")
+
+# ----------------------------------------------------------------------
+# Query
+# ----------------------------------------------------------------------
+
+def build_export_query(
+    spec: ExportSpec,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    status: Optional[str] = None,
+    user_id: Optional[int] = None
+):
+    """SELECT for the export; validates filters up front (errors after streaming starts can't be reported)"""
+    table = spec.table
+    query = select(*[table.c[name] for name in spec.columns])
+
+    if since:
+        query = query.where(table.c[spec.time_column] >= since)
+    if until:
+        query = query.where(table.c[spec.time_column] < until)
+    if status:
+        if not spec.status_column:
+            raise ExportError("This export has no status filter")
+        column = table.c[spec.status_column]
+        allowed = getattr(column.type, "enums", None)
+        if allowed and status not in allowed:
+            raise ExportError(f"Invalid {spec.status_column}. Must be one of: {', '.join(allowed)}")
+        query = query.where(column == status)
+    if user_id is not None:
+        if not spec.user_columns:
+            raise ExportError("This export has no user filter")
+        query = query.where(or_(*[table.c[name] == user_id for name in spec.user_columns]))
+
+    return query.order_by(spec.key)
+
+def _enum_positions(spec: ExportSpec) -> List[int]:
+    """Columns whose values come back as Python enum members"""
+    return [
+        position for position, name in enumerate(spec.columns)
+        if isinstance(spec.table.c[name].type, SQLEnum) and spec.table.c[name].type.enum_class is not None
+    ]
+
+def iter_export_chunks(query, spec: ExportSpec, chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[List[tuple]]:
+    """Lists of at most chunk_size row tuples, read through a server-side cursor"""
+    enum_positions = _enum_positions(spec)
+    with read_engine().connect() as connection:
+        mysql = connection.dialect.name == "mysql"
+        if mysql:
+            connection.exec_driver_sql(f"SET SESSION net_write_timeout = {MYSQL_EXPORT_WRITE_TIMEOUT}")
+        try:
+            result = connection.execution_options(stream_results=True, yield_per=chunk_size).execute(query)
+            for partition in result.partitions():
+                if enum_positions:
+                    rows = []
+                    for row in partition:
+                        row = list(row)
+                        for position in enum_positions:
+                            value = row[position]
+                            if isinstance(value, enum.Enum):
+                                row[position] = value.value
+                        rows.append(row)
+                    yield rows
+                else:
+                    yield partition
+        finally:
+            if mysql and not connection.invalidated:
+                try:
+                    connection.exec_driver_sql("SET SESSION net_write_timeout = DEFAULT")
+                except Exception:
+                    connection.invalidate()
+
+# ----------------------------------------------------------------------
+# Encoding
+# ----------------------------------------------------------------------
+
+def _csv_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, bool):
+        return int(value)
+    return value
+
+def encode_csv(chunks: Iterator[List[tuple]], columns: Tuple[str, ...]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(columns)
+    for rows in chunks:
+        writer.writerows([[_csv_value(value) for value in row] for row in rows])
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    remainder = buffer.getvalue()
+    if remainder:
+        yield remainder.encode("utf-8")
+
+def encode_ndjson(chunks: Iterator[List[tuple]], columns: Tuple[str, ...]) -> Iterator[bytes]:
+    for rows in chunks:
+        yield b"".join([ndjson_line(dict(zip(columns, row))) for row in rows])
+
+def gzip_stream(chunks: Iterator[bytes], level: int = 6) -> Iterator[bytes]:
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)     # wbits=31: gzip container
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+def export_stream(
+    entity: str,
+    format: str = "csv",
+    gzip: bool = False,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    status: Optional[str] = None,
+    user_id: Optional[int] = None,
+    chunk_size: int = EXPORT_CHUNK_SIZE
+) -> Tuple[Iterator[bytes], str, str]:
+    """
+    (byte iterator, media type, filename) for an export.
+
+    Raises ExportError before any row is read if the entity, format or a
+    filter is invalid.
+    """
+    if format not in EXPORT_FORMATS:
+        raise ExportError(f"Invalid format. Must be one of: {', '.join(EXPORT_FORMATS)}")
+    spec = get_export_spec(entity)
+    query = build_export_query(spec, since, until, status, user_id)
+
+    encode = encode_csv if format == "csv" else encode_ndjson
+    stream = encode(iter_export_chunks(query, spec, chunk_size), spec.columns)
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    filename = f"{entity}-{datetime.utcnow():%Y%m%d-%H%M%S}.{format}"
+    if gzip:
+        stream = gzip_stream(stream)
+        media_type = "application/gzip"
+        filename += ".gz"
+
+    logger.info(f"Starting {format}{' (gzip)' if gzip else ''} export of {entity}")
+    return stream, media_type, filename
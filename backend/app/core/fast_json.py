@@ -0,0 +1,144 @@
+"""
+Fast JSON responses for hot list endpoints.
+
+By default FastAPI validates whatever a handler returns against its
+``response_model`` and then serializes the validated model, so a page of
+100 services built as plain dicts is checked field by field, copied into
+model instances and dumped again. Handlers that already build exactly the
+right values can skip that:
+
+    return fast_json(ServiceResponse, services, many=True, response=response)
+
+``compile_serializer`` turns a response schema into a function that picks
+the schema's fields (with their defaults and aliases) out of a dict or an
+ORM object and applies the same conversions the model's JSON
+serialization would (float fields as floats, Decimals as strings or through
+the model's json_encoders, enums as values, nested models recursively).
+The result is dumped with orjson. ``response_model=`` stays on the route,
+so the OpenAPI schema is unchanged.
+
+Opt-in per endpoint; FAST_JSON_ENABLED=false (or orjson not being
+installed) sends every endpoint back through the normal validation path.
+"""
+
+import os
+import typing
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Callable, Dict, Optional, Type
+
+from fastapi import Response
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:     # optional: without it every endpoint takes the standard path
+    orjson = None
+
+FAST_JSON_ENABLED = os.getenv("FAST_JSON_ENABLED", "true").lower() == "true" and orjson is not None
+
+_MISSING = object()
+
+def _passthrough(value):
+    return value
+
+def _enum_value(value):
+    return value.value if isinstance(value, Enum) else value
+
+def _to_float(value):
+    return float(value) if value is not None else None
+
+def _decimal_encoder(model: Type[BaseModel]) -> Callable:
+    encoders = (model.model_config.get("json_encoders") or {})
+    if Decimal in encoders:
+        encode = encoders[Decimal]
+        return lambda value: encode(value if isinstance(value, Decimal) else Decimal(str(value))) if value is not None else None
+    return lambda value: str(value if isinstance(value, Decimal) else Decimal(str(value))) if value is not None else None
+
+def _converter(annotation, model: Type[BaseModel]) -> Callable:
+    """Function converting one value of ``annotation`` to what the model's JSON output holds"""
+    origin = typing.get_origin(annotation)
+    if origin is typing.Union:
+        options = [arg for arg in typing.get_args(annotation) if arg is not type(None)]
+        return _converter(options[0], model) if len(options) == 1 else _passthrough
+    if origin in (list, tuple, set, frozenset):
+        args = typing.get_args(annotation)
+        item = _converter(args[0], model) if args else _passthrough
+        if item is _passthrough:
+            return lambda value: list(value) if value is not None else None
+        return lambda value: [item(entry) for entry in value] if value is not None else None
+    if not isinstance(annotation, type):
+        return _passthrough
+    if issubclass(annotation, BaseModel):
+        return compile_serializer(annotation)
+    if issubclass(annotation, Enum) or annotation is str:
+        return _enum_value
+    if annotation is float:
+        return _to_float
+    if issubclass(annotation, Decimal):
+        return _decimal_encoder(model)
+    return _passthrough
+
+_serializers: Dict[type, Callable[[Any], Optional[dict]]] = {}
+
+def compile_serializer(model: Type[BaseModel]) -> Callable[[Any], Optional[dict]]:
+    """Precompiled ``obj -> dict`` for ``model``'s JSON output; ``obj`` is a dict, model or ORM object"""
+    if model in _serializers:
+        return _serializers[model]
+
+    # Generated straight-line code: one lookup per field, conversions only where the type needs one
+    namespace = {"_MISSING": _MISSING, "Enum": Enum}
+    # Registered up front so a model nested in itself resolves to this serializer
+    _serializers[model] = lambda obj: namespace["serialize"](obj)
+    lines = [
+        "def serialize(obj):",
+        "    if obj is None:",
+        "        return None",
+        "    get = obj.get if obj.__class__ is dict else (lambda name, default: getattr(obj, name, default))",
+        "    output = {}",
+    ]
+    for index, (name, field) in enumerate(model.model_fields.items()):
+        lines.append(f"    value = get({name!r}, _MISSING)")
+        if field.default_factory is not None:
+            namespace[f"factory{index}"] = field.default_factory
+            lines += ["    if value is _MISSING:", f"        value = factory{index}()"]
+        else:
+            default = None if field.is_required() else field.default
+            namespace[f"default{index}"] = default
+            lines += ["    if value is _MISSING:", f"        value = default{index}"]
+        convert = _converter(field.annotation, model)
+        key = field.alias or name
+        if convert is _passthrough:
+            lines.append(f"    output[{key!r}] = value")
+        elif convert is _enum_value:
+            lines.append(f"    output[{key!r}] = value.value if isinstance(value, Enum) else value")
+        else:
+            namespace[f"convert{index}"] = convert
+            lines.append(f"    output[{key!r}] = None if value is None else convert{index}(value)")
+    lines.append("    return output")
+
+    exec("\n".join(lines), namespace)
+    _serializers[model] = namespace["serialize"]
+    return namespace["serialize"]
+
+class FastJSONResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_UTC_Z)
+
+def fast_json(model: Type[BaseModel], content, many: bool = False, response: Optional[Response] = None):
+    """
+    The response for ``content`` shaped as ``model`` (a list of them with
+    many=True), serialized directly. Headers set on the endpoint's injected
+    ``response`` are carried over. Returns ``content`` unchanged when the
+    fast path is disabled, so FastAPI validates it as usual.
+    """
+    if not FAST_JSON_ENABLED:
+        return content
+    serialize = compile_serializer(model)
+    payload = [serialize(item) for item in content] if many else serialize(content)
+    headers = dict(response.headers) if response is not None else None
+    if headers:
+        headers.pop("content-length", None)
+    return FastJSONResponse(payload, headers=headers)
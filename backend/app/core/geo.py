@@ -0,0 +1,221 @@
+"""
+Geocoding and proximity search.
+
+Services, requests and users store numeric latitude/longitude plus a
+geohash. Geohashes sharing a prefix are spatially close, so a radius search
+becomes a handful of indexed ``geohash LIKE 'prefix%'`` range scans over
+the cells covering the search circle; only those candidates get an exact
+haversine distance check.
+
+Coordinates come from the client when it has them, otherwise from a local
+gazetteer CSV (name,latitude,longitude) so geocoding never touches the network.
+"""
+
+import os
+import csv
+import math
+import logging
+from functools import lru_cache
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import or_
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE_LAT = 111.32
+
+GEOHASH_PRECISION = 12
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+# Covering a circle with more cells than this falls back to a coarser precision
+MAX_COVER_CELLS = 16
+
+MAX_RADIUS_KM = 500.0
+
+DEFAULT_GAZETTEER_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "gazetteer.csv")
+GAZETTEER_PATH = os.getenv("GAZETTEER_PATH", DEFAULT_GAZETTEER_PATH)
+
+# ----------------------------------------------------------------------
+# Geohash
+# ----------------------------------------------------------------------
+
+def encode_geohash(latitude: float, longitude: float, precision: int = GEOHASH_PRECISION) -> str:
+    """Standard base32 geohash of a point"""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True
+    while len(chars) < precision:
+        if even:
+            mid = (lon_range[0] + lon_range[1]) / 2
+            if longitude >= mid:
+                bits = (bits << 1) | 1
+                lon_range[0] = mid
+            else:
+                bits <<= 1
+                lon_range[1] = mid
+        else:
+            mid = (lat_range[0] + lat_range[1]) / 2
+            if latitude >= mid:
+                bits = (bits << 1) | 1
+                lat_range[0] = mid
+            else:
+                bits <<= 1
+                lat_range[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(_BASE32[bits])
+            bits = 0
+            bit_count = 0
+    return "".join(chars)
+
+def cell_size(precision: int) -> Tuple[float, float]:
+    """(lat_degrees, lon_degrees) covered by one geohash cell"""
+    total_bits = 5 * precision
+    lon_bits = (total_bits + 1) // 2
+    lat_bits = total_bits // 2
+    return 180.0 / (2 ** lat_bits), 360.0 / (2 ** lon_bits)
+
+def covering_cells(latitude: float, longitude: float, radius_km: float) -> List[str]:
+    """
+    Geohash prefixes whose cells together cover the circle's bounding box.
+    Uses the finest precision that needs at most MAX_COVER_CELLS cells.
+    """
+    lat_delta = radius_km / KM_PER_DEGREE_LAT
+    lon_delta = radius_km / (KM_PER_DEGREE_LAT * max(math.cos(math.radians(latitude)), 0.01))
+
+    min_lat, max_lat = max(latitude - lat_delta, -90.0), min(latitude + lat_delta, 90.0)
+    min_lon, max_lon = longitude - lon_delta, longitude + lon_delta
+    if max_lon - min_lon >= 360.0:
+        min_lon, max_lon = -180.0, 180.0
+
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        cell_lat, cell_lon = cell_size(precision)
+        lat_steps = int((max_lat - min_lat) / cell_lat) + 2
+        lon_steps = int((max_lon - min_lon) / cell_lon) + 2
+        if lat_steps * lon_steps > MAX_COVER_CELLS and precision > 1:
+            continue
+
+        cells: Set[str] = set()
+        lat_points = [min(min_lat + i * cell_lat, max_lat) for i in range(lat_steps)]
+        lon_points = [min(min_lon + j * cell_lon, max_lon) for j in range(lon_steps)]
+        for lat in lat_points:
+            for lon in lon_points:
+                wrapped = ((lon + 180.0) % 360.0) - 180.0
+                cells.add(encode_geohash(lat, wrapped, precision))
+        return sorted(cells)
+
+    return []
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance between two points in kilometres"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+def parse_near(near: str) -> Tuple[float, float]:
+    """Parse a 'lat,lon' query parameter; raises ValueError on bad input"""
+    parts = [part.strip() for part in (near or "").split(",")]
+    if len(parts) != 2:
+        raise ValueError("near must be formatted as 'latitude,longitude'")
+    latitude, longitude = float(parts[0]), float(parts[1])
+    if not (-90.0 <= latitude <= 90.0 and -180.0 <= longitude <= 180.0):
+        raise ValueError("near is out of range")
+    return latitude, longitude
+
+# ----------------------------------------------------------------------
+# Gazetteer
+# ----------------------------------------------------------------------
+
+def _normalize_place(name: str) -> str:
+    return " ".join(name.replace(",", " , ").split()).lower().replace(" ,", ",")
+
+class Gazetteer:
+    """In-memory place name -> coordinates lookup loaded from a CSV file"""
+
+    def __init__(self, path: str = GAZETTEER_PATH):
+        self.path = path
+        self.places: Dict[str, Tuple[float, float]] = {}
+        self._load()
+
+    def _load(self) -> None:
+        if not os.path.exists(self.path):
+            logger.warning(f"Gazetteer file not found at {self.path}; locations will not be geocoded")
+            return
+
+        with open(self.path, newline="", encoding="utf-8") as handle:
+            for row in csv.DictReader(handle):
+                try:
+                    point = (float(row["latitude"]), float(row["longitude"]))
+                except (KeyError, TypeError, ValueError):
+                    continue
+                full_name = _normalize_place(row.get("name") or "")
+                if not full_name:
+                    continue
+                self.places.setdefault(full_name, point)
+                # Also answer to the bare place name ("Kochi" for "Kochi, Kerala")
+                self.places.setdefault(full_name.split(",")[0].strip(), point)
+
+        logger.info(f"Loaded {len(self.places)} gazetteer entries from {self.path}")
+
+    def lookup(self, location: Optional[str]) -> Optional[Tuple[float, float]]:
+        """Coordinates for a free-text location, or None if it isn't in the gazetteer"""
+        if not location:
+            return None
+        normalized = _normalize_place(location)
+        point = self.places.get(normalized)
+        if point is None:
+            point = self.places.get(normalized.split(",")[0].strip())
+        return point
+
+@lru_cache(maxsize=1)
+def get_gazetteer() -> Gazetteer:
+    return Gazetteer()
+
+# ----------------------------------------------------------------------
+# Model helpers
+# ----------------------------------------------------------------------
+
+def set_coordinates(entity, latitude: Optional[float], longitude: Optional[float]) -> None:
+    """Store coordinates and the matching geohash on a service, request or user"""
+    if latitude is None or longitude is None:
+        entity.latitude = None
+        entity.longitude = None
+        entity.geohash = None
+        return
+    entity.latitude = round(float(latitude), 6)
+    entity.longitude = round(float(longitude), 6)
+    entity.geohash = encode_geohash(float(latitude), float(longitude))
+
+def geocode_entity(entity, latitude: Optional[float] = None, longitude: Optional[float] = None) -> bool:
+    """
+    Fill in coordinates for an entity from explicit values or, failing that,
+    from its free-text location via the gazetteer. Returns True if geocoded.
+    """
+    if latitude is None or longitude is None:
+        point = get_gazetteer().lookup(entity.location)
+        latitude, longitude = point if point else (None, None)
+    set_coordinates(entity, latitude, longitude)
+    return entity.geohash is not None
+
+def proximity_filter(model, latitude: float, longitude: float, radius_km: float):
+    """Geohash-prefix filter covering the search circle (exact distance is checked afterwards)"""
+    return or_(*[model.geohash.like(f"{cell}%") for cell in covering_cells(latitude, longitude, radius_km)])
+
+def sort_by_distance(rows, latitude: float, longitude: float, radius_km: float) -> List[Tuple[object, float]]:
+    """(row, distance_km) pairs within radius_km, nearest first"""
+    within = []
+    for row in rows:
+        if row.latitude is None or row.longitude is None:
+            continue
+        distance = haversine_km(latitude, longitude, float(row.latitude), float(row.longitude))
+        if distance <= radius_km:
+            within.append((row, round(distance, 2)))
+    within.sort(key=lambda item: item[1])
+    return within
@@ -0,0 +1,107 @@
+"""
+Time-based lifecycle sweeps run by the scheduler.
+
+Each job walks an index in bounded batches (at most MAX_BATCHES_PER_RUN
+per tick) and commits per batch, so a backlog is worked off over several
+ticks instead of one long transaction.
+"""
+
+import logging
+from datetime import datetime
+
+from sqlalchemy.orm import Session
+
+from ..db.models.request import Request, RequestStatusEnum
+from ..db.models.serviceBooking import ServiceBooking, BookingStatusEnum
+from ..db.models.user import User
+from .response_cache import invalidate_response_cache
+from .digest import DIGEST_CHUNK_SIZE, weekly_digest_job
+from .scheduler import Scheduler
+
+logger = logging.getLogger(__name__)
+
+MAX_BATCHES_PER_RUN = 10
+
+# forgot_password stores reset_token_expires_at in India local time
+RESET_TOKEN_TIMEZONE = "Asia/Kolkata"
+
+def _sweep(db: Session, id_query, apply, batch_size: int) -> int:
+    """Repeatedly take up to batch_size ids from id_query and apply() to them"""
+    processed = 0
+    for _ in range(MAX_BATCHES_PER_RUN):
+        ids = [row[0] for row in id_query.limit(batch_size).all()]
+        if not ids:
+            break
+        apply(ids)
+        db.commit()
+        processed += len(ids)
+        if len(ids) < batch_size:
+            break
+    return processed
+
+def close_expired_requests(db: Session, now: datetime, batch_size: int) -> int:
+    """Close active requests whose deadline day has passed (ix_requests_status_deadline)"""
+    id_query = db.query(Request.request_id).filter(
+        Request.status == RequestStatusEnum.active,
+        Request.deadline < now.date()
+    ).order_by(Request.deadline)
+
+    closed = []
+
+    def apply(ids):
+        db.query(Request).filter(Request.request_id.in_(ids)).update(
+            {Request.status: RequestStatusEnum.closed}, synchronize_session=False
+        )
+        closed.extend(ids)
+
+    processed = _sweep(db, id_query, apply, batch_size)
+    if closed:
+        invalidate_response_cache("requests", *(f"request:{request_id}" for request_id in closed))
+    return processed
+
+def expire_stale_bookings(db: Session, now: datetime, batch_size: int) -> int:
+    """Cancel pending bookings whose start time has passed (ix_service_bookings_status_schedule)"""
+    id_query = db.query(ServiceBooking.booking_id).filter(
+        ServiceBooking.status == BookingStatusEnum.pending,
+        ServiceBooking.scheduled_datetime < now
+    ).order_by(ServiceBooking.scheduled_datetime)
+
+    def apply(ids):
+        # Re-check the status so a booking confirmed mid-sweep is left alone
+        db.query(ServiceBooking).filter(
+            ServiceBooking.booking_id.in_(ids),
+            ServiceBooking.status == BookingStatusEnum.pending
+        ).update({ServiceBooking.status: BookingStatusEnum.cancelled}, synchronize_session=False)
+
+    return _sweep(db, id_query, apply, batch_size)
+
+def clear_expired_reset_tokens(db: Session, now: datetime, batch_size: int) -> int:
+    """Null out password reset tokens past their expiry (ix_users_reset_token_expires_at)"""
+    from pytz import timezone, utc
+    local_now = utc.localize(now).astimezone(timezone(RESET_TOKEN_TIMEZONE)).replace(tzinfo=None)
+    id_query = db.query(User.user_id).filter(
+        User.reset_token_expires_at < local_now
+    ).order_by(User.reset_token_expires_at)
+
+    def apply(ids):
+        db.query(User).filter(User.user_id.in_(ids)).update(
+            {User.reset_token: None, User.reset_token_expires_at: None}, synchronize_session=False
+        )
+
+    return _sweep(db, id_query, apply, batch_size)
+
+def sweep_chat_state(db: Session, now: datetime, batch_size: int) -> int:
+    """Drop stale entries from this worker's ChatManager maps"""
+    from .websocket import chat_manager
+    return chat_manager.sweep_stale_state()
+
+def register_lifecycle_jobs(scheduler: Scheduler) -> None:
+    scheduler.register("close_expired_requests", "5 * * * *", close_expired_requests)
+    scheduler.register("expire_stale_bookings", "*/15 * * * *", expire_stale_bookings)
+    scheduler.register("clear_expired_reset_tokens", "*/30 * * * *", clear_expired_reset_tokens)
+    # In-memory state is per worker, so every worker sweeps its own
+    scheduler.register("sweep_chat_state", "*/5 * * * *", sweep_chat_state, leader_only=False)
+    # Mondays 08:00 UTC; a long lease since the run covers every user
+    scheduler.register(
+        "weekly_digest", "0 8 * * 1", weekly_digest_job, batch_size=DIGEST_CHUNK_SIZE, lease_seconds=3600
+    )
@@ -0,0 +1,288 @@
+"""
+Request <-> service matching.
+
+Candidates come from the tag association tables (an inverted index from
+tag_id to services/requests that is already kept current on every create
+and edit) plus same-category listings. Each candidate's tag set is its sparse
+feature vector; it is fetched for the whole candidate set in one query
+and scored in memory. Only the top-k survive.
+"""
+
+import heapq
+import logging
+from decimal import Decimal
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+from sqlalchemy import func, desc
+
+from ..db.models.service import Service, ServiceStatusEnum
+from ..db.models.request import Request, RequestStatusEnum, RequestUrgencyEnum
+from ..db.models.rating import Rating
+from ..db.models.user import User
+from ..db.models.tag import Tag, service_tags, request_tags, request_skills
+from .geo import haversine_km
+from .availability import FLEXIBLE_BIT, slot_count
+
+logger = logging.getLogger(__name__)
+
+# Contribution of each signal to the final 0..1 score
+MATCH_WEIGHTS = {
+    "tags": 0.40,
+    "category": 0.20,
+    "budget": 0.15,
+    "rating": 0.10,
+    "location": 0.10,
+    "availability": 0.05,
+}
+
+# Upper bound on candidates pulled from the index before scoring
+MAX_CANDIDATES = 300
+
+# Ratings are shrunk toward this prior so one 5-star review doesn't dominate
+RATING_PRIOR_MEAN = 3.0
+RATING_PRIOR_WEIGHT = 3
+
+AVAILABILITY_SLOT_COUNT = 6
+
+# Location score falls linearly to zero at this distance
+LOCATION_FALLOFF_KM = 50.0
+
+def _normalize_location(location: Optional[str]) -> str:
+    return (location or "").strip().lower()
+
+def _location_score(request: Request, service: Service) -> float:
+    """Distance-based when both sides are geocoded, exact place name match otherwise"""
+    if None not in (request.latitude, request.longitude, service.latitude, service.longitude):
+        distance = haversine_km(
+            float(request.latitude), float(request.longitude),
+            float(service.latitude), float(service.longitude)
+        )
+        return max(0.0, 1.0 - distance / LOCATION_FALLOFF_KM)
+    return 1.0 if _normalize_location(service.location) == _normalize_location(request.location) else 0.0
+
+def _overlap_score(wanted: Set[int], offered: Set[int]) -> float:
+    """Share of the wanted tags covered by the offer (0 when nothing is wanted)"""
+    if not wanted or not offered:
+        return 0.0
+    return len(wanted & offered) / len(wanted)
+
+def _budget_score(budget: Optional[Decimal], rate: Optional[Decimal]) -> float:
+    """1.0 when the hourly rate fits the budget, decaying as it exceeds it"""
+    if not budget or not rate:
+        return 0.5
+    budget, rate = float(budget), float(rate)
+    return 1.0 if rate <= budget else budget / rate
+
+def _rating_score(average: Optional[float], count: int) -> float:
+    total = (average or 0.0) * count + RATING_PRIOR_MEAN * RATING_PRIOR_WEIGHT
+    return (total / (count + RATING_PRIOR_WEIGHT)) / 5.0
+
+def _availability_score(service: Service, urgency) -> float:
+    mask = service.availability_mask or 0
+    if mask & FLEXIBLE_BIT:
+        return 1.0
+    score = slot_count(mask) / AVAILABILITY_SLOT_COUNT
+    # Urgent requests need providers who are around often
+    if urgency in (RequestUrgencyEnum.high, RequestUrgencyEnum.urgent):
+        score = score ** 0.5 if score else 0.0
+    return score
+
+class MatchingEngine:
+    """Scores open requests against active services and vice versa"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    # ------------------------------------------------------------------
+    # Feature loading
+    # ------------------------------------------------------------------
+
+    def _service_tag_vectors(self, service_ids: List[int]) -> Dict[int, Set[int]]:
+        vectors: Dict[int, Set[int]] = {service_id: set() for service_id in service_ids}
+        if service_ids:
+            rows = self.db.query(service_tags.c.service_id, service_tags.c.tag_id).filter(
+                service_tags.c.service_id.in_(service_ids)
+            ).all()
+            for service_id, tag_id in rows:
+                vectors[service_id].add(tag_id)
+        return vectors
+
+    def _request_tag_vectors(self, request_ids: List[int]) -> Dict[int, Set[int]]:
+        vectors: Dict[int, Set[int]] = {request_id: set() for request_id in request_ids}
+        if request_ids:
+            for table in (request_tags, request_skills):
+                rows = self.db.query(table.c.request_id, table.c.tag_id).filter(
+                    table.c.request_id.in_(request_ids)
+                ).all()
+                for request_id, tag_id in rows:
+                    vectors[request_id].add(tag_id)
+        return vectors
+
+    def _provider_ratings(self, provider_ids: Set[int]) -> Dict[int, Tuple[float, int]]:
+        if not provider_ids:
+            return {}
+        rows = self.db.query(
+            Rating.provider_id,
+            func.avg(Rating.rating),
+            func.count(Rating.rating_id)
+        ).filter(
+            Rating.provider_id.in_(list(provider_ids))
+        ).group_by(Rating.provider_id).all()
+        return {provider_id: (float(average or 0), count) for provider_id, average, count in rows}
+
+    def _tag_names(self, tag_ids: Set[int]) -> Dict[int, str]:
+        if not tag_ids:
+            return {}
+        return dict(self.db.query(Tag.tag_id, Tag.display_name).filter(Tag.tag_id.in_(list(tag_ids))).all())
+
+    def _creator_names(self, user_ids: Set[int]) -> Dict[int, str]:
+        if not user_ids:
+            return {}
+        rows = self.db.query(User.user_id, User.first_name, User.last_name).filter(
+            User.user_id.in_(list(user_ids))
+        ).all()
+        return {user_id: f"{first_name} {last_name}" for user_id, first_name, last_name in rows}
+
+    # ------------------------------------------------------------------
+    # Scoring
+    # ------------------------------------------------------------------
+
+    def _score(
+        self,
+        request: Request,
+        request_vector: Set[int],
+        service: Service,
+        service_vector: Set[int],
+        rating: Tuple[float, int]
+    ) -> Tuple[float, Dict[str, float]]:
+        breakdown = {
+            "tags": _overlap_score(request_vector, service_vector),
+            "category": 1.0 if service.category == request.category else 0.0,
+            "budget": _budget_score(request.budget, service.time_credits_per_hour),
+            "rating": _rating_score(*rating),
+            "location": _location_score(request, service),
+            "availability": _availability_score(service, request.urgency),
+        }
+        score = sum(MATCH_WEIGHTS[signal] * value for signal, value in breakdown.items())
+        return round(score, 4), {signal: round(value, 3) for signal, value in breakdown.items()}
+
+    def _build_result(self, entity_id, entity, score, breakdown, shared_tag_ids, tag_names, creator_names) -> dict:
+        return {
+            "id": entity_id,
+            "title": entity.title,
+            "category": entity.category,
+            "location": entity.location,
+            "creator_id": entity.creator_id,
+            "creator_name": creator_names.get(entity.creator_id, "Unknown"),
+            "score": score,
+            "breakdown": breakdown,
+            "shared_tags": sorted(tag_names[tag_id] for tag_id in shared_tag_ids if tag_id in tag_names),
+        }
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def match_services_for_request(self, request: Request, limit: int = 10) -> List[dict]:
+        """Top-k active services for an open request"""
+        request_vector = self._request_tag_vectors([request.request_id])[request.request_id]
+
+        # Candidates sharing the most tags first, straight off the (tag_id, service_id) index.
+        # Status and owner are filtered before the LIMIT, so closed or own listings can't
+        # crowd out valid matches.
+        candidate_ids: List[int] = []
+        if request_vector:
+            rows = self.db.query(service_tags.c.service_id).join(
+                Service, Service.service_id == service_tags.c.service_id
+            ).filter(
+                service_tags.c.tag_id.in_(list(request_vector)),
+                Service.status == ServiceStatusEnum.active,
+                Service.creator_id != request.creator_id
+            ).group_by(service_tags.c.service_id).order_by(
+                desc(func.count(service_tags.c.tag_id))
+            ).limit(MAX_CANDIDATES).all()
+            candidate_ids = [row.service_id for row in rows]
+
+        query = self.db.query(Service).filter(
+            Service.status == ServiceStatusEnum.active,
+            Service.creator_id != request.creator_id
+        )
+        tagged = query.filter(Service.service_id.in_(candidate_ids)).all() if candidate_ids else []
+        same_category = query.filter(Service.category == request.category).order_by(
+            desc(Service.created_at)
+        ).limit(MAX_CANDIDATES).all()
+
+        candidates = {service.service_id: service for service in tagged + same_category}
+        if not candidates:
+            return []
+
+        vectors = self._service_tag_vectors(list(candidates))
+        ratings = self._provider_ratings({service.creator_id for service in candidates.values()})
+
+        scored = []
+        for service_id, service in candidates.items():
+            score, breakdown = self._score(
+                request, request_vector, service, vectors[service_id],
+                ratings.get(service.creator_id, (0.0, 0))
+            )
+            scored.append((score, service_id, breakdown))
+
+        top = heapq.nlargest(limit, scored, key=lambda item: (item[0], item[1]))
+        shared = {service_id: vectors[service_id] & request_vector for _, service_id, _ in top}
+        tag_names = self._tag_names(set().union(*shared.values()) if shared else set())
+        creator_names = self._creator_names({candidates[service_id].creator_id for _, service_id, _ in top})
+
+        return [
+            self._build_result(service_id, candidates[service_id], score, breakdown, shared[service_id], tag_names, creator_names)
+            for score, service_id, breakdown in top
+        ]
+
+    def match_requests_for_service(self, service: Service, limit: int = 10) -> List[dict]:
+        """Top-k open requests for an active service"""
+        service_vector = self._service_tag_vectors([service.service_id])[service.service_id]
+
+        candidate_ids: Set[int] = set()
+        if service_vector:
+            for table in (request_tags, request_skills):
+                rows = self.db.query(table.c.request_id).join(
+                    Request, Request.request_id == table.c.request_id
+                ).filter(
+                    table.c.tag_id.in_(list(service_vector)),
+                    Request.status == RequestStatusEnum.active,
+                    Request.creator_id != service.creator_id
+                ).group_by(table.c.request_id).order_by(
+                    desc(func.count(table.c.tag_id))
+                ).limit(MAX_CANDIDATES).all()
+                candidate_ids.update(row.request_id for row in rows)
+
+        query = self.db.query(Request).filter(
+            Request.status == RequestStatusEnum.active,
+            Request.creator_id != service.creator_id
+        )
+        tagged = query.filter(Request.request_id.in_(list(candidate_ids))).all() if candidate_ids else []
+        same_category = query.filter(Request.category == service.category).order_by(
+            desc(Request.created_at)
+        ).limit(MAX_CANDIDATES).all()
+
+        candidates = {request.request_id: request for request in tagged + same_category}
+        if not candidates:
+            return []
+
+        vectors = self._request_tag_vectors(list(candidates))
+        rating = self._provider_ratings({service.creator_id}).get(service.creator_id, (0.0, 0))
+
+        scored = []
+        for request_id, request in candidates.items():
+            score, breakdown = self._score(request, vectors[request_id], service, service_vector, rating)
+            scored.append((score, request_id, breakdown))
+
+        top = heapq.nlargest(limit, scored, key=lambda item: (item[0], item[1]))
+        shared = {request_id: vectors[request_id] & service_vector for _, request_id, _ in top}
+        tag_names = self._tag_names(set().union(*shared.values()) if shared else set())
+        creator_names = self._creator_names({candidates[request_id].creator_id for _, request_id, _ in top})
+
+        return [
+            self._build_result(request_id, candidates[request_id], score, breakdown, shared[request_id], tag_names, creator_names)
+            for score, request_id, breakdown in top
+        ]
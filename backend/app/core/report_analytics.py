@@ -0,0 +1,96 @@
+"""
+Report statistics for the admin and moderator dashboards.
+
+Status counts are one ``GROUP BY status`` query and weekday buckets one
+``GROUP BY DAYOFWEEK(created_at)`` query, both served by the
+(status, created_at) index on reports. Results are cached for a few seconds;
+creating or updating a report calls ``invalidate_report_stats``.
+"""
+
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from ..db.models.report import Report
+from .cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+REPORT_STATUSES = ('pending', 'under_review', 'resolved', 'dismissed', 'escalated')
+WEEKDAYS = ('Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun')
+
+REPORT_STATS_TTL_SECONDS = 30
+
+_CACHE_PREFIX = "report-stats"
+report_stats_cache = TTLCache(default_ttl=REPORT_STATS_TTL_SECONDS, max_entries=256)
+
+def invalidate_report_stats() -> None:
+    """Call after a report is created or its status changes"""
+    report_stats_cache.invalidate(_CACHE_PREFIX)
+
+class ReportAnalytics:
+    """Aggregate queries over the reports table"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _in_range(self, query, start: Optional[datetime], end: Optional[datetime]):
+        if start is not None:
+            query = query.filter(Report.created_at >= start)
+        if end is not None:
+            query = query.filter(Report.created_at <= end)
+        return query
+
+    def _weekday_expression(self):
+        """SQL weekday expression and the value it gives for Sunday"""
+        if self.db.get_bind().dialect.name == "sqlite":
+            # strftime('%w'): 0 = Sunday ... 6 = Saturday
+            return func.strftime('%w', Report.created_at), 0
+        # DAYOFWEEK: 1 = Sunday ... 7 = Saturday
+        return func.dayofweek(Report.created_at), 1
+
+    def status_counts(self, start: Optional[datetime] = None, end: Optional[datetime] = None) -> Dict[str, int]:
+        """{status: count} for every status (zeros included) plus 'total'"""
+
+        def load():
+            query = self._in_range(
+                self.db.query(Report.status, func.count(Report.report_id)), start, end
+            ).group_by(Report.status)
+            counts = {report_status: 0 for report_status in REPORT_STATUSES}
+            for report_status, count in query.all():
+                counts[report_status] = count
+            counts["total"] = sum(counts.values())
+            return counts
+
+        return dict(report_stats_cache.get_or_set((_CACHE_PREFIX, "status", start, end), load))
+
+    def summary(self, start: Optional[datetime] = None, end: Optional[datetime] = None) -> Dict[str, int]:
+        """Counts shaped like the ReportSummary schema"""
+        counts = self.status_counts(start, end)
+        return {
+            "total_reports": counts["total"],
+            "pending_reports": counts["pending"],
+            "under_review_reports": counts["under_review"],
+            "resolved_reports": counts["resolved"],
+            "dismissed_reports": counts["dismissed"],
+            "escalated_reports": counts["escalated"],
+        }
+
+    def weekday_counts(self, start: Optional[datetime] = None, end: Optional[datetime] = None) -> List[dict]:
+        """[{'day': 'Mon', 'reports': n}, ...] Monday first, counted in SQL"""
+
+        def load():
+            weekday, sunday = self._weekday_expression()
+            query = self._in_range(
+                self.db.query(weekday.label("weekday"), func.count(Report.report_id)), start, end
+            ).group_by("weekday")
+            counts = {day: 0 for day in WEEKDAYS}
+            for number, count in query.all():
+                # Shift so Monday = 0 ... Sunday = 6
+                counts[WEEKDAYS[(int(number) - sunday - 1) % 7]] += count
+            return [{"day": day, "reports": counts[day]} for day in WEEKDAYS]
+
+        return [dict(entry) for entry in report_stats_cache.get_or_set((_CACHE_PREFIX, "weekday", start, end), load)]
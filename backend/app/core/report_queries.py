@@ -0,0 +1,80 @@
+"""
+Report list/detail queries shared by the admin and moderator endpoints.
+
+``report_details_query`` eager-loads the reporter, reported user, service
+and request with ``selectinload``, so a page of reports costs the page
+query plus at most four IN-queries however many rows it has.
+``report_response`` turns a loaded report into the ReportResponse fields
+without touching the database again.
+"""
+
+from typing import Callable, List, Optional
+
+from sqlalchemy import desc
+from sqlalchemy.orm import Session, load_only, selectinload
+
+from ..db.models.report import Report
+from ..db.models.request import Request
+from ..db.models.service import Service
+from ..db.models.user import User
+
+def report_details_query(db: Session):
+    """Report query with its related rows loaded in one IN-query each"""
+    return db.query(Report).options(
+        selectinload(Report.reporter).load_only(User.user_id, User.first_name, User.last_name),
+        selectinload(Report.reported_user).load_only(User.user_id, User.first_name, User.last_name),
+        selectinload(Report.reported_service).load_only(Service.service_id, Service.title),
+        selectinload(Report.reported_request).load_only(Request.request_id, Request.title),
+    )
+
+def filter_reports(
+    query,
+    status_filter: Optional[str] = None,
+    report_type: Optional[str] = None,
+    category: Optional[str] = None
+):
+    """Apply the list endpoints' optional filters"""
+    if status_filter:
+        query = query.filter(Report.status == status_filter)
+    if report_type:
+        query = query.filter(Report.report_type == report_type)
+    if category:
+        query = query.filter(Report.category == category)
+    return query
+
+def load_report_page(query, limit: int = 50, offset: int = 0) -> List[Report]:
+    """Newest first page of a report_details_query"""
+    return query.order_by(desc(Report.created_at)).offset(offset).limit(limit).all()
+
+def load_report(db: Session, report_id: int) -> Optional[Report]:
+    return report_details_query(db).filter(Report.report_id == report_id).first()
+
+def full_name(user: Optional[User]) -> Optional[str]:
+    return f"{user.first_name} {user.last_name}" if user else None
+
+def report_response(report: Report, user_name: Callable[[Optional[User]], Optional[str]] = full_name) -> dict:
+    """ReportResponse fields for a report loaded by report_details_query"""
+    service = report.reported_service if report.reported_service_id else None
+    request_obj = report.reported_request if report.reported_request_id else None
+    return {
+        "report_id": report.report_id,
+        "reporter_id": report.reporter_id,
+        "reported_service_id": report.reported_service_id,
+        "reported_request_id": report.reported_request_id,
+        "reported_user_id": report.reported_user_id,
+        "report_type": report.report_type,
+        "category": report.category,
+        "title": report.title,
+        "description": report.description,
+        "status": report.status,
+        "assigned_admin_id": report.assigned_admin_id,
+        "admin_notes": report.admin_notes,
+        "resolution": report.resolution,
+        "created_at": report.created_at,
+        "updated_at": report.updated_at,
+        "resolved_at": report.resolved_at,
+        "reporter_name": user_name(report.reporter),
+        "reported_user_name": user_name(report.reported_user),
+        "service_title": service.title if service else None,
+        "request_title": request_obj.title if request_obj else None,
+    }
@@ -0,0 +1,268 @@
+"""
+Response cache for the public catalog endpoints.
+
+``ResponseCacheMiddleware`` caches whole GET responses for the routes in
+``CATALOG_RULES`` (service and request listings and details, public
+ratings). The key is the path plus the query parameters sorted by name, so
+``?limit=10&skip=0`` and ``?skip=0&limit=10`` share an entry. Only 200
+responses without cookies are stored.
+
+- Fresh entries (RESPONSE_CACHE_TTL seconds) are served directly.
+- Stale entries (up to RESPONSE_CACHE_STALE_TTL seconds more) are served
+  while one background request refreshes them (stale-while-revalidate).
+- Concurrent misses for the same key wait for the first request instead of
+  all running the handler (single flight per worker; with Redis, one worker
+  at a time revalidates a stale entry).
+
+Every entry is tagged (e.g. ``services``, ``service:12``), and the write
+handlers call ``invalidate_response_cache`` with the tags they affect after
+committing. Entries are kept in an in-process LRU; with
+RESPONSE_CACHE_REDIS_URL (needs the ``redis`` package) entries and
+invalidations are shared by all workers. Without it, other workers see a
+write at the latest when their entry expires.
+
+Responses carry ``X-Cache: HIT | STALE | MISS``; counters are in
+``GET /admin/cache``. A cached response with an ETag is answered with a 304
+when the request's If-None-Match matches it.
+"""
+
+import os
+import re
+import time
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode
+
+from .cache import CacheEntry, CacheStore
+from .etag import if_none_match_matches
+
+logger = logging.getLogger(__name__)
+
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() == "true"
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "30"))
+RESPONSE_CACHE_STALE_TTL = float(os.getenv("RESPONSE_CACHE_STALE_TTL", "120"))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "2048"))
+RESPONSE_CACHE_MAX_BODY_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BODY_BYTES", str(1024 * 1024)))
+RESPONSE_CACHE_REDIS_URL = os.getenv("RESPONSE_CACHE_REDIS_URL") or None
+
+# Added by the cache; never stored with an entry
+CACHE_HEADERS = {b"x-cache", b"age"}
+
+@dataclass(frozen=True)
+class CacheRule:
+    """Paths matching ``pattern`` are cached under ``tags`` (formatted with the named groups)"""
+    pattern: "re.Pattern"
+    tags: Tuple[str, ...]
+
+    def match_tags(self, path: str) -> Optional[Tuple[str, ...]]:
+        match = self.pattern.match(path)
+        if not match:
+            return None
+        return ("catalog",) + tuple(tag.format(**match.groupdict()) for tag in self.tags)
+
+def rule(pattern: str, *tags: str) -> CacheRule:
+    return CacheRule(re.compile(pattern), tags)
+
+# "catalog" is added to every entry: user profile changes (names, avatars,
+# status) show up in all of them
+CATALOG_RULES = (
+    rule(r"^/api/v1/services/?$", "services"),
+    rule(r"^/api/v1/services/(?P<id>\d+)$", "service:{id}"),
+    rule(r"^/api/v1/requests/?$", "requests"),
+    rule(r"^/api/v1/requests/(?P<id>\d+)$", "request:{id}"),
+    rule(r"^/api/v1/ratings/service/(?P<id>\d+)(/stats)?$", "ratings:service:{id}"),
+    rule(r"^/api/v1/ratings/provider/(?P<id>\d+)(/stats)?$", "ratings:user:{id}"),
+    rule(r"^/api/v1/users/rating/(?P<id>\d+)$", "ratings:user:{id}"),
+)
+
+response_cache_store = CacheStore(max_entries=RESPONSE_CACHE_MAX_ENTRIES, redis_url=RESPONSE_CACHE_REDIS_URL)
+
+def invalidate_response_cache(*tags: str) -> None:
+    """Drop cached responses carrying any of ``tags``; call after the write has committed"""
+    response_cache_store.invalidate_tags(tags)
+
+def cache_key(scope) -> str:
+    """Path plus query parameters sorted by name (order of repeated parameters is kept)"""
+    query = parse_qsl(scope.get("query_string", b"").decode("latin-1"), keep_blank_values=True)
+    normalized = urlencode(sorted(query, key=lambda item: item[0]))
+    return f"{scope['path']}?{normalized}" if normalized else scope["path"]
+
+class _Recorder:
+    """Collects a response sent through ASGI ``send`` as it passes by"""
+
+    def __init__(self, max_body_bytes: int):
+        self.max_body_bytes = max_body_bytes
+        self.status = None
+        self.headers = []
+        self.chunks = []
+        self.size = 0
+        self.cacheable = True
+        self.complete = False
+
+    def record(self, message):
+        if message["type"] == "http.response.start":
+            self.status = message["status"]
+            self.headers = [(name, value) for name, value in message.get("headers", []) if name.lower() not in CACHE_HEADERS]
+            if self.status != 200 or any(name.lower() == b"set-cookie" for name, _ in self.headers):
+                self.cacheable = False
+        elif message["type"] == "http.response.body" and self.cacheable:
+            body = message.get("body", b"")
+            self.size += len(body)
+            if self.size > self.max_body_bytes:
+                self.cacheable = False
+                self.chunks = []
+            else:
+                self.chunks.append(body)
+            if not message.get("more_body", False):
+                self.complete = True
+
+    def entry(self, tags, tag_versions, ttl, stale_ttl) -> Optional[CacheEntry]:
+        if not (self.cacheable and self.complete):
+            return None
+        now = time.time()
+        return CacheEntry(
+            status=self.status,
+            headers=self.headers,
+            body=b"".join(self.chunks),
+            stored_at=now,
+            fresh_until=now + ttl,
+            stale_until=now + ttl + stale_ttl,
+            tags=tags,
+            tag_versions=tag_versions,
+        )
+
+class ResponseCacheMiddleware:
+    """Serves and fills the response cache for GETs matching ``rules`` (pure ASGI)"""
+
+    def __init__(
+        self,
+        app,
+        store: CacheStore = response_cache_store,
+        rules=CATALOG_RULES,
+        ttl: float = RESPONSE_CACHE_TTL,
+        stale_ttl: float = RESPONSE_CACHE_STALE_TTL,
+        settle_seconds: float = 0.0,
+        max_body_bytes: int = RESPONSE_CACHE_MAX_BODY_BYTES
+    ):
+        self.app = app
+        self.store = store
+        self.rules = rules
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        # Don't store for this long after an invalidation: the read may have come from a lagging replica
+        self.settle_seconds = settle_seconds
+        self.max_body_bytes = max_body_bytes
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._revalidating = set()
+        self._tasks = set()
+
+    def _tags(self, path: str) -> Optional[Tuple[str, ...]]:
+        for cache_rule in self.rules:
+            tags = cache_rule.match_tags(path)
+            if tags:
+                return tags
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+        tags = self._tags(scope["path"])
+        if tags is None:
+            await self.app(scope, receive, send)
+            return
+
+        key = cache_key(scope)
+        entry = self.store.get(key)
+        if entry is not None:
+            if entry.is_fresh(time.time()):
+                self.store.count("hits")
+                await self._send_entry(scope, send, entry, "HIT")
+            else:
+                self.store.count("stale_hits")
+                self._revalidate_in_background(key, scope, tags)
+                await self._send_entry(scope, send, entry, "STALE")
+            return
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            # Someone is already computing this response: wait for theirs
+            entry = await asyncio.shield(inflight)
+            if entry is not None:
+                self.store.count("coalesced")
+                await self._send_entry(scope, send, entry, "HIT")
+                return
+            self.store.count("misses")
+            await self.app(scope, receive, send)
+            return
+
+        self.store.count("misses")
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        entry = None
+        try:
+            entry = await self._fill(key, scope, tags, receive, send)
+        finally:
+            del self._inflight[key]
+            future.set_result(entry)
+
+    async def _fill(self, key, scope, tags, receive, send) -> Optional[CacheEntry]:
+        """Run the handler, passing its response on to ``send`` (if any) and storing it"""
+        # Versions from before the handler ran: an invalidation during it makes the entry stale at once
+        tag_versions = self.store.tag_versions(tags)
+        recorder = _Recorder(self.max_body_bytes)
+
+        async def send_and_record(message):
+            recorder.record(message)
+            if send is None:
+                return
+            if message["type"] == "http.response.start":
+                message = dict(message)
+                message["headers"] = list(message.get("headers", [])) + [(b"x-cache", b"MISS")]
+            await send(message)
+
+        await self.app(scope, receive, send_and_record)
+        entry = recorder.entry(tags, tag_versions, self.ttl, self.stale_ttl)
+        if entry is None or self.store.invalidated_within(tags, self.settle_seconds):
+            return None
+        self.store.set(key, entry)
+        return entry
+
+    def _revalidate_in_background(self, key, scope, tags):
+        if key in self._revalidating or not self.store.try_lock(key, self.ttl):
+            return
+        self._revalidating.add(key)
+
+        async def empty_body():
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def revalidate():
+            try:
+                await self._fill(key, dict(scope), tags, empty_body, None)
+                self.store.count("revalidations")
+            except Exception as e:
+                logger.warning(f"Response cache: revalidating {key} failed: {e}")
+            finally:
+                self._revalidating.discard(key)
+
+        task = asyncio.get_running_loop().create_task(revalidate())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    @staticmethod
+    async def _send_entry(scope, send, entry: CacheEntry, state: str):
+        age = max(0, int(time.time() - entry.stored_at))
+        headers = list(entry.headers) + [(b"x-cache", state.encode()), (b"age", str(age).encode())]
+        request_headers = dict(scope.get("headers") or [])
+        etag = dict((name.lower(), value) for name, value in entry.headers).get(b"etag")
+        if etag and if_none_match_matches(request_headers.get(b"if-none-match", b"").decode("latin-1"), etag.decode("latin-1")):
+            # The client's copy is current: headers only, as the handler itself would answer
+            headers = [(name, value) for name, value in headers if name.lower() not in (b"content-length", b"content-type")]
+            await send({"type": "http.response.start", "status": 304, "headers": headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
+        await send({"type": "http.response.start", "status": entry.status, "headers": headers})
+        await send({"type": "http.response.body", "body": entry.body})
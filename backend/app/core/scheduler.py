@@ -0,0 +1,398 @@
+"""
+In-process job scheduler.
+
+Jobs run on cron-style schedules inside the API process. When several API
+workers are running, every job tick is claimed through a lease row in
+``job_locks`` (see ``JobLock``), so only one worker runs it. Jobs that only
+touch in-process state (e.g. the chat connection maps) can skip the lease
+and run on every worker; they run on the event loop itself, so they never
+race the handlers that share that state. Leader jobs run in a thread.
+
+Time comes from a clock object. ``FakeClock`` plus ``run_pending()`` lets
+tests drive the scheduler deterministically without sleeping.
+"""
+
+import os
+import socket
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..db.database import SessionLocal
+from ..db.models.jobLock import JobLock
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on how long the loop sleeps, so newly registered jobs and clock drift are picked up
+MAX_SLEEP_SECONDS = 60
+
+# ----------------------------------------------------------------------
+# Cron schedules
+# ----------------------------------------------------------------------
+
+_FIELD_RANGES = (
+    ("minute", 0, 59),
+    ("hour", 0, 23),
+    ("day", 1, 31),
+    ("month", 1, 12),
+    ("weekday", 0, 6),   # 0 = Sunday, as in cron
+)
+
+def _parse_field(expression: str, low: int, high: int) -> Set[int]:
+    values: Set[int] = set()
+    for part in expression.split(","):
+        step = 1
+        if "/" in part:
+            part, step_text = part.split("/", 1)
+            step = int(step_text)
+            if step < 1:
+                raise ValueError(f"Invalid step in cron field: {expression}")
+
+        if part == "*":
+            start, end = low, high
+        elif "-" in part:
+            start_text, end_text = part.split("-", 1)
+            start, end = int(start_text), int(end_text)
+        else:
+            start = int(part)
+            end = high if step > 1 else start
+
+        if start < low or end > high or start > end:
+            raise ValueError(f"Cron field out of range: {expression}")
+        values.update(range(start, end + 1, step))
+    return values
+
+class CronSchedule:
+    """Five-field cron expression: minute hour day-of-month month day-of-week"""
+
+    def __init__(self, expression: str):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression needs 5 fields: '{expression}'")
+        self.expression = expression
+        parsed = [_parse_field(text, low, high) for text, (_, low, high) in zip(fields, _FIELD_RANGES)]
+        self.minutes, self.hours, self.days, self.months, self.weekdays = parsed
+        # Cron semantics: if both day fields are restricted, either may match
+        self._day_restricted = fields[2] != "*"
+        self._weekday_restricted = fields[4] != "*"
+
+    def _day_matches(self, moment: datetime) -> bool:
+        day_ok = moment.day in self.days
+        weekday_ok = (moment.isoweekday() % 7) in self.weekdays
+        if self._day_restricted and self._weekday_restricted:
+            return day_ok or weekday_ok
+        return day_ok and weekday_ok
+
+    def next_after(self, moment: datetime) -> datetime:
+        """First matching minute strictly after `moment`"""
+        candidate = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        # Five years of misses means the expression can never match (e.g. Feb 30)
+        limit = candidate + timedelta(days=366 * 5)
+        while candidate < limit:
+            if candidate.month not in self.months:
+                year = candidate.year + (candidate.month == 12)
+                month = candidate.month % 12 + 1
+                candidate = candidate.replace(year=year, month=month, day=1, hour=0, minute=0)
+                continue
+            if not self._day_matches(candidate):
+                candidate = (candidate + timedelta(days=1)).replace(hour=0, minute=0)
+                continue
+            if candidate.hour not in self.hours:
+                candidate = (candidate + timedelta(hours=1)).replace(minute=0)
+                continue
+            if candidate.minute not in self.minutes:
+                candidate += timedelta(minutes=1)
+                continue
+            return candidate
+        raise ValueError(f"Cron expression never matches: '{self.expression}'")
+
+# ----------------------------------------------------------------------
+# Clocks
+# ----------------------------------------------------------------------
+
+class SystemClock:
+    """Wall clock in naive UTC, like the rest of the database timestamps"""
+
+    def now(self) -> datetime:
+        return datetime.utcnow()
+
+    async def sleep(self, seconds: float) -> None:
+        await asyncio.sleep(seconds)
+
+class FakeClock:
+    """Manually advanced clock for tests; sleeping just moves time forward"""
+
+    def __init__(self, start: Optional[datetime] = None):
+        self.current = start or datetime(2024, 1, 1)
+
+    def now(self) -> datetime:
+        return self.current
+
+    def advance(self, delta: timedelta) -> None:
+        self.current += delta
+
+    async def sleep(self, seconds: float) -> None:
+        self.advance(timedelta(seconds=seconds))
+        await asyncio.sleep(0)
+
+# ----------------------------------------------------------------------
+# Jobs
+# ----------------------------------------------------------------------
+
+# A job gets a session, the current time and its batch size, and returns how many rows it processed
+JobFunction = Callable[[Session, datetime, int], int]
+
+@dataclass
+class JobMetrics:
+    runs: int = 0
+    failures: int = 0
+    skipped: int = 0                    # Ticks another worker claimed
+    processed: int = 0
+    last_started_at: Optional[datetime] = None
+    last_duration_ms: Optional[float] = None
+    last_processed: Optional[int] = None
+    last_error: Optional[str] = None
+
+@dataclass
+class Job:
+    name: str
+    schedule: CronSchedule
+    func: JobFunction
+    batch_size: int = 500
+    lease_seconds: int = 300
+    leader_only: bool = True            # False for jobs that only touch in-process state
+    next_run: Optional[datetime] = None
+    metrics: JobMetrics = field(default_factory=JobMetrics)
+
+def default_worker_id() -> str:
+    return os.getenv("SCHEDULER_WORKER_ID") or f"{socket.gethostname()}:{os.getpid()}"
+
+class Scheduler:
+    """Runs registered jobs on their schedules"""
+
+    def __init__(self, clock=None, session_factory=SessionLocal, worker_id: Optional[str] = None):
+        self.clock = clock or SystemClock()
+        self.session_factory = session_factory
+        self.worker_id = worker_id or default_worker_id()
+        self.jobs: Dict[str, Job] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._running = False
+
+    def register(
+        self,
+        name: str,
+        cron: str,
+        func: JobFunction,
+        batch_size: int = 500,
+        lease_seconds: int = 300,
+        leader_only: bool = True
+    ) -> Job:
+        job = Job(
+            name=name,
+            schedule=CronSchedule(cron),
+            func=func,
+            batch_size=batch_size,
+            lease_seconds=lease_seconds,
+            leader_only=leader_only
+        )
+        job.next_run = job.schedule.next_after(self.clock.now())
+        self.jobs[name] = job
+        return job
+
+    # ------------------------------------------------------------------
+    # Leader election
+    # ------------------------------------------------------------------
+
+    def _claim(self, db: Session, job: Job, tick: datetime) -> bool:
+        """
+        Claim a tick with a conditional UPDATE on the job's lease row. Succeeds
+        only if nobody holds a live lease and nobody has already run this tick.
+        """
+        now = self.clock.now()
+        claimed = db.query(JobLock).filter(
+            JobLock.job_name == job.name,
+            (JobLock.locked_until.is_(None)) | (JobLock.locked_until < now),
+            (JobLock.last_tick.is_(None)) | (JobLock.last_tick < tick)
+        ).update({
+            JobLock.owner: self.worker_id,
+            JobLock.locked_until: now + timedelta(seconds=job.lease_seconds),
+            JobLock.last_tick: tick
+        }, synchronize_session=False)
+        db.commit()
+        if claimed:
+            return True
+
+        if db.query(JobLock.job_name).filter(JobLock.job_name == job.name).first():
+            return False
+
+        # First run anywhere: create the lease row; losing the insert race means another worker has it
+        try:
+            db.add(JobLock(
+                job_name=job.name,
+                owner=self.worker_id,
+                locked_until=now + timedelta(seconds=job.lease_seconds),
+                last_tick=tick
+            ))
+            db.commit()
+            return True
+        except IntegrityError:
+            db.rollback()
+            return False
+
+    def _release(self, db: Session, job: Job, status_text: str, processed: Optional[int], error: Optional[str]) -> None:
+        db.query(JobLock).filter(
+            JobLock.job_name == job.name,
+            JobLock.owner == self.worker_id
+        ).update({
+            JobLock.locked_until: None,
+            JobLock.last_finished_at: self.clock.now(),
+            JobLock.last_status: status_text,
+            JobLock.last_processed: processed,
+            JobLock.last_error: error[:2000] if error else None
+        }, synchronize_session=False)
+        db.commit()
+
+    # ------------------------------------------------------------------
+    # Execution
+    # ------------------------------------------------------------------
+
+    def run_job(self, job: Job, tick: Optional[datetime] = None) -> Optional[int]:
+        """Run one tick of a job (claiming it first if needed). Returns rows processed, None if skipped."""
+        tick = tick or self.clock.now()
+        db = self.session_factory()
+        try:
+            if job.leader_only and not self._claim(db, job, tick):
+                job.metrics.skipped += 1
+                logger.debug(f"Job {job.name} tick {tick} claimed by another worker")
+                return None
+
+            job.metrics.last_started_at = self.clock.now()
+            started = time.perf_counter()
+            processed = None
+            error = None
+            try:
+                processed = job.func(db, self.clock.now(), job.batch_size) or 0
+                db.commit()
+                job.metrics.runs += 1
+                job.metrics.processed += processed
+                job.metrics.last_error = None
+                logger.info(f"Job {job.name} processed {processed} item(s)")
+            except Exception as e:
+                db.rollback()
+                error = str(e)
+                job.metrics.failures += 1
+                job.metrics.last_error = error
+                logger.error(f"Job {job.name} failed: {error}")
+            finally:
+                job.metrics.last_duration_ms = round((time.perf_counter() - started) * 1000, 2)
+                job.metrics.last_processed = processed
+
+            if job.leader_only:
+                self._release(db, job, "failed" if error else "success", processed, error)
+            return processed
+        finally:
+            db.close()
+
+    def _take_due(self) -> List[Tuple[Job, datetime]]:
+        """Jobs due at the clock's current time with their ticks, advancing each to its next run"""
+        now = self.clock.now()
+        due = []
+        for job in self.jobs.values():
+            if job.next_run and job.next_run <= now:
+                due.append((job, job.next_run))
+                # Schedule from "now" so a long outage doesn't replay every missed tick
+                job.next_run = job.schedule.next_after(now)
+        return due
+
+    def _run_all(self, due: List[Tuple[Job, datetime]]) -> List[str]:
+        for job, tick in due:
+            self.run_job(job, tick)
+        return [job.name for job, _ in due]
+
+    def run_pending(self) -> List[str]:
+        """Run every job that is due at the clock's current time; returns their names"""
+        return self._run_all(self._take_due())
+
+    def seconds_until_next(self) -> float:
+        upcoming = [job.next_run for job in self.jobs.values() if job.next_run]
+        if not upcoming:
+            return MAX_SLEEP_SECONDS
+        delta = (min(upcoming) - self.clock.now()).total_seconds()
+        return max(0.0, min(delta, MAX_SLEEP_SECONDS))
+
+    async def _loop(self) -> None:
+        logger.info(f"Scheduler started on worker {self.worker_id} with jobs: {', '.join(self.jobs)}")
+        while self._running:
+            try:
+                due = self._take_due()
+                # In-process jobs share state with the event loop's handlers (e.g. the
+                # chat connection maps), so they run on the loop, between handler steps
+                self._run_all([(job, tick) for job, tick in due if not job.leader_only])
+                # Leader jobs use blocking DB sessions, so keep them off the event loop
+                shared = [(job, tick) for job, tick in due if job.leader_only]
+                if shared:
+                    await asyncio.to_thread(self._run_all, shared)
+            except Exception as e:
+                logger.error(f"Scheduler loop error: {e}")
+            await self.clock.sleep(self.seconds_until_next())
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._running = True
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        self._running = False
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        logger.info("Scheduler stopped")
+
+    # ------------------------------------------------------------------
+    # Introspection
+    # ------------------------------------------------------------------
+
+    def status(self, db: Session) -> List[dict]:
+        """Per-job schedule, local metrics and the shared lease row"""
+        locks = {
+            lock.job_name: lock
+            for lock in db.query(JobLock).filter(JobLock.job_name.in_(list(self.jobs))).all()
+        }
+        report = []
+        for job in self.jobs.values():
+            lock = locks.get(job.name)
+            report.append({
+                "name": job.name,
+                "schedule": job.schedule.expression,
+                "leader_only": job.leader_only,
+                "batch_size": job.batch_size,
+                "next_run": job.next_run,
+                "metrics": vars(job.metrics).copy(),
+                "lease": {
+                    "owner": lock.owner,
+                    "locked_until": lock.locked_until,
+                    "last_tick": lock.last_tick,
+                    "last_finished_at": lock.last_finished_at,
+                    "last_status": lock.last_status,
+                    "last_processed": lock.last_processed,
+                    "last_error": lock.last_error,
+                } if lock else None
+            })
+        return report
+
+# Shared instance started from main.py
+scheduler = Scheduler()
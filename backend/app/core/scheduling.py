@@ -0,0 +1,238 @@
+"""
+Booking calendar for service providers.
+
+Every booking stores its provider and its [scheduled_datetime, end_datetime)
+interval, indexed as (provider_id, scheduled_datetime, end_datetime). A
+conflict check is one range query on that index, done while holding a row
+lock on the provider so two concurrent bookings can't both pass the check.
+Free windows are computed in a single sweep of the provider's busy
+intervals against the service's availability bitmask.
+"""
+
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from ..db.models.serviceBooking import ServiceBooking, BookingStatusEnum
+from ..db.models.service import Service
+from ..db.models.user import User
+from .availability import AVAILABILITY_BITS, FLEXIBLE_BIT
+
+logger = logging.getLogger(__name__)
+
+# Bookings in these states occupy the provider's calendar
+BLOCKING_STATUSES = (BookingStatusEnum.pending, BookingStatusEnum.confirmed, BookingStatusEnum.completed)
+
+# Longest booking the API accepts; bounds the index range scan for overlaps
+MAX_BOOKING_MINUTES = 480
+
+# Wall-clock hours behind each availability option: (weekend?, start hour, end hour)
+SLOT_HOURS = {
+    "weekday-mornings": (False, 8, 12),
+    "weekday-afternoons": (False, 12, 17),
+    "weekday-evenings": (False, 17, 21),
+    "weekend-mornings": (True, 8, 12),
+    "weekend-afternoons": (True, 12, 17),
+    "weekend-evenings": (True, 17, 21),
+}
+FLEXIBLE_HOURS = (8, 21)
+
+SUGGESTION_HORIZON_DAYS = 14
+SUGGESTION_STEP_MINUTES = 30
+MAX_AVAILABILITY_RANGE_DAYS = 31
+
+Interval = Tuple[datetime, datetime]
+
+class BookingConflictError(Exception):
+    """Raised when a booking overlaps another booking of the same provider"""
+
+    def __init__(self, conflicts: List[ServiceBooking], suggestions: List[Interval]):
+        self.conflicts = conflicts
+        self.suggestions = suggestions
+        super().__init__(f"Booking overlaps {len(conflicts)} existing booking(s)")
+
+def to_naive_utc(value: datetime) -> datetime:
+    """Bookings are stored as naive UTC; normalize aware datetimes"""
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+def booking_end(start: datetime, duration_minutes: Optional[int]) -> datetime:
+    return start + timedelta(minutes=duration_minutes or 60)
+
+def _day_windows(day: datetime, mask: int) -> List[Interval]:
+    """Merged availability windows on one calendar day"""
+    if mask & FLEXIBLE_BIT:
+        return [(day.replace(hour=FLEXIBLE_HOURS[0]), day.replace(hour=FLEXIBLE_HOURS[1]))]
+
+    is_weekend = day.weekday() >= 5
+    hours = sorted(
+        (start_hour, end_hour)
+        for option, (weekend, start_hour, end_hour) in SLOT_HOURS.items()
+        if weekend == is_weekend and mask & AVAILABILITY_BITS[option]
+    )
+
+    windows: List[Interval] = []
+    for start_hour, end_hour in hours:
+        start, end = day.replace(hour=start_hour), day.replace(hour=end_hour)
+        if windows and windows[-1][1] >= start:
+            windows[-1] = (windows[-1][0], max(windows[-1][1], end))
+        else:
+            windows.append((start, end))
+    return windows
+
+def availability_windows(mask: int, start: datetime, end: datetime) -> List[Interval]:
+    """Availability windows of a bitmask clipped to [start, end), in order"""
+    windows: List[Interval] = []
+    day = start.replace(hour=0, minute=0, second=0, microsecond=0)
+    while day < end:
+        for window_start, window_end in _day_windows(day, mask):
+            window_start, window_end = max(window_start, start), min(window_end, end)
+            if window_start < window_end:
+                windows.append((window_start, window_end))
+        day += timedelta(days=1)
+    return windows
+
+def subtract_busy(windows: List[Interval], busy: List[Interval], min_minutes: int = 0) -> List[Interval]:
+    """
+    Remove busy intervals from availability windows in one merge pass.
+    Both lists must be sorted by start time.
+    """
+    free: List[Interval] = []
+    min_length = timedelta(minutes=min_minutes)
+    busy_index = 0
+
+    for window_start, window_end in windows:
+        # Busy intervals that end before this window can't affect later windows either
+        while busy_index < len(busy) and busy[busy_index][1] <= window_start:
+            busy_index += 1
+
+        cursor = window_start
+        scan = busy_index
+        while scan < len(busy) and busy[scan][0] < window_end:
+            busy_start, busy_end = busy[scan]
+            if busy_start > cursor and busy_start - cursor >= min_length:
+                free.append((cursor, min(busy_start, window_end)))
+            cursor = max(cursor, busy_end)
+            scan += 1
+
+        if cursor < window_end and window_end - cursor >= min_length:
+            free.append((cursor, window_end))
+
+    return free
+
+class SchedulingEngine:
+    """Conflict detection and free-slot search over a provider's bookings"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def lock_provider(self, provider_id: int) -> None:
+        """
+        Serialize booking writes per provider: SELECT ... FOR UPDATE on the
+        provider's user row, held until the caller commits or rolls back.
+        """
+        self.db.query(User.user_id).filter(User.user_id == provider_id).with_for_update().first()
+
+    def busy_intervals(
+        self,
+        provider_id: int,
+        start: datetime,
+        end: datetime,
+        exclude_booking_id: Optional[int] = None
+    ) -> List[ServiceBooking]:
+        """Blocking bookings of a provider that overlap [start, end), ordered by start"""
+        query = self.db.query(ServiceBooking).filter(
+            ServiceBooking.provider_id == provider_id,
+            # Lower bound keeps the range scan on the (provider, start, end) index short
+            ServiceBooking.scheduled_datetime > start - timedelta(minutes=MAX_BOOKING_MINUTES),
+            ServiceBooking.scheduled_datetime < end,
+            ServiceBooking.end_datetime > start,
+            ServiceBooking.status.in_(BLOCKING_STATUSES)
+        )
+        if exclude_booking_id is not None:
+            query = query.filter(ServiceBooking.booking_id != exclude_booking_id)
+        return query.order_by(ServiceBooking.scheduled_datetime).all()
+
+    def free_windows(
+        self,
+        service: Service,
+        start: datetime,
+        end: datetime,
+        min_minutes: int = 0,
+        exclude_booking_id: Optional[int] = None
+    ) -> List[Interval]:
+        """Free time in [start, end) that is inside the service's availability"""
+        start, end = to_naive_utc(start), to_naive_utc(end)
+        windows = availability_windows(service.availability_mask or 0, start, end)
+        if not windows:
+            return []
+        busy = [
+            (booking.scheduled_datetime, booking.end_datetime)
+            for booking in self.busy_intervals(service.creator_id, start, end, exclude_booking_id)
+        ]
+        return subtract_busy(windows, busy, min_minutes)
+
+    def suggest_slots(
+        self,
+        service: Service,
+        after: datetime,
+        duration_minutes: int,
+        count: int = 3,
+        exclude_booking_id: Optional[int] = None
+    ) -> List[Interval]:
+        """The next few start/end pairs after `after` that fit duration_minutes"""
+        after = to_naive_utc(after)
+        step = timedelta(minutes=SUGGESTION_STEP_MINUTES)
+        # Round up to the next step boundary so suggestions land on tidy times
+        after = after.replace(second=0, microsecond=0)
+        after += timedelta(minutes=(-after.minute) % SUGGESTION_STEP_MINUTES)
+
+        duration = timedelta(minutes=duration_minutes)
+        free = self.free_windows(
+            service, after, after + timedelta(days=SUGGESTION_HORIZON_DAYS),
+            min_minutes=duration_minutes, exclude_booking_id=exclude_booking_id
+        )
+
+        suggestions: List[Interval] = []
+        for window_start, window_end in free:
+            slot_start = window_start
+            while slot_start + duration <= window_end and len(suggestions) < count:
+                suggestions.append((slot_start, slot_start + duration))
+                slot_start += max(duration, step)
+            if len(suggestions) >= count:
+                break
+        return suggestions
+
+    def reserve(self, booking: ServiceBooking, service: Service, status: Optional[BookingStatusEnum] = None) -> None:
+        """
+        Fill in provider/end time for a new or rescheduled booking and make sure
+        it doesn't overlap another blocking booking. `status` is the status the
+        booking is about to get, if it is changing. Must run inside the caller's
+        transaction; raises BookingConflictError on overlap.
+        """
+        booking.scheduled_datetime = to_naive_utc(booking.scheduled_datetime)
+        booking.provider_id = service.creator_id
+        booking.end_datetime = booking_end(booking.scheduled_datetime, booking.duration_minutes)
+
+        status = status or booking.status
+        if status is not None and status not in BLOCKING_STATUSES:
+            return
+
+        self.lock_provider(service.creator_id)
+        conflicts = self.busy_intervals(
+            service.creator_id, booking.scheduled_datetime, booking.end_datetime,
+            exclude_booking_id=booking.booking_id
+        )
+        if conflicts:
+            suggestions = self.suggest_slots(
+                service, booking.scheduled_datetime, booking.duration_minutes or 60,
+                exclude_booking_id=booking.booking_id
+            )
+            logger.info(
+                f"Booking conflict for provider {service.creator_id} at {booking.scheduled_datetime}: "
+                f"{[conflict.booking_id for conflict in conflicts]}"
+            )
+            raise BookingConflictError(conflicts, suggestions)
@@ -0,0 +1,325 @@
+"""
+Full-text search for services and requests.
+
+Documents are tokenized on write into the ``search_terms`` inverted index
+(see ``SearchTerm``). Queries are answered from that index alone: every
+query token is matched as a prefix against an indexed ``term`` column, the
+per-document weights are summed into a relevance score and only the
+matching page is joined back to the services/requests tables.
+"""
+
+import re
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+from sqlalchemy import and_, or_, func, case, desc, literal
+from datetime import datetime
+
+from ..db.models.searchIndex import SearchTerm, SearchEntityTypeEnum
+from ..db.models.service import Service
+from ..db.models.request import Request
+from ..db.models.user import User
+
+logger = logging.getLogger(__name__)
+
+# Relative importance of each indexed field
+FIELD_WEIGHTS = {
+    "title": 5,
+    "tags": 4,
+    "skills": 4,
+    "category": 3,
+    "description": 1,
+}
+
+MIN_TERM_LENGTH = 2
+MAX_TERM_LENGTH = 64
+MAX_QUERY_TERMS = 8
+
+STOP_WORDS = frozenset({
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in",
+    "is", "it", "of", "on", "or", "the", "to", "with", "we", "you", "your",
+    "i", "my", "me", "this", "that", "will", "can",
+})
+
+# Unicode letters and digits only; excludes "_" so terms never contain LIKE wildcards
+_TOKEN_RE = re.compile(r"[^\W_]+", re.UNICODE)
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Split text into normalized, de-duplicated search terms"""
+    if not text:
+        return []
+
+    terms = []
+    seen = set()
+    for token in _TOKEN_RE.findall(text.lower()):
+        if len(token) < MIN_TERM_LENGTH or token in STOP_WORDS:
+            continue
+        token = token[:MAX_TERM_LENGTH]
+        if token not in seen:
+            seen.add(token)
+            terms.append(token)
+    return terms
+
+def build_term_weights(fields: Dict[str, Optional[str]]) -> Dict[str, int]:
+    """Combine per-field tokens into a single term -> weight map for a document"""
+    weights: Dict[str, int] = {}
+    for field, text in fields.items():
+        field_weight = FIELD_WEIGHTS.get(field, 1)
+        # Tags and skills are stored comma-separated; commas tokenize away naturally
+        for term in tokenize(text):
+            weights[term] = weights.get(term, 0) + field_weight
+    return weights
+
+# Per-entity column lookups used to keep the query code generic
+_ENTITY_MODELS = {
+    SearchEntityTypeEnum.service: (Service, Service.service_id),
+    SearchEntityTypeEnum.request: (Request, Request.request_id),
+}
+
+class SearchEngine:
+    """Maintains and queries the search_terms inverted index"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    # ------------------------------------------------------------------
+    # Indexing
+    # ------------------------------------------------------------------
+
+    def index_service(self, service: Service) -> None:
+        """(Re)index a service. Caller is responsible for committing."""
+        self._index_document(SearchEntityTypeEnum.service, service.service_id, {
+            "title": service.title,
+            "description": service.description,
+            "category": service.category,
+            "tags": service.tags,
+        })
+
+    def index_request(self, request: Request) -> None:
+        """(Re)index a request. Caller is responsible for committing."""
+        self._index_document(SearchEntityTypeEnum.request, request.request_id, {
+            "title": request.title,
+            "description": request.description,
+            "category": request.category,
+            "tags": request.tags,
+            "skills": request.skills,
+        })
+
+    def index_new_services(self, services: Iterable[Service]) -> None:
+        """Index freshly flushed services with one bulk insert (nothing to remove first)"""
+        rows = [
+            {"term": term, "entity_type": SearchEntityTypeEnum.service, "entity_id": service.service_id, "weight": weight}
+            for service in services
+            for term, weight in build_term_weights({
+                "title": service.title,
+                "description": service.description,
+                "category": service.category,
+                "tags": service.tags,
+            }).items()
+        ]
+        if rows:
+            self.db.bulk_insert_mappings(SearchTerm, rows)
+
+    def remove(self, entity_type: SearchEntityTypeEnum, entity_id: int) -> None:
+        """Drop all index rows for a document"""
+        self.db.query(SearchTerm).filter(
+            SearchTerm.entity_type == entity_type,
+            SearchTerm.entity_id == entity_id
+        ).delete(synchronize_session=False)
+
+    def _index_document(self, entity_type: SearchEntityTypeEnum, entity_id: int, fields: Dict[str, Optional[str]]) -> None:
+        if entity_id is None:
+            raise ValueError("Document must be flushed before it can be indexed")
+
+        self.remove(entity_type, entity_id)
+
+        rows = [
+            {"term": term, "entity_type": entity_type, "entity_id": entity_id, "weight": weight}
+            for term, weight in build_term_weights(fields).items()
+        ]
+        if rows:
+            self.db.bulk_insert_mappings(SearchTerm, rows)
+
+    def rebuild(self, batch_size: int = 500) -> Tuple[int, int]:
+        """Rebuild the whole index from the services and requests tables"""
+        self.db.query(SearchTerm).delete(synchronize_session=False)
+        self.db.commit()
+
+        counts = []
+        for model, pk, index_fn in (
+            (Service, Service.service_id, self.index_service),
+            (Request, Request.request_id, self.index_request),
+        ):
+            indexed = 0
+            last_id = 0
+            while True:
+                batch = self.db.query(model).filter(pk > last_id).order_by(pk).limit(batch_size).all()
+                if not batch:
+                    break
+                for document in batch:
+                    index_fn(document)
+                last_id = getattr(batch[-1], pk.key)
+                indexed += len(batch)
+                self.db.commit()
+                self.db.expunge_all()
+            counts.append(indexed)
+
+        logger.info(f"Search index rebuilt: {counts[0]} services, {counts[1]} requests")
+        return counts[0], counts[1]
+
+    # ------------------------------------------------------------------
+    # Querying
+    # ------------------------------------------------------------------
+
+    def _scored_subquery(self, entity_type: SearchEntityTypeEnum, terms: List[str]):
+        """entity_id/score rows for documents containing every query term as a prefix"""
+        conditions = [SearchTerm.term.like(f"{term}%") for term in terms]
+
+        # Exact term hits count double compared to prefix-only hits
+        score = func.sum(
+            SearchTerm.weight + case((SearchTerm.term.in_(terms), SearchTerm.weight), else_=0)
+        )
+
+        return self.db.query(
+            SearchTerm.entity_id.label("entity_id"),
+            score.label("score")
+        ).filter(
+            SearchTerm.entity_type == entity_type,
+            or_(*conditions)
+        ).group_by(
+            SearchTerm.entity_id
+        ).having(
+            and_(*[func.max(case((condition, 1), else_=0)) == 1 for condition in conditions])
+        ).subquery()
+
+    def _creator_ids(self, query_text: str):
+        """user_ids whose name or email starts with the query (prefix match can use indexes)"""
+        prefix = query_text.strip().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        return self.db.query(User.user_id).filter(
+            or_(
+                User.first_name.like(prefix, escape="\\"),
+                User.last_name.like(prefix, escape="\\"),
+                User.email.like(prefix, escape="\\")
+            )
+        )
+
+    def match_filter(self, query_text: str, entity_type: SearchEntityTypeEnum, match_creator: bool = False):
+        """
+        SQL expression that restricts a services/requests query to documents
+        matching query_text. Lets list endpoints keep their own ordering.
+        """
+        model, pk = _ENTITY_MODELS[entity_type]
+        terms = tokenize(query_text)[:MAX_QUERY_TERMS]
+
+        conditions = []
+        if terms:
+            scored = self._scored_subquery(entity_type, terms)
+            conditions.append(pk.in_(self.db.query(scored.c.entity_id)))
+        if match_creator and query_text.strip():
+            conditions.append(model.creator_id.in_(self._creator_ids(query_text)))
+
+        if not conditions:
+            # Nothing searchable in the query (only stop words or punctuation)
+            return pk.is_(None)
+        return or_(*conditions)
+
+    def _search_entity(
+        self,
+        entity_type: SearchEntityTypeEnum,
+        terms: List[str],
+        query_text: str,
+        category: Optional[str],
+        statuses: Optional[Iterable],
+        match_creator: bool,
+        limit: int
+    ) -> Tuple[List[dict], int]:
+        model, pk = _ENTITY_MODELS[entity_type]
+        scored = self._scored_subquery(entity_type, terms) if terms else None
+
+        if scored is not None and not match_creator:
+            query = self.db.query(model, scored.c.score, User.first_name, User.last_name).join(
+                scored, scored.c.entity_id == pk
+            )
+        elif scored is not None:
+            query = self.db.query(model, func.coalesce(scored.c.score, 0), User.first_name, User.last_name).outerjoin(
+                scored, scored.c.entity_id == pk
+            ).filter(
+                or_(scored.c.entity_id.isnot(None), model.creator_id.in_(self._creator_ids(query_text)))
+            )
+        else:
+            query = self.db.query(model, literal(0), User.first_name, User.last_name).filter(
+                model.creator_id.in_(self._creator_ids(query_text))
+            )
+
+        query = query.join(User, User.user_id == model.creator_id)
+
+        if category:
+            query = query.filter(model.category == category)
+        if statuses:
+            query = query.filter(model.status.in_(list(statuses)))
+
+        total_count = query.count()
+
+        order = [desc(model.created_at)]
+        if scored is not None:
+            order.insert(0, desc(func.coalesce(scored.c.score, 0)))
+        rows = query.order_by(*order).limit(limit).all()
+
+        hits = []
+        for document, score, first_name, last_name in rows:
+            description = document.description or ""
+            hits.append({
+                "entity_type": entity_type.value,
+                "id": getattr(document, pk.key),
+                "title": document.title,
+                "snippet": description[:200] + ("..." if len(description) > 200 else ""),
+                "category": document.category,
+                "location": document.location,
+                "status": document.status.value if document.status else None,
+                "creator_id": document.creator_id,
+                "creator_name": f"{first_name} {last_name}",
+                "created_at": document.created_at,
+                "score": float(score or 0)
+            })
+        return hits, total_count
+
+    def search(
+        self,
+        query_text: str,
+        entity_type: Optional[SearchEntityTypeEnum] = None,
+        category: Optional[str] = None,
+        statuses: Optional[Iterable] = None,
+        skip: int = 0,
+        limit: int = 20,
+        match_creator: bool = False
+    ) -> Tuple[List[dict], int]:
+        """
+        Ranked search across services and/or requests.
+
+        Returns (hits, total_count). Hits are ordered by score, then newest first.
+        """
+        terms = tokenize(query_text)[:MAX_QUERY_TERMS]
+        if not terms and not (match_creator and query_text.strip()):
+            return [], 0
+
+        entity_types = [entity_type] if entity_type else list(SearchEntityTypeEnum)
+
+        hits: List[dict] = []
+        total_count = 0
+        for current_type in entity_types:
+            type_statuses = None
+            if statuses:
+                # Services and requests have separate status enums; match them by value
+                status_enum = _ENTITY_MODELS[current_type][0].status.type.enum_class
+                type_statuses = [status_enum(getattr(s, "value", s)) for s in statuses]
+
+            # Each type only needs to contribute up to skip + limit rows to the merged page
+            type_hits, type_count = self._search_entity(
+                current_type, terms, query_text, category, type_statuses, match_creator, skip + limit
+            )
+            hits.extend(type_hits)
+            total_count += type_count
+
+        hits.sort(key=lambda hit: (hit["score"], hit["created_at"] or datetime.min), reverse=True)
+        return hits[skip:skip + limit], total_count
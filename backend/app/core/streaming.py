@@ -0,0 +1,155 @@
+"""
+Bounded-memory listing helpers: keyset cursors, NDJSON streaming and cached counts.
+
+Keyset pages are ordered newest first on a (timestamp, id) pair (or just
+the id) and continue from an opaque cursor, so a page costs the same
+however deep into the table it is. ``ndjson_response`` streams every
+matching row with ``yield_per``, one batch of ORM objects in memory at a
+time, on its own session so the stream outlives the request's session.
+Total counts are cached briefly instead of re-counting the table on every
+page.
+"""
+
+import json
+import base64
+import logging
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Callable, Iterator, Optional, Sequence, Tuple
+
+from fastapi.responses import StreamingResponse
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Query, Session
+
+from ..db.database import SessionLocal
+from .cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+STREAM_BATCH_SIZE = 500
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+COUNT_TTL_SECONDS = 60
+count_cache = TTLCache(default_ttl=COUNT_TTL_SECONDS, max_entries=512)
+
+# ----------------------------------------------------------------------
+# Keyset cursors
+# ----------------------------------------------------------------------
+
+def encode_cursor(*values) -> str:
+    """Opaque cursor for the last row of a page (datetimes as ISO strings)"""
+    raw = "|".join(value.isoformat() if isinstance(value, datetime) else str(value) for value in values)
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_cursor(cursor: str, types: Sequence[type]) -> Tuple:
+    """Inverse of encode_cursor; raises ValueError on garbage"""
+    try:
+        parts = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        if len(parts) != len(types):
+            raise ValueError(f"expected {len(types)} cursor values, got {len(parts)}")
+        return tuple(
+            datetime.fromisoformat(part) if kind is datetime else kind(part)
+            for part, kind in zip(parts, types)
+        )
+    except Exception as e:
+        raise ValueError(str(e))
+
+def keyset_after(query: Query, columns: Sequence, values: Sequence) -> Query:
+    """Rows strictly after ``values`` in descending ``columns`` order"""
+    conditions = []
+    for position, column in enumerate(columns):
+        equal_prefix = [columns[i] == values[i] for i in range(position)]
+        conditions.append(and_(*equal_prefix, column < values[position]))
+    return query.filter(or_(*conditions))
+
+def keyset_page(
+    query: Query,
+    columns: Sequence,
+    limit: int,
+    cursor: Optional[str] = None,
+    types: Sequence[type] = (),
+    cursor_values: Callable[[Any], Sequence] = None
+) -> Tuple[list, Optional[str]]:
+    """
+    One page of ``query`` ordered by ``columns`` descending.
+
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+    ``cursor_values`` maps a row to its values for ``columns``.
+    Raises ValueError for a malformed cursor.
+    """
+    if cursor:
+        query = keyset_after(query, columns, decode_cursor(cursor, types))
+    rows = query.order_by(*[column.desc() for column in columns]).limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(*cursor_values(rows[-1]))
+
+# ----------------------------------------------------------------------
+# Counts
+# ----------------------------------------------------------------------
+
+def cached_count(key: tuple, query: Query) -> int:
+    """COUNT(*) of ``query``, cached for COUNT_TTL_SECONDS under ``key``"""
+    return count_cache.get_or_set(key, query.count)
+
+def invalidate_counts(prefix: str) -> None:
+    count_cache.invalidate(prefix)
+
+# ----------------------------------------------------------------------
+# NDJSON
+# ----------------------------------------------------------------------
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if hasattr(value, "value"):     # Enum members
+        return value.value
+    return str(value)
+
+def ndjson_line(row: dict) -> bytes:
+    return (json.dumps(row, default=_json_default, separators=(",", ":")) + "\n").encode("utf-8")
+
+def stream_rows(
+    build_query: Callable[[Session], Query],
+    serialize: Callable[[Any], dict],
+    batch_size: int = STREAM_BATCH_SIZE
+) -> Iterator[bytes]:
+    """Serialize every row of ``build_query(db)`` as NDJSON, batch_size rows at a time"""
+    db = SessionLocal()
+    try:
+        buffer = []
+        for row in build_query(db).yield_per(batch_size):
+            buffer.append(ndjson_line(serialize(row)))
+            if len(buffer) >= batch_size:
+                yield b"".join(buffer)
+                buffer = []
+        if buffer:
+            yield b"".join(buffer)
+    except Exception as e:
+        # Headers are already sent; all we can do is log and end the stream
+        logger.error(f"Error while streaming rows: {str(e)}")
+        raise
+    finally:
+        db.close()
+
+def ndjson_response(
+    build_query: Callable[[Session], Query],
+    serialize: Callable[[Any], dict],
+    batch_size: int = STREAM_BATCH_SIZE,
+    headers: Optional[dict] = None
+) -> StreamingResponse:
+    """StreamingResponse over stream_rows"""
+    return StreamingResponse(
+        stream_rows(build_query, serialize, batch_size),
+        media_type=NDJSON_MEDIA_TYPE,
+        headers=headers
+    )
+
+def wants_ndjson(format: Optional[str], accept: Optional[str]) -> bool:
+    """?format=ndjson or an Accept header asking for NDJSON"""
+    if format:
+        return format.lower() == "ndjson"
+    return bool(accept) and NDJSON_MEDIA_TYPE in accept
@@ -0,0 +1,162 @@
+"""
+Normalized tag and skill storage.
+
+Tags and skills share one ``tags`` vocabulary keyed by a canonical lowercase
+name. Services and requests link to it through the service_tags,
+request_tags and request_skills association tables, which are indexed in
+both directions so "services tagged X" is an index lookup rather than a
+scan over comma-separated strings.
+"""
+
+import re
+import logging
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
+
+from ..db.models.tag import Tag, service_tags, request_tags, request_skills
+from ..db.models.service import Service
+from ..db.models.request import Request
+
+logger = logging.getLogger(__name__)
+
+MAX_TAG_LENGTH = 50
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+def canonical_tag(name: Optional[str]) -> Optional[str]:
+    """Canonical form used for storage and lookups: trimmed, single-spaced, lowercase"""
+    if name is None:
+        return None
+    canonical = _WHITESPACE_RE.sub(" ", name).strip().lower()[:MAX_TAG_LENGTH]
+    return canonical or None
+
+def split_tag_string(value: Optional[str]) -> List[str]:
+    """Split a legacy comma-separated tags/skills column into names"""
+    if not value:
+        return []
+    return [part for part in value.split(",") if part.strip()]
+
+# Filters are plain expressions so sync and async queries can share them
+
+def service_tag_filter(tag_id: int):
+    """Service.service_id IN (services linked to tag_id), served by ix_service_tags_tag_service"""
+    return Service.service_id.in_(
+        select(service_tags.c.service_id).where(service_tags.c.tag_id == tag_id)
+    )
+
+def request_tag_filter(tag_id: int):
+    return Request.request_id.in_(
+        select(request_tags.c.request_id).where(request_tags.c.tag_id == tag_id)
+    )
+
+def request_skill_filter(tag_id: int):
+    return Request.request_id.in_(
+        select(request_skills.c.request_id).where(request_skills.c.tag_id == tag_id)
+    )
+
+class TagManager:
+    """Keeps the tag association tables in sync with services and requests"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_tags(self, names: Iterable[str], create: bool = True) -> List[Tag]:
+        """
+        Resolve names to Tag rows in a single lookup, creating missing ones.
+        Duplicates (after canonicalization) are collapsed; input order is kept.
+        """
+        wanted: Dict[str, str] = {}
+        for name in names or []:
+            canonical = canonical_tag(name)
+            if canonical and canonical not in wanted:
+                wanted[canonical] = name.strip()[:MAX_TAG_LENGTH]
+
+        if not wanted:
+            return []
+
+        existing = {
+            tag.name: tag
+            for tag in self.db.query(Tag).filter(Tag.name.in_(list(wanted))).all()
+        }
+
+        if create:
+            for canonical, display_name in wanted.items():
+                if canonical in existing:
+                    continue
+                tag = Tag(name=canonical, display_name=display_name)
+                try:
+                    # Savepoint so a concurrent insert of the same tag doesn't poison the caller's transaction
+                    with self.db.begin_nested():
+                        self.db.add(tag)
+                    existing[canonical] = tag
+                except IntegrityError:
+                    existing[canonical] = self.db.query(Tag).filter(Tag.name == canonical).one()
+
+        return [existing[canonical] for canonical in wanted if canonical in existing]
+
+    def find_tag_id(self, name: str) -> Optional[int]:
+        """Look up a tag id by any spelling; None if the tag has never been used"""
+        canonical = canonical_tag(name)
+        if not canonical:
+            return None
+        row = self.db.query(Tag.tag_id).filter(Tag.name == canonical).first()
+        return row.tag_id if row else None
+
+    def set_service_tags(self, service: Service, names: Optional[Iterable[str]]) -> None:
+        service.tag_entries = self.get_tags(names or [])
+
+    def set_request_tags(self, request: Request, names: Optional[Iterable[str]]) -> None:
+        request.tag_entries = self.get_tags(names or [])
+
+    def set_request_skills(self, request: Request, names: Optional[Iterable[str]]) -> None:
+        request.skill_entries = self.get_tags(names or [])
+
+    # ------------------------------------------------------------------
+    # Filters for listing endpoints
+    # ------------------------------------------------------------------
+
+    def service_tag_filter(self, tag_id: int):
+        return service_tag_filter(tag_id)
+
+    def request_tag_filter(self, tag_id: int):
+        return request_tag_filter(tag_id)
+
+    def request_skill_filter(self, tag_id: int):
+        return request_skill_filter(tag_id)
+
+    # ------------------------------------------------------------------
+    # Backfill
+    # ------------------------------------------------------------------
+
+    def backfill(self, batch_size: int = 500) -> Dict[str, int]:
+        """Populate the association tables from the legacy comma-separated columns"""
+        counts = {"services": 0, "requests": 0}
+
+        for model, pk, key, sync in (
+            (Service, Service.service_id, "services", self._sync_service_from_columns),
+            (Request, Request.request_id, "requests", self._sync_request_from_columns),
+        ):
+            last_id = 0
+            while True:
+                batch = self.db.query(model).filter(pk > last_id).order_by(pk).limit(batch_size).all()
+                if not batch:
+                    break
+                for row in batch:
+                    sync(row)
+                last_id = getattr(batch[-1], pk.key)
+                counts[key] += len(batch)
+                self.db.commit()
+                self.db.expunge_all()
+
+        logger.info(f"Tag backfill complete: {counts}")
+        return counts
+
+    def _sync_service_from_columns(self, service: Service) -> None:
+        self.set_service_tags(service, split_tag_string(service.tags))
+
+    def _sync_request_from_columns(self, request: Request) -> None:
+        self.set_request_tags(request, split_tag_string(request.tags))
+        self.set_request_skills(request, split_tag_string(request.skills))
@@ -349,6 +349,49 @@ class ChatManager:
         """Check if user is online"""
         return user_id in self.active_connections
 
+    def _socket_connected(self, sid: str) -> bool:
+        try:
+            return self.sio.manager.is_connected(sid, '/')
+        except Exception:
+            # If the manager can't tell, keep the entry
+            return True
+
+    def sweep_stale_state(self) -> int:
+        """
+        Drop map entries left behind by sockets that went away without a
+        clean disconnect, and conversation caches of users who are offline.
+        Returns the number of entries removed.
+
+        Must run on the event loop (the scheduler runs in-process jobs
+        there), so no handler changes the maps mid-sweep. Sets are replaced
+        rather than mutated so handlers suspended while iterating the old
+        set are unaffected.
+        """
+        removed = 0
+
+        for user_id, sids in list(self.active_connections.items()):
+            live = {sid for sid in sids if self._socket_connected(sid)}
+            for sid in sids - live:
+                self.socket_to_user.pop(sid, None)
+                removed += 1
+            if live:
+                if len(live) != len(sids):
+                    self.active_connections[user_id] = live
+            else:
+                self.active_connections.pop(user_id, None)
+
+        for sid, user_id in list(self.socket_to_user.items()):
+            if sid not in self.active_connections.get(user_id, ()):
+                self.socket_to_user.pop(sid, None)
+                removed += 1
+
+        for user_id in list(self.user_conversations):
+            if user_id not in self.active_connections:
+                self.user_conversations.pop(user_id, None)
+                removed += 1
+
+        return removed
+
     def get_socket_app(self, fastapi_app):
         """Get the Socket.IO ASGI application combined with FastAPI"""
         return socketio.ASGIApp(self.sio, fastapi_app)
@@ -1,9 +1,16 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
 import os
 from dotenv import load_dotenv
 
+from .pool import PoolSettings, engine_pool_options, instrument_engine, pool_status
+from .replica import router_from_env
+
 # Load environment variables
 load_dotenv()
 
@@ -12,13 +19,16 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 if not DATABASE_URL:
     raise ValueError("DATABASE_URL environment variable is not set")
 
+# Pool sizing, LIFO and pre-ping mode come from DB_POOL_* (see app/db/pool.py)
+POOL_SETTINGS = PoolSettings.from_env("DB_POOL")
+
 # Create SQLAlchemy engine
 engine = create_engine(
     DATABASE_URL,
-    pool_pre_ping=True,  # Verify connections before use
-    pool_recycle=300,    # Recycle connections every 5 minutes
-    echo=False           # Set to True for SQL query logging during development
+    echo=False,          # Set to True for SQL query logging during development
+    **engine_pool_options(DATABASE_URL, POOL_SETTINGS)
 )
+instrument_engine(engine, POOL_SETTINGS)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -32,11 +42,112 @@ def get_db():
     finally:
         db.close()
 
+# Async drivers for the sync URLs we accept (aiosqlite is for local/test databases)
+ASYNC_DRIVERS = {
+    "mysql": "mysql+aiomysql",
+    "mysql+pymysql": "mysql+aiomysql",
+    "mysql+mysqldb": "mysql+aiomysql",
+    "mysql+mysqlconnector": "mysql+aiomysql",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+}
+
+def async_database_url(url: str) -> str:
+    """Same database as a sync URL, through its async driver"""
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.drivername, parsed.drivername)
+    return parsed.set(drivername=driver).render_as_string(hide_password=False)
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or async_database_url(DATABASE_URL)
+
+# Async engine for the native async endpoints; shares the database, not the pool.
+# DB_ASYNC_POOL_* override the DB_POOL_* settings for it.
+ASYNC_POOL_SETTINGS = PoolSettings.from_env("DB_ASYNC_POOL", defaults=POOL_SETTINGS)
+
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    **engine_pool_options(ASYNC_DATABASE_URL, ASYNC_POOL_SETTINGS, async_engine=True)
+)
+instrument_engine(async_engine.sync_engine, ASYNC_POOL_SETTINGS)
+
+# expire_on_commit=False: attributes stay readable after commit without an
+# implicit (and, under asyncio, illegal) lazy refresh
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+async def get_async_db():
+    """Dependency to get an async database session"""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+# ----------------------------------------------------------------------
+# Read replica (optional): DATABASE_REPLICA_URL, see app/db/replica.py
+# ----------------------------------------------------------------------
 
+DATABASE_REPLICA_URL = os.getenv("DATABASE_REPLICA_URL")
+REPLICA_POOL_SETTINGS = PoolSettings.from_env("DB_REPLICA_POOL", defaults=POOL_SETTINGS)
 
-import mysql.connector
-from mysql.connector import Error
+if DATABASE_REPLICA_URL:
+    replica_engine = create_engine(
+        DATABASE_REPLICA_URL,
+        **engine_pool_options(DATABASE_REPLICA_URL, REPLICA_POOL_SETTINGS)
+    )
+    instrument_engine(replica_engine, REPLICA_POOL_SETTINGS)
+    ReplicaSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=replica_engine)
 
+    ASYNC_DATABASE_REPLICA_URL = os.getenv("ASYNC_DATABASE_REPLICA_URL") or async_database_url(DATABASE_REPLICA_URL)
+    async_replica_engine = create_async_engine(
+        ASYNC_DATABASE_REPLICA_URL,
+        **engine_pool_options(ASYNC_DATABASE_REPLICA_URL, REPLICA_POOL_SETTINGS, async_engine=True)
+    )
+    instrument_engine(async_replica_engine.sync_engine, REPLICA_POOL_SETTINGS)
+    AsyncReplicaSessionLocal = async_sessionmaker(
+        async_replica_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+    )
+else:
+    replica_engine = None
+    async_replica_engine = None
+    ReplicaSessionLocal = SessionLocal
+    AsyncReplicaSessionLocal = AsyncSessionLocal
+
+replica_router = router_from_env(replica_engine)
+
+def get_read_db(request: Request):
+    """Dependency for read-only endpoints: the replica unless it lags or the caller just wrote"""
+    if replica_router.enabled and replica_router.check_due():
+        replica_router.check()
+    db = (ReplicaSessionLocal if replica_router.use_replica(request) else SessionLocal)()
+    try:
+        yield db
+    finally:
+        db.close()
+
+async def get_async_read_db(request: Request):
+    """Async get_read_db"""
+    if replica_router.enabled and replica_router.check_due():
+        await run_in_threadpool(replica_router.check)
+    session_factory = AsyncReplicaSessionLocal if replica_router.use_replica(request) else AsyncSessionLocal
+    async with session_factory() as db:
+        yield db
+
+def read_engine():
+    """Engine for bulk reads not tied to a user (exports): the replica while it's healthy"""
+    return replica_engine if replica_router.replica_healthy() else engine
+
+def database_pool_status() -> dict:
+    """Pool configuration, occupancy and checkout metrics for every engine, plus replica routing"""
+    status = {
+        "sync": pool_status(engine, POOL_SETTINGS),
+        "async": pool_status(async_engine.sync_engine, ASYNC_POOL_SETTINGS),
+    }
+    if replica_engine is not None:
+        status["replica"] = pool_status(replica_engine, REPLICA_POOL_SETTINGS)
+        status["async_replica"] = pool_status(async_replica_engine.sync_engine, REPLICA_POOL_SETTINGS)
+    status["replica_routing"] = replica_router.status()
+    return status
+
+
+
+# Raw mysql.connector connections for the admin dashboards
 
 db_host=os.getenv("DB_HOST")
 db_port=os.getenv("DB_PORT")
@@ -45,6 +156,7 @@ db_password=os.getenv("DB_PASSWORD")
 db_name=os.getenv("DB_NAME")
 
 def create_connection():
+    import mysql.connector
     connection=None
     try:
         connection=mysql.connector.connect(
@@ -54,6 +166,23 @@ def create_connection():
             password=db_password,
             database=db_name
         )
-    except Error as e:
+    except mysql.connector.Error as e:
         pass
-    return connection
\ No newline at end of file
+    return connection
+
+def create_read_connection():
+    """create_connection() against the replica (DB_REPLICA_HOST etc.) while it's healthy"""
+    replica_host = os.getenv("DB_REPLICA_HOST")
+    if not replica_host or (replica_router.enabled and not replica_router.replica_healthy()):
+        return create_connection()
+    import mysql.connector
+    try:
+        return mysql.connector.connect(
+            host=replica_host,
+            port=os.getenv("DB_REPLICA_PORT", db_port),
+            user=os.getenv("DB_REPLICA_USER", db_user),
+            password=os.getenv("DB_REPLICA_PASSWORD", db_password),
+            database=os.getenv("DB_REPLICA_NAME", db_name)
+        )
+    except mysql.connector.Error as e:
+        return create_connection()
\ No newline at end of file
@@ -1,4 +1,7 @@
 # This file makes the models directory a Python package
+import importlib
+import pkgutil
+
 from ..database import Base
 from .user import User
 from .admin import Admin
@@ -9,4 +12,13 @@ from .rating import Rating
 from .report import Report
 from .timeTransaction import TimeTransaction
 from .modRequest import ModRequest
-from .moderator import Moderator
\ No newline at end of file
+from .moderator import Moderator
+from .searchIndex import SearchTerm
+from .tag import Tag, service_tags, request_tags, request_skills
+from .jobLock import JobLock
+from .emailOutbox import EmailOutbox
+
+def load_all_models():
+    """Import every model module so Base.metadata knows all tables (migrations, create_all)"""
+    for module in pkgutil.iter_modules(__path__):
+        importlib.import_module(f"{__name__}.{module.name}")
@@ -1,8 +1,9 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean, Text, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean, Text, Index, Enum as SQLEnum
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
 from ..database import Base
+from ..versioning import version_column
 
 class ConversationType(str, enum.Enum):
     service = 'service'
@@ -31,6 +32,14 @@ class Conversation(Base):
     # Last message info for quick access
     last_message_id = Column(Integer, nullable=True)
     last_message_at = Column(DateTime, nullable=True)
+    # Incremented by every UPDATE; feeds the ETag version stamps
+    version = version_column()
+    
+    __table_args__ = (
+        # A user's active conversations (they can be either participant)
+        Index("ix_conversations_user1_active", "user1_id", "is_active"),
+        Index("ix_conversations_user2_active", "user2_id", "is_active"),
+    )
     
     # Relationships
     user1 = relationship("User", foreign_keys=[user1_id], backref="conversations_as_user1")
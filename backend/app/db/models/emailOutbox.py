@@ -0,0 +1,42 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, Index, Enum as SQLAlchemyEnum
+from sqlalchemy.dialects.mysql import MEDIUMTEXT
+from enum import Enum
+from datetime import datetime
+from ..database import Base
+
+class EmailStatusEnum(str, Enum):
+    pending = "pending"
+    sent = "sent"
+    failed = "failed"       # Gave up after the maximum number of attempts
+
+class EmailOutbox(Base):
+    """
+    Outgoing email, written in the same transaction as the change that
+    triggers it and delivered later by the outbox worker.
+    """
+    __tablename__ = "email_outbox"
+
+    email_id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    dedupe_key = Column(String(255), nullable=False, unique=True)   # Same key is never sent twice
+    recipient = Column(String(255), nullable=False)
+    subject = Column(String(255), nullable=False)
+    text_body = Column(Text().with_variant(MEDIUMTEXT(), "mysql"), nullable=False)
+    html_body = Column(Text().with_variant(MEDIUMTEXT(), "mysql"), nullable=True)
+
+    status = Column(SQLAlchemyEnum(EmailStatusEnum), default=EmailStatusEnum.pending, nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+    next_attempt_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    locked_by = Column(String(255), nullable=True)      # Worker currently delivering it
+    locked_until = Column(DateTime, nullable=True)
+    last_error = Column(Text, nullable=True)
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+    sent_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        # Worker polls for due pending mail
+        Index("ix_email_outbox_status_next_attempt", "status", "next_attempt_at"),
+    )
+
+    def __repr__(self):
+        return f"<EmailOutbox(email_id={self.email_id}, recipient='{self.recipient}', status='{self.status}')>"
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, String, DateTime, Integer, Text
+from ..database import Base
+
+class JobLock(Base):
+    """
+    Lease row per scheduled job. A worker runs a job tick only after winning
+    a conditional UPDATE on this row, so each tick runs on exactly one worker.
+    """
+    __tablename__ = "job_locks"
+
+    job_name = Column(String(100), primary_key=True)
+    owner = Column(String(255), nullable=True)          # Worker id holding the lease
+    locked_until = Column(DateTime, nullable=True)      # Lease expiry (UTC)
+    last_tick = Column(DateTime, nullable=True)         # Scheduled time of the last claimed run
+    last_finished_at = Column(DateTime, nullable=True)
+    last_status = Column(String(20), nullable=True)     # success / failed
+    last_processed = Column(Integer, nullable=True)
+    last_error = Column(Text, nullable=True)
+
+    def __repr__(self):
+        return f"<JobLock(job_name='{self.job_name}', owner='{self.owner}', locked_until={self.locked_until})>"
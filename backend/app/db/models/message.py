@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean, Text, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean, Text, Index, Enum as SQLEnum
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -48,6 +48,13 @@ class Message(Base):
     longitude = Column(String(50), nullable=True)
     location_address = Column(Text, nullable=True)
     
+    __table_args__ = (
+        # A conversation's messages, newest first
+        Index("ix_messages_conversation_created", "conversation_id", "created_at"),
+        # Unread counts and mark-as-read (other sender, status != read)
+        Index("ix_messages_conversation_sender_status", "conversation_id", "sender_id", "status"),
+    )
+    
     # Relationships
     conversation = relationship("Conversation", back_populates="messages")
     sender = relationship("User", backref="sent_messages")
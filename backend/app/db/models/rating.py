@@ -2,6 +2,7 @@ from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Chec
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from ..database import Base
+from ..versioning import version_column
 
 class Rating(Base):
     __tablename__ = "ratings"
@@ -15,6 +16,8 @@ class Rating(Base):
     review = Column(Text, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+    # Incremented by every UPDATE; feeds the ETag version stamps
+    version = version_column()
 
     # Add constraints
     __table_args__ = (
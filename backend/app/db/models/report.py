@@ -1,10 +1,14 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index, Enum as SQLEnum
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from ..database import Base
 
 class Report(Base):
     __tablename__ = 'reports'
+    __table_args__ = (
+        # Dashboard stats: GROUP BY status / weekday over a created_at range
+        Index('ix_reports_status_created', 'status', 'created_at'),
+    )
 
     report_id = Column(Integer, primary_key=True, autoincrement=True)
     
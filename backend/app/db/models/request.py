@@ -1,5 +1,6 @@
-from sqlalchemy import Column, Integer, String, Text, Numeric, Enum as SQLAlchemyEnum, Date, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, Numeric, Enum as SQLAlchemyEnum, Date, DateTime, ForeignKey, Index
 from ..database import Base
+from ..versioning import version_column
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from enum import Enum  # Add this import
@@ -27,6 +28,10 @@ class Request(Base):
     budget = Column(Numeric(10, 2), nullable=False)
 
     location = Column(String(100), nullable=False)
+    # Geocoded coordinates; geohash prefixes drive proximity search
+    latitude = Column(Numeric(9, 6), nullable=True)
+    longitude = Column(Numeric(9, 6), nullable=True)
+    geohash = Column(String(12), nullable=True, index=True)
     deadline = Column(Date)
     urgency = Column(SQLAlchemyEnum(RequestUrgencyEnum), default=RequestUrgencyEnum.normal)
 
@@ -36,13 +41,26 @@ class Request(Base):
     skills = Column(Text, nullable=True)   # Comma-separated
 
     created_at = Column(DateTime, default=datetime.utcnow)
+    # Incremented by every UPDATE; feeds the ETag version stamps
+    version = version_column()
     status = Column(SQLAlchemyEnum(RequestStatusEnum), default=RequestStatusEnum.active, nullable=False)
 
+    __table_args__ = (
+        # Category browsing and match candidate lookups (newest first)
+        Index("ix_requests_status_category_created", "status", "category", "created_at"),
+        # Deadline sweep closing expired requests
+        Index("ix_requests_status_deadline", "status", "deadline"),
+    )
+
     creator = relationship("User", backref="requests")
     
     # Relationship with the Report model
     reports = relationship("Report", back_populates="reported_request", cascade="all, delete-orphan")
 
+    # Normalized tags and skills (the tags/skills columns keep the display strings)
+    tag_entries = relationship("Tag", secondary="request_tags")
+    skill_entries = relationship("Tag", secondary="request_skills")
+
     def get_tags_list(self):
         return self.tags.split(',') if self.tags else []
 
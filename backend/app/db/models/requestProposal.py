@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Text, DateTime, DECIMAL, Enum as SqlEnum, ForeignKey
+from sqlalchemy import Column, Integer, Text, DateTime, DECIMAL, Enum as SqlEnum, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -25,5 +25,10 @@ class RequestProposal(Base):
     submitted_at = Column(DateTime, default=datetime.utcnow)
     response_at = Column(DateTime, nullable=True)
 
+    __table_args__ = (
+        # A request's proposals / has this user already proposed
+        Index("ix_request_proposals_request_proposer", "request_id", "proposer_id"),
+    )
+
     request = relationship("Request", backref="proposals")
     proposer = relationship("User", backref="proposals")
@@ -0,0 +1,33 @@
+from sqlalchemy import Column, Integer, String, Index, Enum as SQLAlchemyEnum
+from enum import Enum
+from ..database import Base
+
+class SearchEntityTypeEnum(str, Enum):
+    service = "service"
+    request = "request"
+
+class SearchTerm(Base):
+    """
+    Inverted index entry: one row per (term, document).
+
+    Rows are written by SearchEngine whenever a service or request is
+    created, edited or deleted, so lookups never have to scan the
+    services/requests tables.
+    """
+    __tablename__ = "search_terms"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    term = Column(String(64), nullable=False)
+    entity_type = Column(SQLAlchemyEnum(SearchEntityTypeEnum), nullable=False)
+    entity_id = Column(Integer, nullable=False)
+    weight = Column(Integer, nullable=False, default=1)
+
+    __table_args__ = (
+        # Prefix lookups (term LIKE 'abc%') walk this index
+        Index("ix_search_terms_term_entity", "term", "entity_type", "entity_id"),
+        # Used when a document is re-indexed or removed
+        Index("ix_search_terms_entity", "entity_type", "entity_id"),
+    )
+
+    def __repr__(self):
+        return f"<SearchTerm(term='{self.term}', {self.entity_type}={self.entity_id}, weight={self.weight})>"
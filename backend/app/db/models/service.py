@@ -1,8 +1,10 @@
-from sqlalchemy import Column, Integer, String, Text, Numeric, Boolean, DateTime, ForeignKey, Enum as SQLAlchemyEnum
+from sqlalchemy import Column, Integer, SmallInteger, String, Text, Numeric, DateTime, ForeignKey, Index, Enum as SQLAlchemyEnum
 from sqlalchemy.orm import relationship
 from enum import Enum
 from datetime import datetime
 from ..database import Base
+from ..versioning import version_column
+from ...core.availability import decode_availability
 
 class ServiceStatusEnum(Enum):
     active = "active"
@@ -21,14 +23,13 @@ class Service(Base):
     time_credits_per_hour = Column(Numeric(3, 1), nullable=False)
 
     location = Column(String(100), nullable=False)
+    # Geocoded coordinates; geohash prefixes drive proximity search
+    latitude = Column(Numeric(9, 6), nullable=True)
+    longitude = Column(Numeric(9, 6), nullable=True)
+    geohash = Column(String(12), nullable=True, index=True)
 
-    availability_weekday_morning = Column(Boolean, default=False)
-    availability_weekday_afternoon = Column(Boolean, default=False)
-    availability_weekday_evening = Column(Boolean, default=False)
-    availability_weekend_morning = Column(Boolean, default=False)
-    availability_weekend_afternoon = Column(Boolean, default=False)
-    availability_weekend_evening = Column(Boolean, default=False)
-    availability_flexible = Column(Boolean, default=False)
+    # One bit per availability option, see app/core/availability.py
+    availability_mask = Column(SmallInteger, nullable=False, default=0, index=True)
 
     whats_included = Column(Text)
     requirements = Column(Text)
@@ -36,6 +37,14 @@ class Service(Base):
     status = Column(SQLAlchemyEnum(ServiceStatusEnum), default=ServiceStatusEnum.active, nullable=False)
 
     created_at = Column(DateTime, default=datetime.utcnow)
+    # Incremented by every UPDATE; feeds the ETag version stamps
+    version = version_column()
+
+    __table_args__ = (
+        # Category browsing and match candidate lookups (newest first)
+        Index("ix_services_status_category_created", "status", "category", "created_at"),
+    )
+
     # Relationship with the User model
     creator = relationship("User", back_populates="services")
     
@@ -45,5 +54,11 @@ class Service(Base):
     # Relationship with the Report model
     reports = relationship("Report", back_populates="reported_service", cascade="all, delete-orphan")
     
+    # Normalized tags (the tags column keeps the display string)
+    tag_entries = relationship("Tag", secondary="service_tags")
+    
+    def get_availability_list(self):
+        return decode_availability(self.availability_mask)
+
     def __repr__(self):
         return f"<Service(service_id={self.service_id}, title='{self.title}', category='{self.category}')>"
\ No newline at end of file
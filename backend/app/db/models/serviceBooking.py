@@ -1,5 +1,6 @@
-from sqlalchemy import Column, Integer,  Enum as SQLAlchemyEnum, String, Text, Date, DateTime, Enum, ForeignKey, Numeric
+from sqlalchemy import Column, Integer,  Enum as SQLAlchemyEnum, String, Text, Date, DateTime, Enum, ForeignKey, Numeric, Index
 from ..database import Base
+from ..versioning import version_column
 from sqlalchemy.ext.declarative import declarative_base
 from enum import Enum
 from datetime import datetime
@@ -20,16 +21,33 @@ class ServiceBooking(Base):
     
     service_id = Column(Integer, ForeignKey("services.service_id", ondelete="CASCADE"), nullable=False)
     user_id = Column(Integer, ForeignKey("users.user_id", ondelete="CASCADE"), nullable=False)
+    # Denormalized service creator so a provider's calendar is one index range scan
+    provider_id = Column(Integer, ForeignKey("users.user_id", ondelete="CASCADE"), nullable=True)
 
     booking_date = Column(DateTime, default=datetime.utcnow)
+    # Incremented by every UPDATE; feeds the ETag version stamps
+    version = version_column()
     scheduled_datetime = Column(DateTime, nullable=False)
     duration_minutes = Column(Integer, default=60)  
+    end_datetime = Column(DateTime, nullable=True)  # scheduled_datetime + duration_minutes
     status = Column(SQLAlchemyEnum(BookingStatusEnum), default=BookingStatusEnum.pending)
     message = Column(Text, nullable=True)
     time_credits_used = Column(Numeric(5, 2), default=0.00)
 
+    __table_args__ = (
+        # Provider calendar / overlap checks
+        Index("ix_service_bookings_provider_interval", "provider_id", "scheduled_datetime", "end_datetime"),
+        # Keyset pagination of a user's bookings as booker / as provider
+        Index("ix_service_bookings_user_schedule", "user_id", "scheduled_datetime", "booking_id"),
+        Index("ix_service_bookings_provider_schedule", "provider_id", "scheduled_datetime", "booking_id"),
+        # Sweep expiring pending bookings whose start time has passed
+        Index("ix_service_bookings_status_schedule", "status", "scheduled_datetime"),
+        # A service's bookings by status (active-booking checks, stats)
+        Index("ix_service_bookings_service_status", "service_id", "status"),
+    )
+
     service = relationship("Service", backref="bookings")
-    user = relationship("User", backref="bookings")
+    user = relationship("User", foreign_keys=[user_id], backref="bookings")
     
     # Relationship with the Rating model (one-to-one)
     rating = relationship("Rating", back_populates="booking", uselist=False, cascade="all, delete-orphan")
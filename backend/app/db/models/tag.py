@@ -0,0 +1,41 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Table, Index
+from datetime import datetime
+from ..database import Base
+
+# Association tables. The composite primary key serves (entity -> tags) lookups,
+# the extra index serves (tag -> entities) filtering.
+service_tags = Table(
+    "service_tags",
+    Base.metadata,
+    Column("service_id", Integer, ForeignKey("services.service_id", ondelete="CASCADE"), primary_key=True),
+    Column("tag_id", Integer, ForeignKey("tags.tag_id", ondelete="CASCADE"), primary_key=True),
+    Index("ix_service_tags_tag_service", "tag_id", "service_id"),
+)
+
+request_tags = Table(
+    "request_tags",
+    Base.metadata,
+    Column("request_id", Integer, ForeignKey("requests.request_id", ondelete="CASCADE"), primary_key=True),
+    Column("tag_id", Integer, ForeignKey("tags.tag_id", ondelete="CASCADE"), primary_key=True),
+    Index("ix_request_tags_tag_request", "tag_id", "request_id"),
+)
+
+request_skills = Table(
+    "request_skills",
+    Base.metadata,
+    Column("request_id", Integer, ForeignKey("requests.request_id", ondelete="CASCADE"), primary_key=True),
+    Column("tag_id", Integer, ForeignKey("tags.tag_id", ondelete="CASCADE"), primary_key=True),
+    Index("ix_request_skills_tag_request", "tag_id", "request_id"),
+)
+
+class Tag(Base):
+    """Shared vocabulary for service tags, request tags and request skills"""
+    __tablename__ = "tags"
+
+    tag_id = Column(Integer, primary_key=True, autoincrement=True)
+    name = Column(String(50), unique=True, index=True, nullable=False)  # Canonical lowercase form
+    display_name = Column(String(50), nullable=False)                   # First spelling seen
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<Tag(tag_id={self.tag_id}, name='{self.name}')>"
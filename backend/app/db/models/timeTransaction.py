@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, DECIMAL, Enum, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, DateTime, DECIMAL, Enum, ForeignKey, Text, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from ..database import Base
@@ -35,6 +35,11 @@ class TimeTransaction(Base):
     created_at = Column(DateTime, default=func.now())
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
 
+    __table_args__ = (
+        # A user's transaction history, newest first
+        Index("ix_time_transactions_user_created", "user_id", "created_at"),
+    )
+
     # Relationship with User model
     user = relationship("User", back_populates="transactions")
 
@@ -1,7 +1,8 @@
-from sqlalchemy import Column, Integer, String, DateTime, DECIMAL, Enum
+from sqlalchemy import Column, Integer, String, DateTime, DECIMAL, Numeric, Enum
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from ..database import Base
+from ..versioning import version_column
 
 class User(Base):
     __tablename__ = "users"
@@ -15,6 +16,10 @@ class User(Base):
     gender = Column(Enum('Male', 'Female', 'Other'), nullable=True)
     age = Column(Integer, nullable=True)
     location = Column(String(100), nullable=True)
+    # Geocoded coordinates; geohash prefixes drive proximity search
+    latitude = Column(Numeric(9, 6), nullable=True)
+    longitude = Column(Numeric(9, 6), nullable=True)
+    geohash = Column(String(12), nullable=True, index=True)
     total_credits_earned = Column(DECIMAL(5,2), default=0.00)
     total_credits_spent = Column(DECIMAL(5,2), default=0.00)
     time_credits = Column(DECIMAL(5,2), default=0.00)
@@ -22,9 +27,11 @@ class User(Base):
     services_availed_count = Column(Integer, default=0)
     status = Column(Enum('Active', 'Suspended', 'Deactivated'), default='Active')
     date_joined = Column(DateTime, default=func.now())
+    # Incremented by every UPDATE; feeds the ETag version stamps
+    version = version_column()
     last_login = Column(DateTime, nullable=True)
     reset_token = Column(String(255), nullable=True)
-    reset_token_expires_at = Column(DateTime, nullable=True)
+    reset_token_expires_at = Column(DateTime, nullable=True, index=True)
 
     # Relationship with the Service model
     services = relationship("Service", back_populates="creator", cascade="all, delete-orphan")
@@ -0,0 +1,256 @@
+"""
+Connection pool settings and instrumentation for the database engines.
+
+Pool sizing comes from the environment (see ``PoolSettings``). Sync
+handlers run in Starlette's threadpool (40 threads by default), so when more
+handlers than ``pool_size + max_overflow`` hit the database at once the
+extra ones block in the pool. ``InstrumentedQueuePool`` times every checkout
+so that queueing shows up in ``pool_status`` and the startup report instead
+of as unexplained latency.
+
+Pre-ping modes (``DB_POOL_PRE_PING``):
+- ``always``: SQLAlchemy's pre-ping, one extra round trip per checkout
+- ``idle``: ping only connections idle longer than DB_POOL_PRE_PING_IDLE_SECONDS
+  (a connection returned a moment ago is almost certainly still alive)
+- ``off``: rely on pool_recycle and disconnect handling alone
+"""
+
+import os
+import time
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.exc import DisconnectionError, TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+logger = logging.getLogger(__name__)
+
+PRE_PING_MODES = ("always", "idle", "off")
+
+# Checkouts slower than this count as having waited for a connection
+WAIT_THRESHOLD_SECONDS = 0.005
+
+def _env_bool(name: str, default: str) -> bool:
+    return os.getenv(name, default).lower() in ("1", "true", "yes")
+
+@dataclass(frozen=True)
+class PoolSettings:
+    pool_size: int = 5
+    max_overflow: int = 10
+    pool_timeout: float = 30.0
+    pool_recycle: int = 300
+    use_lifo: bool = False
+    pre_ping: str = "idle"
+    pre_ping_idle_seconds: float = 30.0
+
+    @property
+    def capacity(self) -> int:
+        return self.pool_size + self.max_overflow
+
+    @classmethod
+    def from_env(cls, prefix: str = "DB_POOL", defaults: Optional["PoolSettings"] = None) -> "PoolSettings":
+        """Read <prefix>_SIZE, _MAX_OVERFLOW, _TIMEOUT, _RECYCLE, _USE_LIFO, _PRE_PING, _PRE_PING_IDLE_SECONDS"""
+        defaults = defaults or cls()
+        pre_ping = os.getenv(f"{prefix}_PRE_PING", defaults.pre_ping).lower()
+        if pre_ping not in PRE_PING_MODES:
+            raise ValueError(f"{prefix}_PRE_PING must be one of: {', '.join(PRE_PING_MODES)}")
+        return cls(
+            pool_size=int(os.getenv(f"{prefix}_SIZE", defaults.pool_size)),
+            max_overflow=int(os.getenv(f"{prefix}_MAX_OVERFLOW", defaults.max_overflow)),
+            pool_timeout=float(os.getenv(f"{prefix}_TIMEOUT", defaults.pool_timeout)),
+            pool_recycle=int(os.getenv(f"{prefix}_RECYCLE", defaults.pool_recycle)),
+            use_lifo=_env_bool(f"{prefix}_USE_LIFO", str(defaults.use_lifo)),
+            pre_ping=pre_ping,
+            pre_ping_idle_seconds=float(os.getenv(f"{prefix}_PRE_PING_IDLE_SECONDS", defaults.pre_ping_idle_seconds)),
+        )
+
+# ----------------------------------------------------------------------
+# Metrics
+# ----------------------------------------------------------------------
+
+class PoolMetrics:
+    """Counters for one pool; updated from pool events and checkout timing"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidations = 0
+        self.pings = 0
+        self.ping_failures = 0
+        self.waits = 0                  # checkouts slower than WAIT_THRESHOLD_SECONDS
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.timeouts = 0
+        self.overflow_checkouts = 0     # checkouts served by an overflow connection
+        self.peak_checked_out = 0
+
+    def record_checkout(self, waited: float, checked_out: int, overflow: int):
+        with self._lock:
+            self.checkouts += 1
+            if waited >= WAIT_THRESHOLD_SECONDS:
+                self.waits += 1
+                self.wait_seconds += waited
+                self.max_wait_seconds = max(self.max_wait_seconds, waited)
+            if overflow > 0:
+                self.overflow_checkouts += 1
+            self.peak_checked_out = max(self.peak_checked_out, checked_out)
+
+    def increment(self, name: str):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "connects": self.connects,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "invalidations": self.invalidations,
+                "pings": self.pings,
+                "ping_failures": self.ping_failures,
+                "waits": self.waits,
+                "wait_seconds_total": round(self.wait_seconds, 3),
+                "wait_seconds_avg": round(self.wait_seconds / self.waits, 4) if self.waits else 0.0,
+                "wait_seconds_max": round(self.max_wait_seconds, 4),
+                "timeouts": self.timeouts,
+                "overflow_checkouts": self.overflow_checkouts,
+                "peak_checked_out": self.peak_checked_out,
+            }
+
+class _InstrumentedPoolMixin:
+    """Times checkouts, including any wait for a free connection"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.increment("timeouts")
+            logger.warning(
+                f"Timed out waiting for a database connection "
+                f"({self.checkedout()} checked out, pool_size={self.size()}, overflow={self.overflow()})"
+            )
+            raise
+        self.metrics.record_checkout(time.perf_counter() - started, self.checkedout(), self.overflow())
+        return connection
+
+    def recreate(self):
+        # engine.dispose() swaps in a fresh pool; keep counting into the same metrics
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    pass
+
+class InstrumentedAsyncQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+# ----------------------------------------------------------------------
+# Engine wiring
+# ----------------------------------------------------------------------
+
+def _keeps_default_pool(url: str, async_engine: bool) -> bool:
+    """In-memory sqlite and aiosqlite keep the pool SQLAlchemy picks for them"""
+    parsed = make_url(url)
+    if parsed.get_backend_name() != "sqlite":
+        return False
+    # aiosqlite runs a thread per connection that must not outlive its event loop
+    return async_engine or parsed.database in (None, "", ":memory:")
+
+def engine_pool_options(url: str, settings: PoolSettings, async_engine: bool = False) -> dict:
+    """create_engine()/create_async_engine() keyword arguments for ``settings``"""
+    options = {"pool_pre_ping": settings.pre_ping == "always"}
+    if _keeps_default_pool(url, async_engine):
+        return options
+    options.update(
+        poolclass=InstrumentedAsyncQueuePool if async_engine else InstrumentedQueuePool,
+        pool_size=settings.pool_size,
+        max_overflow=settings.max_overflow,
+        pool_timeout=settings.pool_timeout,
+        pool_recycle=settings.pool_recycle,
+        pool_use_lifo=settings.use_lifo,
+    )
+    return options
+
+def instrument_engine(engine: Engine, settings: PoolSettings) -> None:
+    """Attach the metrics listeners and, for pre_ping="idle", the idle-connection ping"""
+    metrics: Optional[PoolMetrics] = getattr(engine.pool, "metrics", None)
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        connection_record.info["returned_at"] = time.monotonic()
+        if metrics:
+            metrics.increment("connects")
+
+    @event.listens_for(engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        connection_record.info["returned_at"] = time.monotonic()
+        if metrics:
+            metrics.increment("checkins")
+
+    @event.listens_for(engine, "invalidate")
+    def _on_invalidate(dbapi_connection, connection_record, exception):
+        if metrics:
+            metrics.increment("invalidations")
+
+    if settings.pre_ping != "idle":
+        return
+
+    @event.listens_for(engine, "checkout")
+    def _ping_if_idle(dbapi_connection, connection_record, connection_proxy):
+        returned_at = connection_record.info.get("returned_at")
+        if returned_at is None or time.monotonic() - returned_at < settings.pre_ping_idle_seconds:
+            return
+        if metrics:
+            metrics.increment("pings")
+        try:
+            engine.dialect.do_ping(dbapi_connection)
+        except Exception as e:
+            if metrics:
+                metrics.increment("ping_failures")
+            # The pool discards this connection and retries the checkout with a new one
+            raise DisconnectionError(f"Idle connection failed pre-ping: {e}")
+
+def pool_status(engine: Engine, settings: PoolSettings) -> dict:
+    """Configuration, live occupancy and counters for an engine's pool"""
+    pool = engine.pool
+    status = {
+        "pool_class": type(pool).__name__,
+        "pool_size": settings.pool_size,
+        "max_overflow": settings.max_overflow,
+        "timeout_seconds": settings.pool_timeout,
+        "recycle_seconds": settings.pool_recycle,
+        "use_lifo": settings.use_lifo,
+        "pre_ping": settings.pre_ping,
+    }
+    if isinstance(pool, QueuePool):
+        status.update(checked_out=pool.checkedout(), checked_in=pool.checkedin(), overflow=max(pool.overflow(), 0))
+    metrics = getattr(pool, "metrics", None)
+    if metrics:
+        status["metrics"] = metrics.snapshot()
+    return status
+
+def pool_capacity_report(settings: PoolSettings, threadpool_size: int) -> str:
+    """One-line comparison of sync pool capacity with the request threadpool"""
+    report = (
+        f"Database pool: pool_size={settings.pool_size}, max_overflow={settings.max_overflow} "
+        f"(capacity {settings.capacity}), threadpool={threadpool_size}, "
+        f"lifo={settings.use_lifo}, pre_ping={settings.pre_ping}"
+    )
+    if threadpool_size > settings.capacity:
+        report += (
+            f"; up to {threadpool_size - settings.capacity} concurrent sync handlers can queue "
+            f"for a connection (raise DB_POOL_SIZE/DB_POOL_MAX_OVERFLOW or lower THREADPOOL_SIZE)"
+        )
+    return report
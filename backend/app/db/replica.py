@@ -0,0 +1,209 @@
+"""
+Read replica routing.
+
+Read-only dependencies (``get_read_db`` / ``get_async_read_db``) use the
+replica given by DATABASE_REPLICA_URL, unless:
+- the caller wrote recently (read-your-writes): ``ReadYourWritesMiddleware``
+  pins a client to the primary for DB_READ_YOUR_WRITES_SECONDS after any
+  successful POST/PUT/PATCH/DELETE, through a cookie (seen by every worker)
+  and an in-process pin on the bearer token (for clients that don't send
+  cookies);
+- the replica is lagging more than DB_REPLICA_MAX_LAG_SECONDS, or the lag
+  check fails. Lag is checked at most every DB_REPLICA_CHECK_SECONDS.
+
+On MySQL the lag comes from SHOW REPLICA STATUS (SHOW SLAVE STATUS before
+8.0.22). DB_REPLICA_LAG_QUERY replaces it with any query returning the lag in
+seconds, e.g. against a heartbeat table, which also makes routing testable
+with two local SQLite files.
+"""
+
+import os
+import time
+import hashlib
+import logging
+import threading
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+from ..core.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+PIN_COOKIE = "tn_read_primary_until"
+UNSAFE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+def replication_lag(connection: Connection, lag_query: Optional[str] = None) -> Optional[float]:
+    """Replica lag in seconds; None when it can't be determined (e.g. replication stopped)"""
+    if lag_query:
+        lag = connection.execute(text(lag_query)).scalar()
+        return float(lag) if lag is not None else None
+    if connection.dialect.name != "mysql":
+        return 0.0
+    try:
+        row = connection.exec_driver_sql("SHOW REPLICA STATUS").mappings().first()
+        column = "Seconds_Behind_Source"
+    except Exception:
+        row = connection.exec_driver_sql("SHOW SLAVE STATUS").mappings().first()
+        column = "Seconds_Behind_Master"
+    if row is None:
+        # Not configured as a replica (e.g. the same server): nothing to lag behind
+        return 0.0
+    lag = row.get(column)
+    return float(lag) if lag is not None else None
+
+class ReplicaRouter:
+    """Decides per request whether a read can go to the replica"""
+
+    def __init__(
+        self,
+        replica_engine: Optional[Engine],
+        max_lag_seconds: float = 5.0,
+        check_seconds: float = 5.0,
+        pin_seconds: float = 5.0,
+        lag_query: Optional[str] = None
+    ):
+        self.replica_engine = replica_engine
+        self.max_lag_seconds = max_lag_seconds
+        self.check_seconds = check_seconds
+        self.pin_seconds = pin_seconds
+        self.lag_query = lag_query
+        self._token_pins = TTLCache(default_ttl=pin_seconds, max_entries=10000)
+        self._lock = threading.Lock()
+        self._checked_at: Optional[float] = None
+        self._healthy = True
+        self.lag_seconds: Optional[float] = None
+        self.metrics = {"replica_reads": 0, "primary_reads": 0, "pinned_reads": 0, "lag_fallbacks": 0, "checks": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.replica_engine is not None
+
+    # ------------------------------------------------------------------
+    # Lag / health
+    # ------------------------------------------------------------------
+
+    def check_due(self) -> bool:
+        return self._checked_at is None or time.monotonic() - self._checked_at >= self.check_seconds
+
+    def check(self) -> bool:
+        """Measure the lag now; blocking, so async callers run it in the threadpool"""
+        with self._lock:
+            if not self.check_due():
+                return self._healthy
+            try:
+                with self.replica_engine.connect() as connection:
+                    lag = replication_lag(connection, self.lag_query)
+                healthy = lag is not None and lag <= self.max_lag_seconds
+            except Exception as e:
+                logger.warning(f"Replica lag check failed, reading from the primary: {e}")
+                lag, healthy = None, False
+            if healthy != self._healthy:
+                if healthy:
+                    logger.info(f"Replica caught up (lag {lag}s), routing reads to it again")
+                else:
+                    logger.warning(f"Replica lag {lag}s exceeds {self.max_lag_seconds}s, reading from the primary")
+            self.lag_seconds = lag
+            self._healthy = healthy
+            self._checked_at = time.monotonic()
+            self.metrics["checks"] += 1
+            return healthy
+
+    def replica_healthy(self) -> bool:
+        if not self.enabled:
+            return False
+        if self.check_due():
+            return self.check()
+        return self._healthy
+
+    # ------------------------------------------------------------------
+    # Read-your-writes
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _token_key(authorization: Optional[str]) -> Optional[str]:
+        if not authorization:
+            return None
+        return hashlib.sha1(authorization.encode()).hexdigest()
+
+    def pin(self, authorization: Optional[str]) -> None:
+        key = self._token_key(authorization)
+        if key:
+            self._token_pins.set(key, True)
+
+    def pinned(self, request) -> bool:
+        """True if this client wrote within the last pin_seconds"""
+        until = request.cookies.get(PIN_COOKIE)
+        if until:
+            try:
+                if float(until) > time.time():
+                    return True
+            except ValueError:
+                pass
+        key = self._token_key(request.headers.get("authorization"))
+        return bool(key and self._token_pins.get(key))
+
+    # ------------------------------------------------------------------
+
+    def use_replica(self, request) -> bool:
+        """Route this read to the replica? Call replica_healthy()/check() first if check_due()"""
+        if not self.enabled:
+            return False
+        if self.pinned(request):
+            self.metrics["pinned_reads"] += 1
+            self.metrics["primary_reads"] += 1
+            return False
+        if not self._healthy:
+            self.metrics["lag_fallbacks"] += 1
+            self.metrics["primary_reads"] += 1
+            return False
+        self.metrics["replica_reads"] += 1
+        return True
+
+    def status(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "healthy": self._healthy if self.enabled else None,
+            "lag_seconds": self.lag_seconds,
+            "max_lag_seconds": self.max_lag_seconds,
+            "pin_seconds": self.pin_seconds,
+            "metrics": dict(self.metrics),
+        }
+
+class ReadYourWritesMiddleware:
+    """Pins clients to the primary for a while after a successful write (pure ASGI, streaming-safe)"""
+
+    def __init__(self, app, router: ReplicaRouter):
+        self.app = app
+        self.router = router
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in UNSAFE_METHODS or not self.router.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_pin(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                until = time.time() + self.router.pin_seconds
+                cookie = (
+                    f"{PIN_COOKIE}={until:.3f}; Max-Age={int(self.router.pin_seconds) or 1}; "
+                    f"Path=/; HttpOnly; SameSite=Lax"
+                )
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [(b"set-cookie", cookie.encode("latin-1"))]
+                headers = dict(scope.get("headers") or [])
+                authorization = headers.get(b"authorization")
+                self.router.pin(authorization.decode("latin-1") if authorization else None)
+            await send(message)
+
+        await self.app(scope, receive, send_with_pin)
+
+def router_from_env(replica_engine: Optional[Engine]) -> ReplicaRouter:
+    return ReplicaRouter(
+        replica_engine,
+        max_lag_seconds=float(os.getenv("DB_REPLICA_MAX_LAG_SECONDS", "5")),
+        check_seconds=float(os.getenv("DB_REPLICA_CHECK_SECONDS", "5")),
+        pin_seconds=float(os.getenv("DB_READ_YOUR_WRITES_SECONDS", "5")),
+        lag_query=os.getenv("DB_REPLICA_LAG_QUERY") or None,
+    )
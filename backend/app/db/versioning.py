@@ -0,0 +1,20 @@
+"""
+Row version counters.
+
+``version_column()`` adds an integer that every UPDATE of the row
+increments: ORM flushes and bulk ``query.update()`` / ``update()``
+statements alike, since SQLAlchemy applies ``onupdate`` to any UPDATE that
+doesn't set the column itself. Raw SQL updates must bump it explicitly.
+
+The ETag version stamps (app/core/etag.py) aggregate these counters, so a
+stamp changes whenever a row behind a response is inserted, updated or
+deleted, without reading the rows themselves.
+"""
+
+from sqlalchemy import Column, Integer, literal_column, text
+
+def version_column() -> Column:
+    return Column(
+        Integer, nullable=False, default=1, server_default=text("1"),
+        onupdate=literal_column("version + 1")
+    )
@@ -0,0 +1,18 @@
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional
+
+class MatchResult(BaseModel):
+    id: int
+    title: str
+    category: str
+    location: Optional[str] = None
+    creator_id: int
+    creator_name: Optional[str] = None
+    score: float = Field(..., description="Weighted match score between 0 and 1")
+    breakdown: Dict[str, float] = Field(default_factory=dict, description="Per-signal scores before weighting")
+    shared_tags: List[str] = []
+
+class MatchListResponse(BaseModel):
+    source_type: str = Field(..., description="Either 'request' or 'service'")
+    source_id: int
+    matches: List[MatchResult]
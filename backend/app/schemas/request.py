@@ -9,6 +9,8 @@ class RequestBase(BaseModel):
     category: str = Field(..., min_length=1, max_length=50, description="Request category")
     budget: Decimal = Field(..., gt=0, description="Proposed budget (in time credits or money)")
     location: str = Field(..., min_length=1, max_length=100, description="Request location")
+    latitude: Optional[float] = Field(None, ge=-90, le=90, description="Latitude; geocoded from location when omitted")
+    longitude: Optional[float] = Field(None, ge=-180, le=180, description="Longitude; geocoded from location when omitted")
 
     deadline: Optional[date] = Field(None, description="Deadline for the request (optional)")
     urgency: Optional[str] = Field(default="normal", description="Urgency level: low, normal, high, urgent")
@@ -35,6 +37,8 @@ class RequestUpdate(BaseModel):
     category: Optional[str] = Field(None, min_length=1, max_length=50)
     budget: Optional[Decimal] = Field(None, gt=0)
     location: Optional[str] = Field(None, min_length=1, max_length=100)
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
     deadline: Optional[date] = None
     urgency: Optional[str] = Field(None, description="Urgency level: low, normal, high, urgent")
     whats_included: Optional[str] = None
@@ -57,6 +61,7 @@ class RequestResponse(RequestBase):
     creator_name: Optional[str] = None
     creator_date_joined: Optional[datetime] = None
     created_at: datetime
+    distance_km: Optional[float] = Field(None, description="Distance from the near= point, when given")
 
     class Config:
         orm_mode = True
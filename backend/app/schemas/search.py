@@ -0,0 +1,23 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from datetime import datetime
+
+class SearchHit(BaseModel):
+    entity_type: str = Field(..., description="Either 'service' or 'request'")
+    id: int
+    title: str
+    snippet: Optional[str] = None
+    category: str
+    location: Optional[str] = None
+    status: Optional[str] = None
+    creator_id: int
+    creator_name: Optional[str] = None
+    created_at: Optional[datetime] = None
+    score: float = Field(0.0, description="Relevance score (higher is better)")
+
+class SearchResponse(BaseModel):
+    query: str
+    results: List[SearchHit]
+    total_count: int
+    skip: int
+    limit: int
@@ -9,6 +9,8 @@ class ServiceBase(BaseModel):
     category: str = Field(..., min_length=1, max_length=50, description="Service category")
     time_credits_per_hour: Decimal = Field(..., ge=0.5, le=10.0, description="Time credits per hour")
     location: str = Field(..., min_length=1, max_length=100, description="Service location")
+    latitude: Optional[float] = Field(None, ge=-90, le=90, description="Latitude; geocoded from location when omitted")
+    longitude: Optional[float] = Field(None, ge=-180, le=180, description="Longitude; geocoded from location when omitted")
     
     # These will be converted to individual boolean fields in the endpoint
     availability: List[str] = Field(..., description="List of availability slots")
@@ -49,6 +51,7 @@ class ServiceResponse(ServiceBase):
     # Rating fields
     average_rating: float = Field(0.0, description="Average rating from reviews")
     total_reviews: int = Field(0, description="Total number of reviews")
+    distance_km: Optional[float] = Field(None, description="Distance from the near= point, when given")
     
     class Config:
         from_attributes = True
@@ -59,6 +62,8 @@ class ServiceUpdate(BaseModel):
     category: Optional[str] = Field(None, min_length=1, max_length=50)
     time_credits_per_hour: Optional[Decimal] = Field(None, ge=0.5, le=10.0)
     location: Optional[str] = Field(None, min_length=1, max_length=100)
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
     availability: Optional[List[str]] = Field(None)
     whats_included: Optional[str] = Field(None)
     requirements: Optional[str] = Field(None)
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 from decimal import Decimal
 
@@ -28,6 +28,21 @@ class BookingResponse(BookingBase):
     booker_name: Optional[str] = None  # Renamed from creator_name to booker_name
     service_provider_name: Optional[str] = None  # Added new field for service provider name
     service_title: Optional[str] = None
+    end_datetime: Optional[datetime] = None
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class FreeWindow(BaseModel):
+    start: datetime
+    end: datetime
+
+class BookingAvailabilityResponse(BaseModel):
+    service_id: int
+    provider_id: int
+    range_start: datetime = Field(..., alias="from")
+    range_end: datetime = Field(..., alias="to")
+    free_windows: List[FreeWindow]
+
+    class Config:
+        populate_by_name = True
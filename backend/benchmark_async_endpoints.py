@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Benchmark the native async service listing against the old sync handler.
+
+Seeds a database with users and services, then fires concurrent
+GET requests at two in-process routes of the same app (one worker, no
+network, httpx over ASGI):
+- async: GET /api/v1/services/ (AsyncSession, batched creator/rating lookups)
+- sync: the previous implementation, a plain ``def`` route on the sync
+  session run in Starlette's threadpool, with a creator and a rating query
+  per service
+
+By default a throwaway sqlite file is used; pass --database-url to run
+against MySQL (the tables are created but existing rows are not removed).
+
+Usage: python benchmark_async_endpoints.py [--services 500] [--requests 400] [--concurrency 50] [--limit 50]
+"""
+
+import os
+import sys
+import time
+import asyncio
+import tempfile
+import argparse
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark async vs sync service listing")
+    parser.add_argument("--database-url", help="Database to seed and query (default: temporary sqlite file)")
+    parser.add_argument("--services", type=int, default=500)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--limit", type=int, default=50, help="Services per response")
+    return parser.parse_args()
+
+args = parse_args()
+if args.database_url:
+    os.environ["DATABASE_URL"] = args.database_url
+else:
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/benchmark.db"
+os.environ.setdefault("SCHEDULER_ENABLED", "false")
+
+from typing import List
+
+import httpx
+from fastapi import Depends
+from sqlalchemy.orm import Session
+
+import main
+from app.db.database import SessionLocal, get_db
+from app.db.models.user import User
+from app.db.models.service import Service
+from app.schemas.service import ServiceResponse
+from app.core.availability import encode_availability
+from app.api.endpoints.services import format_service_response
+
+USERS = 50
+
+def seed(services):
+    db = SessionLocal()
+    try:
+        if db.query(Service).count() >= services:
+            return
+        users = [
+            User(first_name=f"User{i}", last_name="Bench", email=f"bench{i}-{time.time_ns()}@example.com",
+                 password_hash="x", location="Kochi")
+            for i in range(USERS)
+        ]
+        db.add_all(users)
+        db.flush()
+        db.add_all([
+            Service(creator_id=users[i % USERS].user_id, title=f"Guitar lessons {i}",
+                    description="Learn acoustic guitar basics", category="Music",
+                    time_credits_per_hour=2, location="Kochi", tags="guitar,music",
+                    availability_mask=encode_availability(["flexible"]))
+            for i in range(services)
+        ])
+        db.commit()
+    finally:
+        db.close()
+
+# ----------------------------------------------------------------------
+# Sync baseline (the handler before it went async)
+# ----------------------------------------------------------------------
+
+@main.app.get("/benchmark/sync-services", response_model=List[ServiceResponse])
+def sync_services(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+    services = db.query(Service).offset(skip).limit(limit).all()
+    return [format_service_response(service, db) for service in services]
+
+async def run(label, client, path, requests, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one():
+        async with semaphore:
+            started = time.perf_counter()
+            response = await client.get(path)
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[one() for _ in range(requests)])
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] * 1000
+    p95 = latencies[int(len(latencies) * 0.95) - 1] * 1000
+    print(f"{label:<14} {elapsed:7.2f}s  {requests / elapsed:8.1f} req/s  p50 {p50:7.1f} ms  p95 {p95:7.1f} ms")
+    return elapsed
+
+async def benchmark():
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        # Warm up both paths (connection pools, statement caches)
+        await client.get(f"/api/v1/services/?limit={args.limit}")
+        await client.get(f"/benchmark/sync-services?limit={args.limit}")
+
+        print(f"🚀 {args.requests} requests, {args.concurrency} concurrent, {args.limit} services each")
+        sync = await run("sync", client, f"/benchmark/sync-services?limit={args.limit}", args.requests, args.concurrency)
+        native = await run("async", client, f"/api/v1/services/?limit={args.limit}", args.requests, args.concurrency)
+        print(f"✅ Speedup: {sync / native:.1f}x")
+
+def main_():
+    print(f"📦 Seeding {args.services} services in {os.environ['DATABASE_URL']}")
+    seed(args.services)
+    asyncio.run(benchmark())
+
+if __name__ == "__main__":
+    try:
+        main_()
+    except Exception as e:
+        print(f"❌ Benchmark failed: {e}")
+        sys.exit(1)
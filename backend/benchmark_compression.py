@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Benchmark response compression (app/core/compression.py): payload size and
+CPU time per response for gzip at a few levels and, when the optional
+``brotli`` package is installed, brotli at a few qualities.
+
+No database or network: the payloads are JSON shaped like real responses.
+- services: a GET /services/ page (100 listings with descriptions)
+- transactions: a GET /credits/transactions page
+- messages: a conversation's message history
+- small: a single balance, below the default minimum size
+
+Usage: python benchmark_compression.py [--items 100] [--rounds 200]
+"""
+
+import sys
+import time
+import zlib
+import argparse
+import statistics
+from datetime import datetime, timedelta
+
+import orjson
+
+from app.core.compression import COMPRESSION_MINIMUM_SIZE, brotli
+
+def service_page(items):
+    joined = datetime(2025, 1, 1)
+    return [{
+        "service_id": i,
+        "creator_id": i % 20 + 1,
+        "creator_name": f"User{i % 20} Bench",
+        "creator_date_joined": joined,
+        "title": f"Guitar lessons {i}",
+        "description": "Learn acoustic guitar basics, chords, strumming patterns and simple songs. " * 3,
+        "category": "Music",
+        "time_credits_per_hour": "2.0",
+        "location": "Kochi",
+        "latitude": 9.9312 + i / 1000,
+        "longitude": 76.2673 - i / 1000,
+        "availability": ["weekend-evenings", "weekday-evenings"],
+        "whats_included": "Practice sheets",
+        "requirements": "Bring your own guitar",
+        "tags": ["guitar", "music"],
+        "average_rating": 4.5,
+        "total_reviews": 12 + i,
+        "created_at": joined + timedelta(days=i),
+        "distance_km": None,
+    } for i in range(items)]
+
+def transaction_page(items):
+    created = datetime(2025, 1, 1)
+    return {
+        "transactions": [{
+            "transaction_id": i, "user_id": 1, "amount": "-1.50", "transaction_type": "debit",
+            "reference_type": "booking", "reference_id": i, "description": f"Booking #{i}",
+            "balance_before": "20.00", "balance_after": "18.50",
+            "created_at": created + timedelta(hours=i),
+        } for i in range(items)],
+        "total_count": items,
+        "current_balance": "18.50",
+    }
+
+def message_history(items):
+    sent = datetime(2025, 1, 1, 9)
+    return [{
+        "message_id": i, "conversation_id": 7, "sender_id": 1 + i % 2, "sender_name": ["Asha", "Rahul"][i % 2],
+        "content": f"Sure, Saturday at {10 + i % 8}:00 works for me. Should I bring anything for the session?",
+        "message_type": "text", "is_read": True, "created_at": sent + timedelta(minutes=i),
+    } for i in range(items)]
+
+def encoders():
+    for level in (1, 6, 9):
+        yield f"gzip-{level}", lambda body, level=level: _gzip(body, level)
+    if brotli is not None:
+        for quality in (1, 4, 11):
+            yield f"br-{quality}", lambda body, quality=quality: brotli.compress(body, quality=quality)
+
+def _gzip(body, level):
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return compressor.compress(body) + compressor.flush()
+
+def timed(function, body, rounds):
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        result = function(body)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings), len(result)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark response compression")
+    parser.add_argument("--items", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    payloads = {
+        "services": orjson.dumps(service_page(args.items)),
+        "transactions": orjson.dumps(transaction_page(args.items)),
+        "messages": orjson.dumps(message_history(args.items)),
+        "small": orjson.dumps({"user_id": 1, "balance": "18.50"}),
+    }
+
+    print(f"🚀 {args.items} items per page, median of {args.rounds} rounds")
+    if brotli is None:
+        print("⚠️  brotli not installed: gzip only")
+    for name, body in payloads.items():
+        note = "  (below minimum size, sent uncompressed)" if len(body) < COMPRESSION_MINIMUM_SIZE else ""
+        print(f"\n📦 {name}: {len(body)} B raw{note}")
+        for label, encode in encoders():
+            seconds, size = timed(encode, body, args.rounds)
+            print(f"   {label:<8} {size:>7} B  {size / len(body):6.1%}  {seconds * 1000:7.3f} ms")
+
+if __name__ == "__main__":
+    try:
+        main()
+    except Exception as e:
+        print(f"❌ Benchmark failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Benchmark email rendering for a weekly digest run.
+
+Renders the weekly digest (5 items each) for N users and builds the raw MIME
+message two ways:
+- precompiled templates + cached MIME skeleton (app/core/email_templates.py)
+- a naive path: regex substitution over the template source on every call
+  and an email.mime MIMEMultipart message per user
+
+No database or SMTP server is needed.
+
+Usage: python benchmark_email_templates.py [--users 100000]
+"""
+
+import re
+import time
+import argparse
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from html import escape
+
+from app.core.email_templates import (
+    EMAIL_TEMPLATES, TEMPLATE_DIR, compose_message, get_email_templates, render_email, render_partial
+)
+
+SENDER = "no-reply@timenest.local"
+ITEMS_PER_USER = 5
+SLOT = re.compile(r"\{\{\s*([a-zA-Z_][a-zA-Z0-9_]*)(\|raw)?\s*\}\}")
+
+def sample_items(user_index):
+    return [
+        {
+            "title": f"Guitar lessons #{user_index}-{item}",
+            "kind": "Service" if item % 2 else "Request",
+            "category": "Music & Arts",
+            "credits": 2 + item,
+            "link": f"http://localhost:3000/services/{user_index * 10 + item}",
+        }
+        for item in range(ITEMS_PER_USER)
+    ]
+
+def digest_values(user_index, items_html, items_text):
+    return {
+        "recipient_email": f"user{user_index}@example.com",
+        "recipient_name": f"User {user_index}",
+        "summary": f"{ITEMS_PER_USER} new services and requests match your interests",
+        "browse_link": "http://localhost:3000/services",
+        "items_html": items_html,
+        "items_text": items_text,
+        "unread_messages": user_index % 7,
+        "credits_earned": "4.50",
+    }
+
+def render_compiled(user_index):
+    items = sample_items(user_index)
+    items_html = "".join(render_partial("weekly_digest_item", "html", **item) for item in items)
+    items_text = "\n".join(render_partial("weekly_digest_item", "txt", **item) for item in items)
+    values = digest_values(user_index, items_html, items_text)
+    rendered = render_email("weekly_digest", **values)
+    return compose_message(SENDER, values["recipient_email"], rendered.subject, rendered.text, rendered.html)
+
+# ----------------------------------------------------------------------
+# Naive baseline
+# ----------------------------------------------------------------------
+
+def _read(name):
+    with open(f"{TEMPLATE_DIR}/{name}", encoding="utf-8") as handle:
+        return handle.read()
+
+def _naive_substitute(source, values, html):
+    def replace(match):
+        value = str(values[match.group(1)])
+        return value if (match.group(2) or not html) else escape(value)
+    return SLOT.sub(replace, source)
+
+def render_naive(user_index, sources):
+    spec = EMAIL_TEMPLATES["weekly_digest"]
+    items = sample_items(user_index)
+    items_html = "".join(_naive_substitute(sources["item.html"], item, True) for item in items)
+    items_text = "\n".join(_naive_substitute(sources["item.txt"], item, False) for item in items)
+    values = digest_values(user_index, items_html, items_text)
+
+    fills = {"heading": spec.heading, "subtitle": spec.subtitle, "subject": spec.subject}
+    html_layout = SLOT.sub(lambda m: fills.get(m.group(1), m.group(0)), sources["layout.html"])
+    text_layout = SLOT.sub(lambda m: fills.get(m.group(1), m.group(0)), sources["layout.txt"])
+    html = _naive_substitute(html_layout.replace("{{ content|raw }}", sources["digest.html"]), values, True)
+    text = _naive_substitute(text_layout.replace("{{ content|raw }}", sources["digest.txt"]), values, False)
+
+    msg = MIMEMultipart('alternative')
+    msg['Subject'] = spec.subject
+    msg['From'] = SENDER
+    msg['To'] = values["recipient_email"]
+    msg.attach(MIMEText(text, 'plain'))
+    msg.attach(MIMEText(html, 'html'))
+    return msg.as_string()
+
+def run(label, func, users):
+    started = time.perf_counter()
+    total_bytes = 0
+    for user_index in range(users):
+        total_bytes += len(func(user_index))
+    elapsed = time.perf_counter() - started
+    print(f"{label:<28} {elapsed:8.2f}s  {users / elapsed:10.0f} emails/s  {total_bytes / users / 1024:6.1f} KiB avg")
+    return elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark weekly digest rendering")
+    parser.add_argument("--users", type=int, default=100000)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    get_email_templates()
+    print(f"📦 Compiled templates in {(time.perf_counter() - started) * 1000:.1f} ms")
+
+    sources = {
+        "layout.html": _read("layout.html"),
+        "layout.txt": _read("layout.txt"),
+        "digest.html": _read("weekly_digest.html").rstrip("\n"),
+        "digest.txt": _read("weekly_digest.txt").rstrip("\n"),
+        "item.html": _read("weekly_digest_item.html").rstrip("\n"),
+        "item.txt": _read("weekly_digest_item.txt").rstrip("\n"),
+    }
+
+    print(f"🚀 Rendering weekly digest for {args.users} users ({ITEMS_PER_USER} items each)")
+    compiled = run("precompiled + cached MIME", render_compiled, args.users)
+    naive = run("regex + email.mime", lambda i: render_naive(i, sources), args.users)
+    print(f"✅ Speedup: {naive / compiled:.1f}x")
+
+if __name__ == "__main__":
+    main()
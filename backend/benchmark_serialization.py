@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Benchmark response serialization for one page of results, before and after
+the orjson fast path (app/core/fast_json.py).
+
+No database or network: each case renders the same 100-item page the way
+the endpoint does.
+- services: the dicts built by GET /services/, through FastAPI's
+  response_model validation + JSONResponse (before) vs fast_json (after)
+- transactions: ledger rows for GET /credits/transactions, through
+  TransactionResponse.from_orm() per row plus the response model (before)
+  vs fast_json reading the ORM attributes directly (after)
+
+Usage: python benchmark_serialization.py [--items 100] [--rounds 200]
+"""
+
+import os
+import sys
+import time
+import argparse
+import statistics
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import List
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.core.fast_json import FAST_JSON_ENABLED, fast_json
+from app.db.models import load_all_models
+from app.db.models.timeTransaction import TimeTransaction, TransactionTypeEnum, ReferenceTypeEnum
+from app.schemas.service import ServiceResponse
+from app.schemas.timeTransaction import TransactionListResponse, TransactionResponse
+
+def service_page(items):
+    joined = datetime(2025, 1, 1)
+    return [{
+        "service_id": i,
+        "creator_id": i % 20 + 1,
+        "creator_name": f"User{i % 20} Bench",
+        "creator_date_joined": joined,
+        "title": f"Guitar lessons {i}",
+        "description": "Learn acoustic guitar basics, chords, strumming patterns and simple songs. " * 3,
+        "category": "Music",
+        "time_credits_per_hour": Decimal("2.0"),
+        "location": "Kochi",
+        "latitude": 9.9312,
+        "longitude": 76.2673,
+        "availability": ["weekend-evenings", "weekday-evenings"],
+        "whats_included": "Practice sheets",
+        "requirements": "Bring your own guitar",
+        "tags": ["guitar", "music"],
+        "average_rating": 4.5,
+        "total_reviews": 12,
+        "created_at": joined + timedelta(days=i),
+        "distance_km": None,
+    } for i in range(items)]
+
+def transaction_page(items):
+    created = datetime(2025, 1, 1)
+    return [TimeTransaction(
+        transaction_id=i, user_id=1, amount=Decimal("-1.50"),
+        transaction_type=TransactionTypeEnum.debit if hasattr(TransactionTypeEnum, "debit") else list(TransactionTypeEnum)[0],
+        reference_type=list(ReferenceTypeEnum)[0], reference_id=i, description=f"Booking #{i}",
+        balance_before=Decimal("20.00"), balance_after=Decimal("18.50"),
+        created_at=created, updated_at=created,
+    ) for i in range(items)]
+
+async def _standard(field, content):
+    return JSONResponse(await serialize_response(field=field, response_content=content)).body
+
+def timed(function, rounds):
+    import asyncio
+    loop = asyncio.new_event_loop()
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        result = function()
+        if asyncio.iscoroutine(result):
+            result = loop.run_until_complete(result)
+        timings.append(time.perf_counter() - started)
+    loop.close()
+    return statistics.median(timings), len(result)
+
+def report(label, before, after):
+    (before_seconds, before_bytes), (after_seconds, after_bytes) = before, after
+    print(
+        f"{label:<14} before {before_seconds * 1000:7.3f} ms ({before_bytes} B)   "
+        f"after {after_seconds * 1000:7.3f} ms ({after_bytes} B)   {before_seconds / after_seconds:5.1f}x"
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark page serialization")
+    parser.add_argument("--items", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    if not FAST_JSON_ENABLED:
+        print("❌ The fast path is off (FAST_JSON_ENABLED=false or orjson not installed)")
+        sys.exit(1)
+    load_all_models()
+
+    print(f"🚀 {args.items} items per page, median of {args.rounds} rounds")
+
+    services = service_page(args.items)
+    services_field = create_response_field(name="response", type_=List[ServiceResponse], mode="serialization")
+    report(
+        "services",
+        timed(lambda: _standard(services_field, services), args.rounds),
+        timed(lambda: fast_json(ServiceResponse, services, many=True).body, args.rounds),
+    )
+
+    transactions = transaction_page(args.items)
+    transactions_field = create_response_field(name="response", type_=TransactionListResponse, mode="serialization")
+
+    def transactions_before():
+        content = TransactionListResponse(
+            transactions=[TransactionResponse.from_orm(tx) for tx in transactions],
+            total_count=len(transactions), current_balance=Decimal("18.50")
+        )
+        return _standard(transactions_field, content)
+
+    def transactions_after():
+        return fast_json(TransactionListResponse, {
+            "transactions": transactions, "total_count": len(transactions), "current_balance": Decimal("18.50")
+        }).body
+
+    report("transactions", timed(transactions_before, args.rounds), timed(transactions_after, args.rounds))
+
+if __name__ == "__main__":
+    try:
+        main()
+    except Exception as e:
+        print(f"❌ Benchmark failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Benchmark cold worker start (importing main), before and after moving
+schema creation and heavy imports off the startup path.
+
+Each run is a fresh interpreter, like a new uvicorn worker or a reload:
+- before: what importing main used to do: psutil, mysql.connector and pytz
+  imported eagerly, then Base.metadata.create_all() checking every table
+  against the database
+- after: import main as it is now
+
+The database is a temporary sqlite file with the tables already created
+(the steady state where create_all finds nothing to do). Pass
+--database-url to measure against MySQL, where create_all costs a round
+trip per table.
+
+Usage: python benchmark_startup.py [--runs 5] [--database-url URL] [--top 10]
+"""
+
+import os
+import sys
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+BEFORE = """
+import time
+started = time.perf_counter()
+import psutil, mysql.connector, pytz
+import main
+from app.db.database import Base, engine
+from app.db.models import load_all_models
+load_all_models()
+Base.metadata.create_all(bind=engine)
+print(time.perf_counter() - started)
+"""
+
+AFTER = """
+import time
+started = time.perf_counter()
+import main
+print(time.perf_counter() - started)
+"""
+
+CREATE_TABLES = """
+from app.db.database import Base, engine
+from app.db.models import load_all_models
+load_all_models()
+Base.metadata.create_all(bind=engine)
+"""
+
+def run_python(code, env, extra_args=()):
+    return subprocess.run(
+        [sys.executable, *extra_args, "-c", code],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+    )
+
+def measure(label, code, env, runs):
+    timings = [float(run_python(code, env).stdout.strip().splitlines()[-1]) for _ in range(runs)]
+    print(f"{label:<8} median {statistics.median(timings) * 1000:7.0f} ms   min {min(timings) * 1000:7.0f} ms")
+    return statistics.median(timings)
+
+def slowest_imports(env, top):
+    """(cumulative microseconds, module) for the slowest imports under main, from -X importtime"""
+    stderr = run_python("import main", env, ("-X", "importtime")).stderr
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        modules.append((int(cumulative), name.strip()))
+    # Our modules plus third-party packages (not their submodules, which would repeat the parent)
+    modules = [
+        (us, name.strip()) for us, name in modules
+        if name.strip() != "main" and ("." not in name or name.strip().startswith("app."))
+    ]
+    return sorted(modules, reverse=True)[:top]
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark cold worker start")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--database-url", help="Database to start against (default: temporary sqlite file)")
+    parser.add_argument("--top", type=int, default=10, help="Slowest imports to list")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env["DATABASE_URL"] = args.database_url or f"sqlite:///{tempfile.mkdtemp()}/startup.db"
+    env.setdefault("SCHEDULER_ENABLED", "false")
+    run_python(CREATE_TABLES, env)
+
+    print(f"🚀 Cold start, {args.runs} fresh interpreters each, against {env['DATABASE_URL']}")
+    before = measure("before", BEFORE, env, args.runs)
+    after = measure("after", AFTER, env, args.runs)
+    print(f"✅ {(before - after) * 1000:.0f} ms faster ({before / after:.2f}x)")
+
+    print(f"\n📦 Slowest imports under main now:")
+    for microseconds, name in slowest_imports(env, args.top):
+        print(f"  {microseconds / 1000:7.1f} ms  {name}")
+
+if __name__ == "__main__":
+    try:
+        main()
+    except subprocess.CalledProcessError as e:
+        print(f"❌ Benchmark failed: {e.stderr.strip().splitlines()[-1] if e.stderr else e}")
+        sys.exit(1)
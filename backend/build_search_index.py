@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""
+Build (or rebuild) the search_terms inverted index from existing services and requests.
+
+Run once after deploying the search feature, and any time the tokenizer or
+field weights in app/core/search.py change. New and edited listings are
+indexed automatically by the API.
+"""
+
+import sys
+
+from app.db.database import engine, SessionLocal
+from app.db.models.searchIndex import SearchTerm
+from app.core.search import SearchEngine
+
+def build_search_index(batch_size: int = 500):
+    """Create the search_terms table if needed and repopulate it"""
+    SearchTerm.__table__.create(bind=engine, checkfirst=True)
+
+    db = SessionLocal()
+    try:
+        services, requests = SearchEngine(db).rebuild(batch_size=batch_size)
+        print(f"✅ Indexed {services} services and {requests} requests")
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Error building search index: {e}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    print("Building search index...")
+    build_search_index()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Offline geocoding of existing services, requests and users.
+
+Looks up each row's free-text location in the local gazetteer CSV
+(GAZETTEER_PATH, defaults to app/data/gazetteer.csv) and stores
+latitude/longitude/geohash. No network access is needed.
+
+Usage:
+    python geocode_locations.py            # only rows without coordinates
+    python geocode_locations.py --all      # re-geocode every row the gazetteer knows
+"""
+
+import sys
+
+from app.db.database import SessionLocal
+from app.db.models.service import Service
+from app.db.models.request import Request
+from app.db.models.user import User
+from app.core.geo import set_coordinates, get_gazetteer
+
+def geocode_locations(only_missing: bool = True, batch_size: int = 500):
+    """Geocode rows in primary key order, committing per batch"""
+    gazetteer = get_gazetteer()
+    if not gazetteer.places:
+        print(f"❌ Gazetteer at {gazetteer.path} is empty or missing")
+        sys.exit(1)
+    print(f"📍 Using gazetteer {gazetteer.path} ({len(gazetteer.places)} entries)")
+
+    db = SessionLocal()
+    try:
+        for model, pk in ((Service, Service.service_id), (Request, Request.request_id), (User, User.user_id)):
+            geocoded = unmatched = 0
+            unmatched_names = set()
+            last_id = 0
+            while True:
+                query = db.query(model).filter(pk > last_id)
+                if only_missing:
+                    query = query.filter(model.geohash.is_(None))
+                batch = query.order_by(pk).limit(batch_size).all()
+                if not batch:
+                    break
+                for row in batch:
+                    point = gazetteer.lookup(row.location)
+                    if point:
+                        set_coordinates(row, *point)
+                        geocoded += 1
+                    else:
+                        # Leave any coordinates supplied by the client untouched
+                        unmatched += 1
+                        if row.location:
+                            unmatched_names.add(row.location)
+                last_id = getattr(batch[-1], pk.key)
+                db.commit()
+                db.expunge_all()
+
+            print(f"✅ {model.__tablename__}: {geocoded} geocoded, {unmatched} without a gazetteer match")
+            for name in sorted(unmatched_names)[:20]:
+                print(f"   - {name}")
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Error during geocoding: {e}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    geocode_locations(only_missing="--all" not in sys.argv)
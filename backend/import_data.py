@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Bulk import users or services from a CSV or NDJSON file.
+
+Same pipeline as POST /admin/import/{entity}: rows are validated with the
+API's schemas, passwords hashed in a process pool and rows written in
+batches, with every rejected line reported. Use this for large partner
+files that would outlive an HTTP request.
+
+CSV files need a header row; list cells (availability, tags) are separated
+with ';'. Services name their owner with creator_email or creator_id.
+
+Usage: python import_data.py {users,services} FILE [--format csv|ndjson]
+                             [--batch-size 500] [--workers N] [--dry-run]
+"""
+
+import sys
+import json
+import argparse
+
+from app.core.bulk_import import (
+    BulkImporter, BulkImportError, IMPORT_BATCH_SIZE, IMPORT_ENTITIES, IMPORT_FORMATS,
+    IMPORT_HASH_WORKERS, MAX_REPORTED_ERRORS, detect_format, parse_rows
+)
+from app.db.database import SessionLocal
+
+def import_data(entity: str, path: str, format: str, batch_size: int, workers: int, dry_run: bool, errors_file: str):
+    """Run the import and print its report"""
+    db = SessionLocal()
+    try:
+        with open(path, "rb") as handle:
+            importer = BulkImporter(
+                db, entity, batch_size=batch_size, hash_workers=workers, dry_run=dry_run,
+                max_reported_errors=None if errors_file else MAX_REPORTED_ERRORS
+            )
+            report = importer.run(parse_rows(handle, format or detect_format(path)))
+    except (BulkImportError, OSError, UnicodeDecodeError) as e:
+        db.rollback()
+        print(f"❌ Import failed: {e}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+    action = "would be imported" if dry_run else "imported"
+    print(f"📦 {report.rows} rows in {report.batches} batch(es), {report.duration_seconds}s")
+    print(f"✅ {report.imported} {entity} {action}")
+    if report.failed:
+        print(f"⚠️  {report.failed} rows rejected")
+        for error in report.errors[:20]:
+            print(f"   line {error.line}: {'; '.join(error.errors)}")
+        if errors_file:
+            with open(errors_file, "w", encoding="utf-8") as handle:
+                json.dump(report.to_dict()["errors"], handle, indent=2)
+            print(f"📝 Rejected lines written to {errors_file}")
+        elif report.failed > len(report.errors):
+            print(f"   (details kept for the first {len(report.errors)}; use --errors-file to write all of them)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk import users or services")
+    parser.add_argument("entity", choices=IMPORT_ENTITIES)
+    parser.add_argument("file")
+    parser.add_argument("--format", choices=IMPORT_FORMATS, default=None, help="Guessed from the file name when omitted")
+    parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+    parser.add_argument("--workers", type=int, default=IMPORT_HASH_WORKERS, help="Password hashing processes (0 = one per CPU)")
+    parser.add_argument("--dry-run", action="store_true", help="Validate without writing")
+    parser.add_argument("--errors-file", default=None, help="Write every rejected line as JSON here")
+    args = parser.parse_args()
+
+    print(f"Importing {args.entity} from {args.file}...")
+    import_data(args.entity, args.file, args.format, args.batch_size, args.workers, args.dry_run, args.errors_file)
@@ -1,13 +1,26 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.api import api_router
-from app.db.database import Base, engine
+from app.db.database import Base, engine, POOL_SETTINGS, replica_router
+from app.db.models import load_all_models
+from app.db.pool import pool_capacity_report
+from app.db.replica import ReadYourWritesMiddleware
+from app.core.response_cache import RESPONSE_CACHE_ENABLED, ResponseCacheMiddleware
+from app.core.compression import COMPRESSION_ENABLED, CompressionMiddleware
 from app.core.websocket import chat_manager
+from app.core.scheduler import scheduler
+from app.core.lifecycle_jobs import register_lifecycle_jobs
+from app.core.email_outbox import outbox_worker
+from app.core.email_templates import get_email_templates
 import socketio
-import uvicorn
 import os
 import logging
 import asyncio
+import anyio
+
+# Import-time cost is paid by every worker start and reload, so modules
+# needed only by one endpoint or job (psutil, pytz, mysql.connector,
+# uvicorn) are imported where they are used rather than at module level.
 
 # Configure logging
 logging.basicConfig(
@@ -15,9 +28,6 @@ logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
 )
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
-
 # Create FastAPI app
 app = FastAPI(
     title="TimeNest API",
@@ -27,6 +37,14 @@ app = FastAPI(
     redoc_url="/redoc"
 )
 
+# Cache public catalog GETs; added before CORS so it runs inside it and
+# never stores per-origin CORS headers
+if RESPONSE_CACHE_ENABLED:
+    app.add_middleware(
+        ResponseCacheMiddleware,
+        settle_seconds=replica_router.max_lag_seconds if replica_router.enabled else 0.0
+    )
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -34,8 +52,18 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Pagination headers the frontend reads (moderation listings, bookings)
+    expose_headers=["X-Next-Cursor", "X-Total-Count"],
 )
 
+# Compress responses outside the response cache, so cached bodies serve any Accept-Encoding
+if COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware)
+
+# Pin clients to the primary briefly after they write (only with a read replica)
+if replica_router.enabled:
+    app.add_middleware(ReadYourWritesMiddleware, router=replica_router)
+
 # Include API router
 app.include_router(api_router, prefix="/api/v1")
 
@@ -49,10 +77,54 @@ async def root():
         "health": "/api/v1/health"
     }
 
+@app.on_event("startup")
+async def create_tables_for_development():
+    """DB_AUTO_CREATE=true creates missing tables at startup (local/dev only; use `alembic upgrade head` otherwise)"""
+    if os.getenv("DB_AUTO_CREATE", "false").lower() in ("1", "true", "yes"):
+        load_all_models()
+        await anyio.to_thread.run_sync(lambda: Base.metadata.create_all(bind=engine))
+
+@app.on_event("startup")
+async def report_database_pool():
+    """Log the sync pool's capacity next to the threadpool size (THREADPOOL_SIZE overrides the default 40)"""
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    if os.getenv("THREADPOOL_SIZE"):
+        limiter.total_tokens = int(os.getenv("THREADPOOL_SIZE"))
+    threadpool_size = int(limiter.total_tokens)
+    report = pool_capacity_report(POOL_SETTINGS, threadpool_size)
+    if threadpool_size > POOL_SETTINGS.capacity:
+        logging.getLogger(__name__).warning(report)
+    else:
+        logging.getLogger(__name__).info(report)
+
+@app.on_event("startup")
+async def start_scheduler():
+    """Start the lifecycle job scheduler (set SCHEDULER_ENABLED=false to run it elsewhere)"""
+    register_lifecycle_jobs(scheduler)
+    if os.getenv("SCHEDULER_ENABLED", "true").lower() in ("1", "true", "yes"):
+        scheduler.start()
+
+@app.on_event("startup")
+async def start_email_outbox_worker():
+    """Deliver queued emails in the background (set EMAIL_OUTBOX_WORKER_ENABLED=false to disable)"""
+    # Compile email templates now rather than on the first request that sends mail
+    get_email_templates()
+    if os.getenv("EMAIL_OUTBOX_WORKER_ENABLED", "true").lower() in ("1", "true", "yes"):
+        outbox_worker.start()
+
+@app.on_event("shutdown")
+async def stop_scheduler():
+    await scheduler.stop()
+
+@app.on_event("shutdown")
+async def stop_email_outbox_worker():
+    await outbox_worker.stop()
+
 # Create combined Socket.IO + FastAPI app
 socket_app = socketio.ASGIApp(chat_manager.sio, app)
 
 if __name__ == "__main__":
+    import uvicorn
     uvicorn.run(
         socket_app,
         host="0.0.0.0",
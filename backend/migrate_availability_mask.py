@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Migration script to replace the seven services.availability_* boolean
+columns with the availability_mask bitmask column.
+
+Steps:
+    1. add availability_mask (SMALLINT, default 0) if missing
+    2. backfill it from the boolean columns in one set-based UPDATE
+    3. create the availability_mask index
+    4. drop the boolean columns (skip with --keep-columns)
+
+Safe to re-run: finished steps are skipped.
+"""
+
+import sys
+
+from sqlalchemy import inspect, text
+
+from app.db.database import engine
+from app.db.models.service import Service
+from app.core.availability import AVAILABILITY_BITS
+
+# Legacy column for each availability option
+LEGACY_COLUMNS = {
+    "weekday-mornings": "availability_weekday_morning",
+    "weekday-afternoons": "availability_weekday_afternoon",
+    "weekday-evenings": "availability_weekday_evening",
+    "weekend-mornings": "availability_weekend_morning",
+    "weekend-afternoons": "availability_weekend_afternoon",
+    "weekend-evenings": "availability_weekend_evening",
+    "flexible": "availability_flexible",
+}
+
+def migrate_availability_mask(keep_columns: bool = False):
+    """Add, backfill and index availability_mask, then drop the legacy columns"""
+    try:
+        columns = {column["name"] for column in inspect(engine).get_columns("services")}
+        legacy_present = [column for column in LEGACY_COLUMNS.values() if column in columns]
+
+        with engine.begin() as connection:
+            if "availability_mask" not in columns:
+                connection.execute(text("ALTER TABLE services ADD COLUMN availability_mask SMALLINT NOT NULL DEFAULT 0"))
+                print("✅ Added services.availability_mask")
+            else:
+                print("✓ services.availability_mask already exists")
+
+            if legacy_present:
+                mask_expression = " + ".join(
+                    f"(CASE WHEN {column} THEN {AVAILABILITY_BITS[option]} ELSE 0 END)"
+                    for option, column in LEGACY_COLUMNS.items()
+                    if column in legacy_present
+                )
+                result = connection.execute(text(f"UPDATE services SET availability_mask = {mask_expression}"))
+                print(f"✅ Backfilled availability_mask for {result.rowcount} services")
+
+        existing_indexes = {index["name"] for index in inspect(engine).get_indexes("services")}
+        for index in Service.__table__.indexes:
+            if "availability_mask" in index.columns and index.name not in existing_indexes:
+                index.create(bind=engine)
+                print(f"✅ Created index {index.name}")
+
+        if legacy_present and not keep_columns:
+            with engine.begin() as connection:
+                for column in legacy_present:
+                    connection.execute(text(f"ALTER TABLE services DROP COLUMN {column}"))
+                    print(f"🗑️  Dropped services.{column}")
+        elif legacy_present:
+            print("ℹ️  Keeping legacy availability columns (--keep-columns)")
+    except Exception as e:
+        print(f"❌ Error during availability migration: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    print("Starting availability bitmask migration...")
+    migrate_availability_mask(keep_columns="--keep-columns" in sys.argv)
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Migration script to add provider_id/end_datetime to service_bookings,
+backfill both columns for existing bookings and create the service_bookings
+indexes (the provider interval index and the booker/provider keyset
+pagination indexes).
+
+Safe to re-run: only missing columns/indexes are created and only rows
+with empty values are backfilled.
+"""
+
+import sys
+
+from sqlalchemy import inspect, text
+
+from app.db.database import engine, SessionLocal
+from app.db.models.serviceBooking import ServiceBooking
+from app.core.scheduling import booking_end
+
+NEW_COLUMNS = {
+    "provider_id": "INTEGER NULL REFERENCES users(user_id) ON DELETE CASCADE",
+    "end_datetime": "DATETIME NULL",
+}
+
+def migrate_booking_intervals(batch_size: int = 1000):
+    """Add, backfill and index the booking interval columns"""
+    try:
+        columns = {column["name"] for column in inspect(engine).get_columns("service_bookings")}
+        with engine.begin() as connection:
+            for column_name, ddl in NEW_COLUMNS.items():
+                if column_name in columns:
+                    print(f"✓ service_bookings.{column_name} already exists")
+                    continue
+                connection.execute(text(f"ALTER TABLE service_bookings ADD COLUMN {column_name} {ddl}"))
+                print(f"✅ Added service_bookings.{column_name}")
+
+            result = connection.execute(text("""
+                UPDATE service_bookings
+                SET provider_id = (
+                    SELECT services.creator_id FROM services
+                    WHERE services.service_id = service_bookings.service_id
+                )
+                WHERE provider_id IS NULL
+            """))
+            print(f"✅ Backfilled provider_id for {result.rowcount} bookings")
+    except Exception as e:
+        print(f"❌ Error adding booking interval columns: {e}")
+        sys.exit(1)
+
+    db = SessionLocal()
+    try:
+        updated = 0
+        last_id = 0
+        while True:
+            batch = db.query(ServiceBooking).filter(
+                ServiceBooking.booking_id > last_id,
+                ServiceBooking.end_datetime.is_(None)
+            ).order_by(ServiceBooking.booking_id).limit(batch_size).all()
+            if not batch:
+                break
+            for booking in batch:
+                booking.end_datetime = booking_end(booking.scheduled_datetime, booking.duration_minutes)
+            last_id = batch[-1].booking_id
+            updated += len(batch)
+            db.commit()
+        print(f"✅ Backfilled end_datetime for {updated} bookings")
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Error backfilling end_datetime: {e}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+    existing_indexes = {index["name"] for index in inspect(engine).get_indexes("service_bookings")}
+    for index in ServiceBooking.__table__.indexes:
+        if index.name not in existing_indexes:
+            index.create(bind=engine)
+            print(f"✅ Created index {index.name}")
+
+if __name__ == "__main__":
+    print("Starting booking interval migration...")
+    migrate_booking_intervals()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Migration script to add latitude/longitude/geohash columns (and the
+geohash index) to the services, requests and users tables.
+
+Run geocode_locations.py afterwards to fill them in.
+Safe to re-run: existing columns and indexes are skipped.
+"""
+
+import sys
+
+from sqlalchemy import inspect, text
+
+from app.db.database import engine
+from app.db.models.service import Service
+from app.db.models.request import Request
+from app.db.models.user import User
+
+GEO_COLUMNS = {
+    "latitude": "NUMERIC(9, 6) NULL",
+    "longitude": "NUMERIC(9, 6) NULL",
+    "geohash": "VARCHAR(12) NULL",
+}
+
+def migrate_geo_columns():
+    """Add the geo columns and geohash index wherever they are missing"""
+    inspector = inspect(engine)
+    try:
+        for model in (Service, Request, User):
+            table_name = model.__tablename__
+            existing_columns = {column["name"] for column in inspector.get_columns(table_name)}
+
+            with engine.begin() as connection:
+                for column_name, ddl in GEO_COLUMNS.items():
+                    if column_name in existing_columns:
+                        print(f"✓ {table_name}.{column_name} already exists")
+                        continue
+                    connection.execute(text(f"ALTER TABLE {table_name} ADD COLUMN {column_name} {ddl}"))
+                    print(f"✅ Added {table_name}.{column_name}")
+
+            existing_indexes = {index["name"] for index in inspect(engine).get_indexes(table_name)}
+            for index in model.__table__.indexes:
+                if "geohash" in index.columns and index.name not in existing_indexes:
+                    index.create(bind=engine)
+                    print(f"✅ Created index {index.name}")
+    except Exception as e:
+        print(f"❌ Error during geo migration: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    print("Starting geo columns migration...")
+    migrate_geo_columns()
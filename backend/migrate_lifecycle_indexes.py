@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Migration script for the scheduled lifecycle jobs:
+- creates the job_locks lease table
+- adds the indexes the sweeps scan (request deadlines, pending booking
+  start times, password reset token expiry)
+
+Safe to re-run: existing tables and indexes are skipped.
+"""
+
+import sys
+
+from sqlalchemy import inspect
+
+from app.db.database import engine
+from app.db.models.jobLock import JobLock
+from app.db.models.request import Request
+from app.db.models.serviceBooking import ServiceBooking
+from app.db.models.user import User
+
+LIFECYCLE_INDEXES = (
+    (Request, "ix_requests_status_deadline"),
+    (ServiceBooking, "ix_service_bookings_status_schedule"),
+    (User, "ix_users_reset_token_expires_at"),
+)
+
+def migrate_lifecycle_indexes():
+    """Create the job lock table and any missing sweep indexes"""
+    inspector = inspect(engine)
+
+    if inspector.has_table(JobLock.__tablename__):
+        print(f"✓ Table {JobLock.__tablename__} already exists")
+    else:
+        try:
+            JobLock.__table__.create(bind=engine)
+            print(f"✅ Created table {JobLock.__tablename__}")
+        except Exception as e:
+            print(f"❌ Error creating table {JobLock.__tablename__}: {e}")
+            sys.exit(1)
+
+    for model, index_name in LIFECYCLE_INDEXES:
+        existing = {index["name"] for index in inspector.get_indexes(model.__tablename__)}
+        if index_name in existing:
+            print(f"✓ Index {index_name} already exists")
+            continue
+        index = next(index for index in model.__table__.indexes if index.name == index_name)
+        try:
+            index.create(bind=engine)
+            print(f"✅ Created index {index_name}")
+        except Exception as e:
+            print(f"❌ Error creating index {index_name}: {e}")
+            sys.exit(1)
+
+if __name__ == "__main__":
+    print("Starting lifecycle job migration...")
+    migrate_lifecycle_indexes()
@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+Migration script to add the (status, category, created_at) indexes used by
+category browsing and the matching engine's candidate lookups.
+
+Safe to re-run: existing indexes are skipped.
+"""
+
+import sys
+
+from sqlalchemy import inspect
+
+from app.db.database import engine
+from app.db.models.service import Service
+from app.db.models.request import Request
+
+def migrate_matching_indexes():
+    """Create any missing matching indexes on services and requests"""
+    inspector = inspect(engine)
+    for model in (Service, Request):
+        existing = {index["name"] for index in inspector.get_indexes(model.__tablename__)}
+        for index in model.__table__.indexes:
+            if index.name in existing:
+                print(f"✓ Index {index.name} already exists")
+                continue
+            try:
+                index.create(bind=engine)
+                print(f"✅ Created index {index.name}")
+            except Exception as e:
+                print(f"❌ Error creating index {index.name}: {e}")
+                sys.exit(1)
+
+if __name__ == "__main__":
+    print("Starting matching index migration...")
+    migrate_matching_indexes()
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+Migration script for the report dashboard statistics:
+- adds the (status, created_at) index used by the GROUP BY status and
+  weekday queries in app/core/report_analytics.py
+
+Safe to re-run: an existing index is skipped.
+"""
+
+import sys
+
+from sqlalchemy import inspect
+
+from app.db.database import engine
+from app.db.models.report import Report
+
+INDEX_NAME = "ix_reports_status_created"
+
+def migrate_report_indexes():
+    """Create the report stats index if it is missing"""
+    inspector = inspect(engine)
+
+    existing = {index["name"] for index in inspector.get_indexes(Report.__tablename__)}
+    if INDEX_NAME in existing:
+        print(f"✓ Index {INDEX_NAME} already exists")
+        return
+
+    index = next(index for index in Report.__table__.indexes if index.name == INDEX_NAME)
+    try:
+        index.create(bind=engine)
+        print(f"✅ Created index {INDEX_NAME}")
+    except Exception as e:
+        print(f"❌ Error creating index {INDEX_NAME}: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    print("Starting report index migration...")
+    migrate_report_indexes()
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Migration script to create the normalized tag tables and backfill them
+from the existing comma-separated services.tags, requests.tags and
+requests.skills columns.
+
+Safe to re-run: links are recomputed from the text columns each time.
+"""
+
+import sys
+
+from app.db.database import engine, SessionLocal
+from app.db.models.tag import Tag, service_tags, request_tags, request_skills
+from app.core.tags import TagManager
+
+def migrate_tag_tables(batch_size: int = 500):
+    """Create tags/service_tags/request_tags/request_skills and backfill them"""
+    for table in (Tag.__table__, service_tags, request_tags, request_skills):
+        table.create(bind=engine, checkfirst=True)
+        print(f"✓ Table {table.name} ready")
+
+    db = SessionLocal()
+    try:
+        counts = TagManager(db).backfill(batch_size=batch_size)
+        print(f"✅ Backfilled tags for {counts['services']} services and {counts['requests']} requests")
+        print(f"   {db.query(Tag).count()} distinct tags/skills")
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Error during tag backfill: {e}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    print("Starting tag tables migration...")
+    migrate_tag_tables()
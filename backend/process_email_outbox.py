@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Deliver every due email in the outbox once and exit.
+
+Useful when the in-process worker is disabled (EMAIL_OUTBOX_WORKER_ENABLED=false)
+or to flush the queue against a local test SMTP server, e.g.:
+
+    python -m aiosmtpd -n -l localhost:1025
+    EMAIL_DEV_MODE=false EMAIL_USE_TLS=false EMAIL_SERVER=localhost EMAIL_PORT=1025 python process_email_outbox.py
+"""
+
+import sys
+
+from app.core.email_outbox import outbox_worker
+from app.db.database import SessionLocal
+
+def process_email_outbox():
+    """Drain the outbox and report what is left"""
+    try:
+        processed = outbox_worker.drain()
+    finally:
+        outbox_worker.connection.close()
+
+    db = SessionLocal()
+    try:
+        counts = outbox_worker.pending_counts(db)
+    finally:
+        db.close()
+
+    print(f"✅ Processed {processed} email(s): {outbox_worker.metrics['sent']} sent, "
+          f"{outbox_worker.metrics['retried']} to retry, {outbox_worker.metrics['failed']} failed")
+    print(f"📬 Outbox now: {counts}")
+    if outbox_worker.metrics["last_error"]:
+        print(f"❌ Last error: {outbox_worker.metrics['last_error']}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    print("Processing email outbox...")
+    process_email_outbox()
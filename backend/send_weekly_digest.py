@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Build the weekly digest for every active user and queue it in the email outbox.
+
+The scheduler runs this every Monday; use the script to run it by hand or to
+preview the numbers with --dry-run. Re-running in the same ISO week does not
+queue duplicates.
+
+Usage: python send_weekly_digest.py [--chunk-size 500] [--window-days 7] [--dry-run]
+"""
+
+import sys
+import argparse
+
+from app.core.digest import DigestGenerator, DIGEST_CHUNK_SIZE, DIGEST_WINDOW_DAYS
+from app.db.database import SessionLocal
+
+def send_weekly_digest(chunk_size: int, window_days: int, dry_run: bool):
+    """Run the digest pipeline and print its metrics"""
+    db = SessionLocal()
+    try:
+        metrics = DigestGenerator(db, chunk_size=chunk_size, window_days=window_days, dry_run=dry_run).run()
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Weekly digest failed: {e}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+    action = "would be queued" if dry_run else "queued"
+    print(f"📰 New items: {metrics.new_services} services, {metrics.new_requests} requests")
+    print(f"👥 Users scanned: {metrics.users_scanned} in {metrics.chunks} chunk(s), {metrics.users_skipped} with nothing to report")
+    print(f"✅ Digests {action}: {metrics.emails_queued} ({metrics.already_queued} already queued this week)")
+    print(f"⏱️  {metrics.duration_seconds}s, {metrics.users_per_second} users/s, peak RSS {metrics.peak_rss_mb} MB")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Queue the weekly digest email for all users")
+    parser.add_argument("--chunk-size", type=int, default=DIGEST_CHUNK_SIZE)
+    parser.add_argument("--window-days", type=int, default=DIGEST_WINDOW_DAYS)
+    parser.add_argument("--dry-run", action="store_true", help="Compute digests without queueing them")
+    args = parser.parse_args()
+
+    print("Building weekly digest...")
+    send_weekly_digest(args.chunk_size, args.window_days, args.dry_run)
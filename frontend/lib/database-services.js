@@ -288,20 +288,30 @@ export async function getServiceBookings() {
       throw new Error("Authentication token not found. Please log in.");
     }
 
-    const response = await fetch("http://localhost:8000/api/v1/service-bookings/", {
-      method: "GET",
-      headers: {
-        "Content-Type": "application/json",
-        "Authorization": `Bearer ${token}`
-      },
-    });
+    // Bookings are paginated: follow the X-Next-Cursor header until the last page
+    const data = [];
+    let cursor = null;
+    do {
+      const params = new URLSearchParams({ limit: 200 });
+      if (cursor) params.set("cursor", cursor);
+
+      const response = await fetch(`http://localhost:8000/api/v1/service-bookings/?${params}`, {
+        method: "GET",
+        headers: {
+          "Content-Type": "application/json",
+          "Authorization": `Bearer ${token}`
+        },
+      });
 
-    if (!response.ok) {
-      const errorData = await response.json();
-      throw new Error(errorData.detail || "Failed to fetch bookings");
-    }
+      if (!response.ok) {
+        const errorData = await response.json();
+        throw new Error(errorData.detail || "Failed to fetch bookings");
+      }
+
+      data.push(...(await response.json()));
+      cursor = response.headers.get("X-Next-Cursor");
+    } while (cursor);
 
-    const data = await response.json();
     return data.map(booking => ({
       ...booking,
       booking_id: booking.booking_id.toString(), // Ensure ID is string if needed
@@ -1121,6 +1121,44 @@ export async function getModeratorApplications(token) {
 
 // Content Management Functions
 
+// Largest page the moderation listings serve (MODERATION_MAX_PAGE_SIZE on the backend)
+const MODERATION_PAGE_SIZE = 200;
+
+/**
+ * Fetch every page of a cursor-paginated moderation listing
+ * @param {string} path - Listing URL without query string
+ * @param {URLSearchParams} queryParams - Filter parameters
+ * @param {string} token - Moderator access token
+ * @param {Function} onPage - Called with each parsed page body; returns the body's next_cursor, if any
+ * @returns {Promise<Response>} The last response (for X-Total-Count)
+ */
+async function fetchAllModerationPages(path, queryParams, token, onPage) {
+  let cursor = null;
+  let response;
+  do {
+    const params = new URLSearchParams(queryParams);
+    params.set('limit', MODERATION_PAGE_SIZE);
+    if (cursor) params.set('cursor', cursor);
+
+    response = await fetch(`${path}?${params}`, {
+      method: "GET",
+      headers: {
+        "Content-Type": "application/json",
+        "Authorization": `Bearer ${token}`
+      }
+    });
+
+    if (!response.ok) {
+      const errorData = await response.json();
+      throw new Error(errorData.detail || "Failed to fetch moderation listing");
+    }
+
+    const bodyCursor = onPage(await response.json());
+    cursor = response.headers.get('X-Next-Cursor') || bodyCursor || null;
+  } while (cursor);
+  return response;
+}
+
 /**
  * Get services for content moderation
  * @param {Object} filters - Filter parameters
@@ -1139,20 +1177,13 @@ export async function getModeratorServices(filters = {}) {
     if (filters.status) queryParams.append('status', filters.status);
     if (filters.search) queryParams.append('search', filters.search);
 
-    const response = await fetch(`http://localhost:8000/api/v1/moderators/services?${queryParams}`, {
-      method: "GET",
-      headers: {
-        "Content-Type": "application/json",
-        "Authorization": `Bearer ${token}`
-      }
-    });
-
-    if (!response.ok) {
-      const errorData = await response.json();
-      throw new Error(errorData.detail || "Failed to fetch services");
-    }
-
-    return await response.json();
+    // The listing is paginated: follow the cursor so the dashboard sees every service
+    const services = [];
+    await fetchAllModerationPages(
+      "http://localhost:8000/api/v1/moderators/services", queryParams, token,
+      (page) => { services.push(...page); }
+    );
+    return services;
   } catch (error) {
     console.error("Error fetching services:", error);
     throw error;
@@ -1177,20 +1208,13 @@ export async function getModeratorRequests(filters = {}) {
     if (filters.status) queryParams.append('status', filters.status);
     if (filters.search) queryParams.append('search', filters.search);
 
-    const response = await fetch(`http://localhost:8000/api/v1/moderators/requests?${queryParams}`, {
-      method: "GET",
-      headers: {
-        "Content-Type": "application/json",
-        "Authorization": `Bearer ${token}`
-      }
-    });
-
-    if (!response.ok) {
-      const errorData = await response.json();
-      throw new Error(errorData.detail || "Failed to fetch requests");
-    }
-
-    return await response.json();
+    // The listing is paginated: follow the cursor so the dashboard sees every request
+    const requests = [];
+    await fetchAllModerationPages(
+      "http://localhost:8000/api/v1/moderators/requests", queryParams, token,
+      (page) => { requests.push(...page); }
+    );
+    return requests;
   } catch (error) {
     console.error("Error fetching requests:", error);
     throw error;
@@ -1287,30 +1311,20 @@ export async function getSuspendedUsers(filters = {}) {
     if (filters.status) queryParams.append('status', filters.status);
     if (filters.search) queryParams.append('search', filters.search);
 
-    const url = `http://localhost:8000/api/v1/moderators/users?${queryParams}`;
-    console.log(`=== FRONTEND DEBUG: Calling ${url} ===`);
-    console.log("Filters:", filters);
-
-    const response = await fetch(url, {
-      method: "GET",
-      headers: {
-        "Content-Type": "application/json",
-        "Authorization": `Bearer ${token}`
+    // The listing is paginated: collect every page into one result
+    let result = null;
+    await fetchAllModerationPages(
+      "http://localhost:8000/api/v1/moderators/users", queryParams, token,
+      (page) => {
+        if (result) {
+          result.users.push(...(page.users || []));
+        } else {
+          result = { ...page, users: [...(page.users || [])] };
+        }
+        return page.next_cursor;
       }
-    });
-
-    if (!response.ok) {
-      const errorData = await response.json();
-      console.error("API Error:", errorData);
-      throw new Error(errorData.detail || "Failed to fetch users");
-    }
-
-    const result = await response.json();
-    console.log(`=== FRONTEND DEBUG: Received response ===`);
-    console.log("Full response:", result);
-    console.log("Users count:", result?.users?.length || 0);
-    console.log("Total count:", result?.total_count || 0);
-    
+    );
+    result.next_cursor = null;
     return result;
   } catch (error) {
     console.error("Error fetching suspended users:", error);